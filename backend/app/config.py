@@ -6,6 +6,98 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./geomatch.db")
 API_PROVIDERS = os.getenv("API_PROVIDERS", "local,dummy").split(",")
 
+# Quantidade de endereços gravados por transação no processamento em lote
+DB_CHUNK_SIZE = int(os.getenv("DB_CHUNK_SIZE", "500"))
+
+# Jobs de upload em segundo plano: workers simultâneos e endereços por chunk
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", str(DB_CHUNK_SIZE)))
+# Validade (s) da posse de um job por um worker, renovada a cada chunk gravado;
+# jobs com a posse vencida (worker que caiu) são retomados por outro worker
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+# Reaproveita endereços já validados há menos de N segundos (0 desativa)
+DEDUP_REUSE_SECONDS = float(os.getenv("DEDUP_REUSE_SECONDS", "0"))
+
+# Cache em memória de /api/validate (por processo): entradas e validade em segundos
+VALIDATE_CACHE_MAX_ENTRIES = int(os.getenv("VALIDATE_CACHE_MAX_ENTRIES", "100000"))
+VALIDATE_CACHE_TTL_SECONDS = float(os.getenv("VALIDATE_CACHE_TTL_SECONDS", "3600"))
+
+# Validação em streaming (NDJSON): chaves de deduplicação mantidas em memória por requisição
+VALIDATE_STREAM_DEDUP_KEYS = int(os.getenv("VALIDATE_STREAM_DEDUP_KEYS", "100000"))
+
+# Entrega dos resultados do webhook na callback_url: endereços por POST, tentativas e timeout (s)
+WEBHOOK_CALLBACK_BATCH = int(os.getenv("WEBHOOK_CALLBACK_BATCH", "500"))
+WEBHOOK_CALLBACK_RETRIES = int(os.getenv("WEBHOOK_CALLBACK_RETRIES", "3"))
+WEBHOOK_CALLBACK_TIMEOUT = float(os.getenv("WEBHOOK_CALLBACK_TIMEOUT", "10"))
+# Hosts de callback_url aceitos mesmo resolvendo para endereço interno (ex.: "n8n,localhost");
+# os demais precisam resolver para endereços públicos
+WEBHOOK_CALLBACK_ALLOWED_HOSTS = [h.strip().lower() for h in os.getenv("WEBHOOK_CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+
+# Linhas lidas do banco por lote nas exportações em streaming
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+
+# Score que encerra a consulta aos provedores seguintes para um endereço
+EARLY_EXIT_SCORE = float(os.getenv("EARLY_EXIT_SCORE", "95"))
+# Ordena provedores pelas estatísticas observadas (custo por endereço resolvido)
+SCHEDULER_ADAPTIVE = os.getenv("SCHEDULER_ADAPTIVE", "true").lower() in ("1", "true", "yes")
+# Consultas mínimas antes de um provedor ser ordenado pelo custo (até lá ele vai primeiro)
+SCHEDULER_MIN_CALLS = int(os.getenv("SCHEDULER_MIN_CALLS", "100"))
+
+# URL da API do ViaCEP ({} recebe o CEP); sobrescreva para apontar a um servidor local (ex.: benchmarks)
+VIACEP_URL = os.getenv("VIACEP_URL", "https://viacep.com.br/ws/{}/json/")
+
+# Chamadas simultâneas por provedor e conexões do cliente HTTP compartilhado
+PROVIDER_CONCURRENCY = int(os.getenv("PROVIDER_CONCURRENCY", "20"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+
+# Endereços normalizados mantidos no cache LRU em memória
+NORMALIZE_CACHE_SIZE = int(os.getenv("NORMALIZE_CACHE_SIZE", "65536"))
+
+# Threads usadas no cálculo de similaridade em lote (-1 usa todos os núcleos)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "-1"))
+
+# Processos para normalização/CEP/score (0 = inline, -1 = todos os núcleos), lotes menores que
+# PIPELINE_MIN_BATCH ficam inline e PIPELINE_PREFETCH chunks são preparados à frente do atual
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "0"))
+PIPELINE_MIN_BATCH = int(os.getenv("PIPELINE_MIN_BATCH", "64"))
+PIPELINE_PREFETCH = int(os.getenv("PIPELINE_PREFETCH", "2"))
+
+# Resiliência de provedores remotos (sobrescreva por provedor com o prefixo do nome, ex.: VIACEP_RATE_LIMIT)
+PROVIDER_RATE_LIMIT = float(os.getenv("PROVIDER_RATE_LIMIT", "0"))  # chamadas/s; 0 = sem limite
+PROVIDER_BURST = float(os.getenv("PROVIDER_BURST", "0"))  # 0 = igual ao rate limit
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+PROVIDER_RETRIES = int(os.getenv("PROVIDER_RETRIES", "2"))
+PROVIDER_RETRY_BASE_DELAY = float(os.getenv("PROVIDER_RETRY_BASE_DELAY", "0.2"))
+PROVIDER_TIMEOUT_MIN = float(os.getenv("PROVIDER_TIMEOUT_MIN", "0.5"))
+PROVIDER_TIMEOUT_MAX = float(os.getenv("PROVIDER_TIMEOUT_MAX", "5"))
+
+# Cache de consultas de CEP (memória + SQLite em disco; CEP_CACHE_PATH vazio desativa o disco)
+CEP_CACHE_PATH = os.getenv("CEP_CACHE_PATH", "./cep_cache.db")
+CEP_CACHE_MAX_ENTRIES = int(os.getenv("CEP_CACHE_MAX_ENTRIES", "100000"))
+CEP_CACHE_TTL_SECONDS = float(os.getenv("CEP_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+CEP_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("CEP_CACHE_NEGATIVE_TTL_SECONDS", str(24 * 3600)))
+CEP_CACHE_PREWARM_FILE = os.getenv("CEP_CACHE_PREWARM_FILE")
+# Gravações do cache em disco feitas em lote: a cada N entradas novas ou N segundos
+CEP_CACHE_FLUSH_ROWS = int(os.getenv("CEP_CACHE_FLUSH_ROWS", "500"))
+CEP_CACHE_FLUSH_SECONDS = float(os.getenv("CEP_CACHE_FLUSH_SECONDS", "2"))
+
+# Índice binário de CEPs usado pelo provider offline_cep
+CEP_INDEX_PATH = os.getenv("CEP_INDEX_PATH", "./data/cep_index.bin")
+
+# Índice de endereços de referência (CSV opcional; sem ele, usa a tabela reference_addresses)
+REFERENCE_CSV_PATH = os.getenv("REFERENCE_CSV_PATH")
+REFERENCE_TOP_K = int(os.getenv("REFERENCE_TOP_K", "5"))
+REFERENCE_MAX_CANDIDATES = int(os.getenv("REFERENCE_MAX_CANDIDATES", "500"))
+
+# Token exigido (header X-Admin-Token) para recursos administrativos como o profiling; vazio desativa
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Profiling sob demanda: pasta dos artefatos, quantos manter e intervalo de amostragem (segundos)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_MAX_ARTIFACTS = int(os.getenv("PROFILE_MAX_ARTIFACTS", "50"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
 # Credenciais de provedores de exemplo (definir no arquivo .env)
 PROVIDER_A_KEY = os.getenv("PROVIDER_A_KEY")
 PROVIDER_B_KEY = os.getenv("PROVIDER_B_KEY")
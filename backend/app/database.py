@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+import os
+from typing import Optional
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from .config import DATABASE_URL
@@ -8,6 +12,12 @@ engine = create_engine(DATABASE_URL, echo=False, future=True, connect_args=conne
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+# Revisão equivalente ao schema que o create_all criava antes das migrações
+BASELINE_REVISION = "0001"
+# Chave do pg_advisory_xact_lock que serializa as migrações entre processos
+_MIGRATION_LOCK_ID = 0x6765_6F6D
+
 
 def get_db():
     db = SessionLocal()
@@ -15,3 +25,36 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def upgrade_schema(bind: Optional[Engine] = None, revision: str = "head") -> None:
+    """
+    Aplica as migrações do Alembic até ``revision``.
+
+    Roda em uma única transação travada (``BEGIN EXCLUSIVE`` no SQLite, advisory
+    lock no PostgreSQL): vários workers subindo ao mesmo tempo esperam o primeiro
+    terminar e depois não têm nada a fazer. Bancos criados pelo antigo
+    ``create_all`` (tabelas sem ``alembic_version``) são marcados com a revisão
+    inicial antes do upgrade; as revisões seguintes só criam as tabelas, colunas
+    e índices que o ``create_all`` daquela versão ainda não tinha criado.
+
+    Args:
+        bind: Engine do banco (padrão: o da aplicação)
+        revision: Revisão alvo
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    bind = bind if bind is not None else engine
+    cfg = Config(ALEMBIC_INI)
+    with bind.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("BEGIN EXCLUSIVE")
+        elif conn.dialect.name == "postgresql":
+            conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_MIGRATION_LOCK_ID})")
+        cfg.attributes["connection"] = conn
+        tables = inspect(conn).get_table_names()
+        if "addresses" in tables and "alembic_version" not in tables:
+            command.stamp(cfg, BASELINE_REVISION)
+        command.upgrade(cfg, revision)
+        conn.commit()
@@ -1,12 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers import upload, export, webhook, addresses
+from .routers import upload, export, webhook, addresses, jobs, match, providers, metrics, profiles, validate
 from .logging_config import setup_logging
+from .config import API_PROVIDERS, CEP_CACHE_PREWARM_FILE, REFERENCE_CSV_PATH
+from .database import upgrade_schema
+from .providers.http_client import close_http_client
+from .providers.lookup_cache import flush_lookup_caches, get_lookup_cache
+from .services.cpu_pool import shutdown_cpu_pool, warm_cpu_pool
+from .services.jobs import job_pool
+from .services.reference_index import get_reference_index
+from .utils.validators import normalize_cep
 
 setup_logging()
+# Migrações do Alembic na importação, antes de qualquer worker atender requisições
+upgrade_schema()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if CEP_CACHE_PREWARM_FILE:
+        get_lookup_cache("viacep").prewarm_from_file(CEP_CACHE_PREWARM_FILE, key_func=normalize_cep)
+    if "reference" in API_PROVIDERS or REFERENCE_CSV_PATH:
+        # Constrói o índice de referência antes da primeira requisição
+        await asyncio.to_thread(get_reference_index)
+    # Inicia os processos do pipeline (PIPELINE_WORKERS) antes do primeiro upload
+    await asyncio.to_thread(warm_cpu_pool)
+    await job_pool.start()
+    yield
+    await job_pool.stop()
+    await close_http_client()
+    await asyncio.to_thread(flush_lookup_caches)
+    shutdown_cpu_pool()
+
 
-app = FastAPI(title="GeoMatch Backend", version="0.1.0")
+app = FastAPI(title="GeoMatch Backend", version="0.1.0", lifespan=lifespan)
 
 # CORS para frontend local (porta padrão do Vite: 5173)
 app.add_middleware(
@@ -15,12 +46,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Dedup-Ratio", "X-Unique-Addresses"],
 )
 
 app.include_router(upload.router, prefix="/api", tags=["upload"])
 app.include_router(export.router, prefix="/api", tags=["export"])
 app.include_router(webhook.router, prefix="/api", tags=["webhook"]) 
 app.include_router(addresses.router, prefix="/api", tags=["addresses"]) 
+app.include_router(match.router, prefix="/api", tags=["match"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
+app.include_router(providers.router, prefix="/api", tags=["providers"])
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])
+app.include_router(profiles.router, prefix="/api", tags=["profiles"])
+app.include_router(validate.router, prefix="/api", tags=["validate"])
 
 
 @app.get("/api/health")
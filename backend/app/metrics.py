@@ -0,0 +1,227 @@
+"""
+Métricas da aplicação no formato texto do Prometheus (sem dependências externas)
+
+Contadores e histogramas guardam apenas somas em memória; o texto só é
+montado quando ``/api/metrics`` é consultado. Valores que já existem em
+outros objetos (ex.: estatísticas de cache) são lidos por coletores no
+momento da consulta, sem custo no caminho de processamento.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Contador monotônico, com rótulos opcionais."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels_text(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Histograma de durações (segundos) com buckets fixos."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por rótulo: [contagem por bucket (não cumulativa)..., +Inf], soma, total
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Mede a duração do bloco ``with``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        lines = self.header()
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip((*self.buckets, float("inf")), counts):
+                cumulative += c
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels_text(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.labelnames, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels_text(self.labelnames, key)} {n}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    Métrica cujos valores são lidos dos coletores apenas na consulta. Vários
+    módulos podem contribuir para o mesmo nome (ver ``register_callback``).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collectors = [collect]
+
+    def render(self) -> List[str]:
+        samples = sorted(sample for collect in self.collectors for sample in collect())
+        return self.header() + [f"{self.name}{_labels_text(self.labelnames, k)} {_num(v)}" for k, v in samples]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "geomatch_stage_seconds", "Duração de cada etapa do processamento por chunk.", ["stage"]
+))
+PROVIDER_BATCH_SECONDS = REGISTRY.register(Histogram(
+    "geomatch_provider_batch_seconds", "Duração de cada lote enviado a um provedor.", ["provider"]
+))
+PROVIDER_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "geomatch_provider_request_seconds", "Duração das chamadas de rede de provedores remotos.", ["provider"]
+))
+PROVIDER_CALLS = REGISTRY.register(Counter(
+    "geomatch_provider_calls_total", "Endereços enviados a cada provedor.", ["provider"]
+))
+PROVIDER_ERRORS = REGISTRY.register(Counter(
+    "geomatch_provider_errors_total", "Falhas retornadas por cada provedor.", ["provider"]
+))
+ROWS_PROCESSED = REGISTRY.register(Counter(
+    "geomatch_rows_processed_total", "Endereços processados por origem.", ["source"]
+))
+DB_FLUSH_SECONDS = REGISTRY.register(Histogram(
+    "geomatch_db_flush_seconds", "Duração das transações de gravação em lote."
+))
+DB_FLUSH_ROWS = REGISTRY.register(Counter(
+    "geomatch_db_flush_rows_total", "Endereços gravados pelas transações em lote."
+))
+EXPORT_ROWS = REGISTRY.register(Counter(
+    "geomatch_export_rows_total", "Linhas exportadas por formato.", ["format"]
+))
+EXPORT_SECONDS = REGISTRY.register(Histogram(
+    "geomatch_export_seconds", "Duração total das exportações em streaming.", ["format"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+))
+
+
+def register_callback(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str],
+    collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    kind: str = "gauge",
+) -> None:
+    """
+    Registra um coletor lido a cada consulta de ``/api/metrics``.
+
+    Args:
+        name: Nome da métrica; se já existir, o coletor é somado aos anteriores
+        documentation: Texto do ``# HELP``
+        labelnames: Nomes dos rótulos
+        collect: Função que retorna pares (valores dos rótulos, valor)
+        kind: Tipo Prometheus (``gauge`` ou ``counter``)
+    """
+    existing = REGISTRY.get(name)
+    if isinstance(existing, CallbackMetric):
+        existing.collectors.append(collect)
+        return
+    REGISTRY.register(CallbackMetric(name, documentation, labelnames, collect, kind))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Float, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON, Float, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -7,11 +7,23 @@ from .database import Base
 
 class Address(Base):
     __tablename__ = "addresses"
-    id = Column(Integer, primary_key=True, index=True)
-    raw_address = Column(String, index=True)
-    normalized_address = Column(String, index=True)
+    __table_args__ = (
+        # Deduplicação: endereço normalizado validado a partir de um instante
+        Index("ix_addresses_normalized_address_created_at", "normalized_address", "created_at"),
+        # Listagem por status em ordem de id (paginação por chave)
+        Index("ix_addresses_status_id", "status", "id"),
+        # Exportações filtradas por status e/ou período
+        Index("ix_addresses_status_created_at", "status", "created_at"),
+        Index("ix_addresses_created_at", "created_at"),
+    )
+    id = Column(Integer, primary_key=True)
+    raw_address = Column(String)
+    normalized_address = Column(String)
     cep = Column(String, index=True, nullable=True)
     status = Column(String, default="processed")
+    # Melhor resultado de provedor, mantido pelo AddressBatchWriter na gravação
+    best_score = Column(Float, nullable=True)
+    winner_provider = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     provider_results = relationship("ProviderResult", back_populates="address")
@@ -19,8 +31,8 @@ class Address(Base):
 
 class ProviderResult(Base):
     __tablename__ = "provider_results"
-    id = Column(Integer, primary_key=True, index=True)
-    address_id = Column(Integer, ForeignKey("addresses.id"))
+    id = Column(Integer, primary_key=True)
+    address_id = Column(Integer, ForeignKey("addresses.id"), index=True)
     provider_name = Column(String, index=True)
     matched_address = Column(String)
     cep = Column(String, nullable=True)
@@ -37,3 +49,52 @@ class AuditLog(Base):
     event = Column(String)
     details = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class UploadJob(Base):
+    __tablename__ = "upload_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String)  # csv | sql | webhook
+    filename = Column(String, nullable=True)
+    status = Column(String, default="queued", index=True)  # queued | running | completed | failed
+    # Chave enviada pelo cliente (header Idempotency-Key): reenvios retornam o mesmo job
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)
+    callback_url = Column(String, nullable=True)
+    callback_status = Column(String, nullable=True)  # pending | delivered | failed
+    # Worker que detém o job e até quando (ver app.services.jobs.claim_job)
+    owner = Column(String, nullable=True)
+    lease_until = Column(DateTime, nullable=True)
+    total_rows = Column(Integer, default=0)
+    processed_rows = Column(Integer, default=0)
+    error_count = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    rows = relationship("UploadJobRow", back_populates="job")
+
+
+class UploadJobRow(Base):
+    """Endereço de entrada de um job; ``address_id`` é preenchido quando o chunk é gravado."""
+    __tablename__ = "upload_job_rows"
+    __table_args__ = (UniqueConstraint("job_id", "seq"),)
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("upload_jobs.id"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    raw_address = Column(String)
+    address_id = Column(Integer, ForeignKey("addresses.id"), nullable=True)
+
+    job = relationship("UploadJob", back_populates="rows")
+    address = relationship("Address")
+
+
+class ReferenceAddress(Base):
+    """Endereço conhecido usado como base de comparação pelo índice de referência."""
+    __tablename__ = "reference_addresses"
+    id = Column(Integer, primary_key=True)
+    address = Column(String, nullable=False)
+    cep = Column(String, index=True, nullable=True)
+    city = Column(String, nullable=True)
+    uf = Column(String(2), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,8 +1,11 @@
 from typing import List
 
+from .base import as_async_provider
 from .local_provider import LocalProvider
 from .dummy_provider import DummyProvider
 from .viacep_provider import ViaCepProvider
+from .offline_cep_provider import OfflineCepProvider
+from .reference_provider import ReferenceProvider
 
 
 def get_providers(names: List[str]):
@@ -10,6 +13,8 @@ def get_providers(names: List[str]):
         "local": LocalProvider,
         "dummy": DummyProvider,
         "viacep": ViaCepProvider,
+        "offline_cep": OfflineCepProvider,
+        "reference": ReferenceProvider,
     }
     providers = []
     for n in names:
@@ -17,3 +22,8 @@ def get_providers(names: List[str]):
         if cls:
             providers.append(cls())
     return providers
+
+
+def get_async_providers(names: List[str]):
+    """Como ``get_providers``, mas adapta provedores síncronos para a interface assíncrona."""
+    return [as_async_provider(p) for p in get_providers(names)]
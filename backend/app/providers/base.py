@@ -1,5 +1,10 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
+
+
+class ProviderUnavailable(ValueError):
+    """Falha transitória do provedor (timeout, erro HTTP, circuito aberto)."""
 
 
 class Provider(ABC):
@@ -9,3 +14,90 @@ class Provider(ABC):
     def validate(self, address: str) -> Dict[str, Any]:
         """Valida/corresponde um endereço. Retorna dict com matched_address, score, metadata."""
         raise NotImplementedError
+
+    def applies(self, address: str) -> bool:
+        """Indica, sem consultar nada, se o provedor pode responder para o endereço."""
+        return True
+
+    def validate_many(self, addresses: List[str]) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Valida vários endereços; provedores podem sobrescrever para pontuar em lote.
+
+        Returns:
+            Lista na mesma ordem da entrada, com falhas retornadas como exceção
+        """
+        out = []
+        for address in addresses:
+            try:
+                out.append(self.validate(address))
+            except Exception as ex:
+                out.append(ex)
+        return out
+
+
+class AsyncProvider(ABC):
+    """Interface assíncrona de provedores (I/O não bloqueante no event loop)."""
+    name: str
+
+    @abstractmethod
+    async def validate(self, address: str) -> Dict[str, Any]:
+        """Mesmo contrato de ``Provider.validate``."""
+        raise NotImplementedError
+
+    def applies(self, address: str) -> bool:
+        """Mesmo contrato de ``Provider.applies``."""
+        return True
+
+    async def validate_many(
+        self, addresses: List[str], concurrency: int = 10
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Valida vários endereços concorrentemente, limitado por um semáforo.
+
+        Returns:
+            Lista na mesma ordem da entrada; falhas são retornadas como a
+            exceção correspondente em vez de propagadas
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(address: str):
+            async with semaphore:
+                return await self.validate(address)
+
+        return await asyncio.gather(*(run(a) for a in addresses), return_exceptions=True)
+
+
+class ThreadPoolProviderAdapter(AsyncProvider):
+    """Expõe um ``Provider`` síncrono pela interface assíncrona usando o executor do loop."""
+
+    def __init__(self, provider: Provider):
+        self.provider = provider
+        self.name = provider.name
+
+    def applies(self, address: str) -> bool:
+        return self.provider.applies(address)
+
+    async def validate(self, address: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.provider.validate, address)
+
+    async def validate_many(
+        self, addresses: List[str], concurrency: int = 10
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        # Divide a entrada em no máximo `concurrency` fatias: um salto de thread
+        # por fatia em vez de um por endereço
+        if not addresses:
+            return []
+        loop = asyncio.get_running_loop()
+        size = -(-len(addresses) // max(1, concurrency))
+        slices = [addresses[i:i + size] for i in range(0, len(addresses), size)]
+        parts = await asyncio.gather(
+            *(loop.run_in_executor(None, self.provider.validate_many, s) for s in slices)
+        )
+        return [r for part in parts for r in part]
+
+
+def as_async_provider(provider: Union[Provider, AsyncProvider]) -> AsyncProvider:
+    if isinstance(provider, AsyncProvider):
+        return provider
+    return ThreadPoolProviderAdapter(provider)
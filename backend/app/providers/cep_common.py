@@ -0,0 +1,80 @@
+"""
+Montagem do resultado de provedores baseados em dados de CEP (formato ViaCEP)
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..services.matching import normalize_address, normalize_many, similarity_score, batch_similarity_scores
+
+# Campos de endereço retornados pelo ViaCEP e guardados no índice offline
+CEP_FIELDS = ("logradouro", "complemento", "bairro", "localidade", "uf", "ibge", "ddd")
+
+
+def cep_matched_address(data: Dict[str, Any]) -> str:
+    """Monta o endereço completo a partir dos campos do CEP."""
+    matched_parts = []
+    if data.get('logradouro'):
+        matched_parts.append(data['logradouro'])
+    if data.get('bairro'):
+        matched_parts.append(data['bairro'])
+    if data.get('localidade'):
+        matched_parts.append(data['localidade'])
+    if data.get('uf'):
+        matched_parts.append(data['uf'])
+    return ", ".join(matched_parts)
+
+
+def build_cep_result(
+    address: str, clean_cep: str, data: Dict[str, Any], source: str, score: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Monta matched_address, score e metadata a partir dos dados de um CEP
+
+    Args:
+        address: Endereço de entrada
+        clean_cep: CEP normalizado (8 dígitos)
+        data: Campos do CEP (logradouro, bairro, localidade, uf, ...)
+        source: Nome da origem gravado em metadata
+        score: Score já calculado (ex.: em lote); calculado aqui se omitido
+
+    Returns:
+        Dicionário com matched_address, score e metadata
+    """
+    matched_address = cep_matched_address(data)
+
+    # Calcula similaridade
+    if score is None:
+        score = similarity_score(normalize_address(address), normalize_address(matched_address))
+
+    metadata = {
+        "source": source,
+        "cep": clean_cep,
+        "cep_formatted": f"{clean_cep[:5]}-{clean_cep[5:]}",
+    }
+    for field in CEP_FIELDS:
+        metadata[field] = data.get(field, '')
+    return {
+        "matched_address": matched_address,
+        "score": score,
+        "metadata": metadata,
+    }
+
+
+def build_cep_results(items: List[Tuple[str, str, Dict[str, Any]]], source: str) -> List[Dict[str, Any]]:
+    """
+    Versão em lote de ``build_cep_result``: os scores são calculados de uma vez.
+
+    Args:
+        items: Tuplas (endereço, CEP normalizado, dados do CEP)
+        source: Nome da origem gravado em metadata
+
+    Returns:
+        Resultados na mesma ordem de ``items``
+    """
+    scores = batch_similarity_scores(
+        normalize_many(address for address, _, _ in items),
+        normalize_many(cep_matched_address(data) for _, _, data in items),
+    ).tolist()
+    return [
+        build_cep_result(address, clean_cep, data, source, score)
+        for (address, clean_cep, data), score in zip(items, scores)
+    ]
@@ -0,0 +1,114 @@
+"""
+Índice binário de CEPs ordenado e mapeado em memória (mmap)
+
+Formato do arquivo (inteiros little-endian):
+    cabeçalho: magic (8 bytes) | quantidade N (uint32) | reservado (uint32)
+    chaves:    N x uint32 com o CEP numérico, em ordem crescente
+    offsets:   (N + 1) x uint32 com o início de cada registro no bloco de dados
+    dados:     registros UTF-8 com os campos de CEP_FIELDS separados por \\x1f
+
+Uso (compilação única a partir da pasta backend):
+    python -m app.providers.cep_index compile ceps.csv data/cep_index.bin
+"""
+import csv
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Optional
+
+from .cep_common import CEP_FIELDS
+from ..utils.validators import normalize_cep
+
+MAGIC = b"GMCEPIX1"
+_HEADER = struct.Struct("<8sII")
+_UINT = struct.Struct("<I")
+_SEP = "\x1f"
+
+
+def compile_cep_index(src_path: str, out_path: str, delimiter: str = ",") -> int:
+    """
+    Compila um CSV de CEPs (colunas ``cep`` e os campos de ``CEP_FIELDS``) no
+    formato binário. CEPs repetidos mantêm a última ocorrência.
+
+    Returns:
+        Quantidade de CEPs gravados
+    """
+    records: Dict[int, bytes] = {}
+    with open(src_path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            cep = normalize_cep(row.get("cep") or "")
+            if len(cep) != 8:
+                continue
+            fields = [(row.get(name) or "").replace(_SEP, " ") for name in CEP_FIELDS]
+            records[int(cep)] = _SEP.join(fields).encode("utf-8")
+
+    keys = sorted(records)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, len(keys), 0))
+        out.write(struct.pack(f"<{len(keys)}I", *keys))
+        offset = 0
+        offsets = [0]
+        for k in keys:
+            offset += len(records[k])
+            offsets.append(offset)
+        out.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for k in keys:
+            out.write(records[k])
+    os.replace(tmp_path, out_path)
+    return len(keys)
+
+
+class CepIndex:
+    """
+    Leitor do índice compilado. O arquivo é mapeado somente leitura, então a
+    abertura é instantânea e as páginas são compartilhadas entre workers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"Arquivo de índice de CEP inválido: {path}")
+        self._keys_at = _HEADER.size
+        self._offsets_at = self._keys_at + 4 * self.count
+        self._data_at = self._offsets_at + 4 * (self.count + 1)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, cep: str) -> Optional[Dict[str, str]]:
+        """Busca binária pelo CEP (com ou sem hífen); retorna os campos ou None."""
+        clean = normalize_cep(cep)
+        if len(clean) != 8:
+            return None
+        target = int(clean)
+        mm, keys_at = self._mm, self._keys_at
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _UINT.unpack_from(mm, keys_at + 4 * mid)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.count or _UINT.unpack_from(mm, keys_at + 4 * lo)[0] != target:
+            return None
+        start = _UINT.unpack_from(mm, self._offsets_at + 4 * lo)[0]
+        end = _UINT.unpack_from(mm, self._offsets_at + 4 * (lo + 1))[0]
+        values = mm[self._data_at + start:self._data_at + end].decode("utf-8").split(_SEP)
+        return dict(zip(CEP_FIELDS, values))
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5) or sys.argv[1] != "compile":
+        print("uso: python -m app.providers.cep_index compile <ceps.csv> <saida.bin> [delimitador]")
+        sys.exit(2)
+    total = compile_cep_index(sys.argv[2], sys.argv[3], *(sys.argv[4:5]))
+    print(f"{total} CEPs gravados em {sys.argv[3]}")
@@ -1,5 +1,5 @@
 from .base import Provider
-from ..services.matching import normalize_address, similarity_score
+from ..services.matching import normalize_address, normalize_many, similarity_score, batch_similarity_scores
 
 
 class DummyProvider(Provider):
@@ -10,6 +10,16 @@ class DummyProvider(Provider):
         norm = normalize_address(address)
         suggestion = norm.replace(" rua ", " r. ")
         score = similarity_score(norm, suggestion)
+        return self._result(suggestion, score)
+
+    def validate_many(self, addresses):
+        norms = normalize_many(addresses)
+        suggestions = [n.replace(" rua ", " r. ") for n in norms]
+        scores = batch_similarity_scores(norms, suggestions).tolist()
+        return [self._result(s, score) for s, score in zip(suggestions, scores)]
+
+    @staticmethod
+    def _result(suggestion: str, score: float):
         return {
             "matched_address": suggestion,
             "score": score,
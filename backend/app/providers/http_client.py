@@ -0,0 +1,39 @@
+"""
+Cliente HTTP assíncrono compartilhado (pool de conexões) para provedores
+"""
+import asyncio
+import weakref
+
+import httpx
+
+from ..config import HTTP_MAX_CONNECTIONS
+
+# Um cliente por event loop: o da API e o dos workers de jobs (thread própria)
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente compartilhado do event loop atual, criando-o se necessário.
+
+    As conexões do pool ficam presas ao loop em que foram abertas, então cada
+    loop (ex.: o dos workers de jobs, ou um TestClient sem contexto) tem o seu.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Fecha o cliente do event loop atual."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
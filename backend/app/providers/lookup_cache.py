@@ -0,0 +1,377 @@
+"""
+Cache de consultas para provedores HTTP: LRU em memória + tabela SQLite em disco
+
+Uso (pré-aquecimento a partir da pasta backend):
+    python -m app.providers.lookup_cache prewarm viacep ceps.csv
+"""
+import asyncio
+import csv
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import (
+    CEP_CACHE_FLUSH_ROWS,
+    CEP_CACHE_FLUSH_SECONDS,
+    CEP_CACHE_PATH,
+    CEP_CACHE_MAX_ENTRIES,
+    CEP_CACHE_TTL_SECONDS,
+    CEP_CACHE_NEGATIVE_TTL_SECONDS,
+)
+from ..metrics import register_callback
+
+logger = logging.getLogger("lookup_cache")
+
+# Marcador de resposta negativa (ex.: {"erro": true} do ViaCEP)
+NEGATIVE = {"__negative__": True}
+
+
+class LookupCache:
+    """
+    Cache em dois níveis com TTL.
+
+    - Nível 1: ``OrderedDict`` em memória com despejo LRU.
+    - Nível 2 (opcional): tabela ``lookup_cache`` em um arquivo SQLite, chaveada
+      por (namespace, chave), que sobrevive a reinícios e é compartilhada entre workers.
+
+    Respostas negativas são guardadas com TTL próprio (normalmente menor).
+    Chamadas concorrentes para a mesma chave ausente compartilham uma única busca.
+
+    No caminho assíncrono (``get_or_fetch``) o disco é lido fora do event loop e
+    as entradas novas são gravadas em lote (``flush``), a cada ``flush_rows``
+    entradas ou ``flush_seconds`` segundos, também fora do loop.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        path: Optional[str] = CEP_CACHE_PATH,
+        max_entries: int = CEP_CACHE_MAX_ENTRIES,
+        ttl: float = CEP_CACHE_TTL_SECONDS,
+        negative_ttl: float = CEP_CACHE_NEGATIVE_TTL_SECONDS,
+        flush_rows: int = CEP_CACHE_FLUSH_ROWS,
+        flush_seconds: float = CEP_CACHE_FLUSH_SECONDS,
+    ):
+        self.namespace = namespace
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.flush_rows = max(1, flush_rows)
+        self.flush_seconds = flush_seconds
+        # Entradas ainda não gravadas em disco: chave -> (valor, expira em)
+        self._pending: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._last_flush = time.monotonic()
+        # Serializa o uso da conexão SQLite entre o event loop e as threads de I/O
+        self._disk_lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lookup_cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna o valor (ou ``NEGATIVE``) se presente e válido, senão None."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._conn is not None:
+            value = self._get_disk(key, now)
+        return self._count_miss(value)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Como ``get``, com a leitura do disco em uma thread."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._conn is not None:
+            value = await asyncio.to_thread(self._get_disk, key, now)
+        return self._count_miss(value)
+
+    def set(self, key: str, value: Dict[str, Any], negative: bool = False) -> None:
+        self.set_many([(key, value)], negative=negative)
+
+    def set_many(self, items, negative: bool = False) -> int:
+        """Grava vários pares (chave, valor) em uma única transação."""
+        expires_at = time.time() + (self.negative_ttl if negative else self.ttl)
+        rows = []
+        with self._lock:
+            for key, value in items:
+                value = NEGATIVE if negative else value
+                self._remember(key, value, expires_at)
+                self._pending.pop(key, None)
+                rows.append((self.namespace, key, json.dumps(value), expires_at))
+        self._write(rows)
+        return len(rows)
+
+    async def aset(self, key: str, value: Dict[str, Any], negative: bool = False) -> None:
+        """Guarda na memória e enfileira a gravação em disco, feita em lote por ``flush``."""
+        expires_at = time.time() + (self.negative_ttl if negative else self.ttl)
+        value = NEGATIVE if negative else value
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._conn is None:
+                return
+            self._pending[key] = (value, expires_at)
+            due = (
+                len(self._pending) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_seconds
+            )
+        if due:
+            await asyncio.to_thread(self.flush)
+
+    async def aflush(self) -> None:
+        """``flush`` em uma thread, se houver entradas pendentes."""
+        if self._pending:
+            await asyncio.to_thread(self.flush)
+
+    def flush(self) -> int:
+        """
+        Grava em disco, em uma transação, as entradas enfileiradas por ``aset``.
+
+        Returns:
+            Quantidade de entradas gravadas
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        rows = [(self.namespace, key, json.dumps(value), exp) for key, (value, exp) in pending.items()]
+        self._write(rows)
+        return len(rows)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        is_negative: Callable[[Dict[str, Any]], bool] = lambda v: False,
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda v: True,
+    ) -> Dict[str, Any]:
+        """
+        Retorna o valor em cache ou executa ``fetch`` e guarda o resultado.
+
+        Exceções de ``fetch`` (timeout, erro HTTP) não são guardadas, nem
+        valores para os quais ``cacheable`` é falso (ex.: resultado parcial).
+        Valores para os quais ``is_negative`` é verdadeiro são guardados como
+        ``NEGATIVE`` com TTL negativo e retornados como ``NEGATIVE``.
+        """
+        cached = await self.aget(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            return await asyncio.shield(pending)
+        if pending is not None:
+            # Busca em andamento em outro event loop (workers de jobs): não dá para aguardá-la daqui
+            return await self._fetch_and_store(key, fetch, is_negative, cacheable)
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fetch_and_store(key, fetch, is_negative, cacheable)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as ex:
+            future.set_exception(ex)
+            # Evita aviso de exceção não recuperada quando ninguém mais aguardava
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        is_negative: Callable[[Dict[str, Any]], bool],
+        cacheable: Callable[[Dict[str, Any]], bool],
+    ) -> Dict[str, Any]:
+        value = await fetch()
+        if is_negative(value):
+            await self.aset(key, value, negative=True)
+            return NEGATIVE
+        if cacheable(value):
+            await self.aset(key, value)
+        return value
+
+    def purge_expired(self) -> int:
+        """Remove entradas expiradas dos dois níveis; retorna quantas saíram do disco."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (exp, _) in self._memory.items() if exp <= now]:
+                del self._memory[key]
+        if self._conn is None:
+            return 0
+        with self._disk_lock:
+            cur = self._conn.execute(
+                "DELETE FROM lookup_cache WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, now),
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def prewarm_from_file(self, path: str, key_field: str = "cep", key_func=None) -> int:
+        """
+        Carrega entradas de um arquivo .csv (com cabeçalho), .json (lista) ou
+        .jsonl/.ndjson. Cada registro deve ter ``key_field``; os demais campos
+        formam o valor. Registros com ``erro`` verdadeiro viram entradas negativas.
+
+        Returns:
+            Quantidade de entradas carregadas
+        """
+        key_func = key_func or (lambda k: k)
+        positives, negatives = [], []
+        for record in _read_records(path):
+            raw_key = record.get(key_field)
+            if not raw_key:
+                continue
+            key = key_func(str(raw_key))
+            if str(record.get("erro", "")).lower() in ("true", "1"):
+                negatives.append((key, record))
+            else:
+                positives.append((key, record))
+        return self.set_many(positives) + self.set_many(negatives, negative=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries_memory": len(self._memory),
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_ratio": ((self.hits_memory + self.hits_disk) / lookups) if lookups else 0.0,
+        }
+
+    def _get_memory(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return entry[1]
+                del self._memory[key]
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None and pending[1] > now:
+            # Saiu da memória (LRU) antes de ser gravada em disco
+            value, expires_at = pending
+        else:
+            with self._disk_lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM lookup_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            value, expires_at = json.loads(row[0]), row[1]
+            if value == NEGATIVE:
+                value = NEGATIVE
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self.hits_disk += 1
+        return value
+
+    def _count_miss(self, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if value is None:
+            with self._lock:
+                self.misses += 1
+        return value
+
+    def _write(self, rows) -> None:
+        if self._conn is None or not rows:
+            return
+        with self._disk_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO lookup_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+def _read_records(path: str):
+    lower = path.lower()
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if lower.endswith(".csv"):
+            yield from csv.DictReader(f)
+        elif lower.endswith(".json"):
+            yield from json.load(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+_caches: Dict[str, LookupCache] = {}
+
+
+def get_lookup_cache(namespace: str, **options) -> LookupCache:
+    """
+    Retorna o cache compartilhado do namespace (um por processo).
+
+    ``options`` (argumentos de ``LookupCache``) só valem na criação do cache.
+    """
+    cache = _caches.get(namespace)
+    if cache is None:
+        cache = _caches[namespace] = LookupCache(namespace, **options)
+    return cache
+
+
+def flush_lookup_caches() -> None:
+    """Grava em disco as entradas pendentes de todos os caches (ex.: no desligamento)."""
+    for cache in list(_caches.values()):
+        cache.flush()
+
+
+def _cache_requests():
+    for name, cache in list(_caches.items()):
+        yield (name, "hit_memory"), cache.hits_memory
+        yield (name, "hit_disk"), cache.hits_disk
+        yield (name, "miss"), cache.misses
+
+
+register_callback(
+    "geomatch_cache_requests_total",
+    "Consultas aos caches por resultado.",
+    ["namespace", "result"],
+    _cache_requests,
+    kind="counter",
+)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "prewarm":
+        print("uso: python -m app.providers.lookup_cache prewarm <namespace> <arquivo>")
+        sys.exit(2)
+    from ..utils.validators import normalize_cep
+
+    loaded = get_lookup_cache(sys.argv[2]).prewarm_from_file(sys.argv[3], key_func=normalize_cep)
+    print(f"{loaded} entradas carregadas")
@@ -0,0 +1,80 @@
+"""
+Provider offline que consulta uma base local de CEPs (índice mapeado em memória)
+"""
+import os
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from .base import Provider
+from .cep_common import build_cep_result, build_cep_results
+from .cep_index import CepIndex
+from ..config import CEP_INDEX_PATH
+from ..utils.validators import extract_cep, normalize_cep
+
+_index: Optional[CepIndex] = None
+
+
+def _get_index(path: str) -> CepIndex:
+    # Um único mapeamento por processo, compartilhado por todas as instâncias
+    global _index
+    if _index is None or _index.path != path:
+        if not os.path.exists(path):
+            raise ValueError(f"Base local de CEP não encontrada: {path}")
+        _index = CepIndex(path)
+    return _index
+
+
+class OfflineCepProvider(Provider):
+    """
+    Provider que valida endereços pelo CEP sem acesso à rede
+    """
+    name = "offline_cep"
+
+    def __init__(self, index_path: str = CEP_INDEX_PATH):
+        self.index_path = index_path
+
+    def applies(self, address: str) -> bool:
+        # Sem CEP no texto não há o que consultar
+        return extract_cep(address) is not None
+
+    def validate(self, address: str) -> Dict[str, Any]:
+        """
+        Valida endereço consultando o índice local de CEPs
+
+        Args:
+            address: Endereço a validar (deve conter CEP)
+
+        Returns:
+            Dicionário com matched_address, score e metadata
+
+        Raises:
+            ValueError: Se CEP não for encontrado, não existir na base ou a base não existir
+        """
+        clean_cep, data = self._lookup(address)
+        return build_cep_result(address, clean_cep, data, self.name)
+
+    def validate_many(self, addresses: List[str]) -> List[Union[Dict[str, Any], Exception]]:
+        # Consulta o índice endereço a endereço e pontua os encontrados em lote
+        out: List[Union[Dict[str, Any], Exception]] = []
+        found: List[Tuple[int, Tuple[str, str, Dict[str, Any]]]] = []
+        for address in addresses:
+            try:
+                clean_cep, data = self._lookup(address)
+            except Exception as ex:
+                out.append(ex)
+                continue
+            found.append((len(out), (address, clean_cep, data)))
+            out.append(None)
+        for (pos, _), result in zip(found, build_cep_results([item for _, item in found], self.name)):
+            out[pos] = result
+        return out
+
+    def _lookup(self, address: str) -> Tuple[str, Dict[str, Any]]:
+        cep = extract_cep(address)
+        if not cep:
+            raise ValueError("CEP não encontrado no endereço")
+
+        clean_cep = normalize_cep(cep)
+        data = _get_index(self.index_path).get(clean_cep)
+        if data is None:
+            raise ValueError(f"CEP inválido: {cep}")
+        return clean_cep, data
@@ -0,0 +1,53 @@
+"""
+Provider que compara o endereço com a base própria de endereços de referência
+"""
+from typing import Dict, Any, List, Union
+
+from .base import Provider
+from ..services.reference_index import ReferenceMatch, get_reference_index
+
+
+class ReferenceProvider(Provider):
+    """
+    Provider que retorna o endereço de referência mais parecido com a entrada
+    """
+    name = "reference"
+
+    def validate(self, address: str) -> Dict[str, Any]:
+        """
+        Busca o melhor candidato no índice de referência
+
+        Args:
+            address: Endereço a validar
+
+        Returns:
+            Dicionário com matched_address, score e metadata
+
+        Raises:
+            ValueError: Se nenhum candidato for encontrado
+        """
+        matches = get_reference_index().match(address, k=1)
+        if not matches:
+            raise ValueError("Nenhum endereço de referência encontrado")
+        return self._result(matches[0])
+
+    def validate_many(self, addresses: List[str]) -> List[Union[Dict[str, Any], Exception]]:
+        index = get_reference_index()
+        out: List[Union[Dict[str, Any], Exception]] = []
+        for matches in index.match_many(addresses, k=1):
+            out.append(self._result(matches[0]) if matches else ValueError("Nenhum endereço de referência encontrado"))
+        return out
+
+    def _result(self, match: ReferenceMatch) -> Dict[str, Any]:
+        rec = match.record
+        return {
+            "matched_address": rec.address,
+            "score": match.score,
+            "metadata": {
+                "source": self.name,
+                "reference_id": rec.id,
+                "cep": rec.cep,
+                "city": rec.city,
+                "uf": rec.uf,
+            },
+        }
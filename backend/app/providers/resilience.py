@@ -0,0 +1,293 @@
+"""
+Camada de resiliência para chamadas de rede dos provedores
+
+Cada provedor remoto tem uma ``ResiliencePolicy`` compartilhada pelo processo,
+que combina:
+
+- token bucket: limita a taxa de chamadas (``{NOME}_RATE_LIMIT`` por segundo);
+- circuit breaker: após falhas consecutivas, falha imediatamente por um tempo
+  e depois libera uma chamada de teste (half-open);
+- timeout adaptativo: derivado dos percentis de latência das chamadas recentes;
+- retry com jitter: novas tentativas apenas para falhas transitórias.
+
+As configurações globais podem ser sobrescritas por provedor com variáveis
+de ambiente prefixadas pelo nome (ex.: ``VIACEP_RATE_LIMIT=10``).
+"""
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from ..config import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_SECONDS,
+    PROVIDER_BURST,
+    PROVIDER_RATE_LIMIT,
+    PROVIDER_RETRIES,
+    PROVIDER_RETRY_BASE_DELAY,
+    PROVIDER_TIMEOUT_MAX,
+    PROVIDER_TIMEOUT_MIN,
+)
+from ..metrics import PROVIDER_REQUEST_SECONDS, register_callback
+from .base import ProviderUnavailable
+
+T = TypeVar("T")
+
+# Amostras de latência usadas nos percentis e fator aplicado ao p99
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+TIMEOUT_P99_FACTOR = 3.0
+
+
+class CircuitOpenError(ProviderUnavailable):
+    """Chamada recusada porque o circuito do provedor está aberto."""
+
+
+class TokenBucket:
+    """
+    Token bucket simples: ``rate`` tokens por segundo, até ``capacity`` acumulados
+    (``capacity`` 0 usa ``rate``). ``rate`` <= 0 desativa a limitação.
+    """
+
+    def __init__(self, rate: float, capacity: float = 0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waits = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        if self.rate <= 0:
+            return float("inf")
+        self._refill()
+        return self.tokens
+
+    async def acquire(self) -> None:
+        """Consome um token, aguardando a reposição se necessário."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        # Reserva o token já; chamadas concorrentes formam fila pelo saldo negativo
+        self.tokens -= 1
+        if self.tokens < 0:
+            self.waits += 1
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class CircuitBreaker:
+    """Circuit breaker com estados closed, open e half_open."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Indica se uma chamada pode seguir; no half-open só uma por vez."""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def release(self) -> None:
+        """Libera a chamada de teste do half-open sem registrar resultado."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class ResiliencePolicy:
+    """
+    Aplica rate limit, circuit breaker, timeout adaptativo e retry a uma chamada.
+
+    Apenas ``ProviderUnavailable`` e timeouts contam como falha; outras
+    exceções (ex.: CEP inexistente) são respostas válidas do provedor e
+    passam direto, sem retry.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_limit: float = PROVIDER_RATE_LIMIT,
+        burst: float = PROVIDER_BURST,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = BREAKER_RESET_SECONDS,
+        retries: int = PROVIDER_RETRIES,
+        retry_base_delay: float = PROVIDER_RETRY_BASE_DELAY,
+        timeout_min: float = PROVIDER_TIMEOUT_MIN,
+        timeout_max: float = PROVIDER_TIMEOUT_MAX,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate_limit, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self.retries = max(0, retries)
+        self.retry_base_delay = retry_base_delay
+        self.timeout_min = timeout_min
+        self.timeout_max = timeout_max
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._sorted: Optional[list] = None
+        self.counters = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0, "retries": 0, "short_circuited": 0}
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._latencies)
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+    def current_timeout(self) -> float:
+        """Timeout da próxima tentativa: fator sobre o p99 recente, limitado a [min, max]."""
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return self.timeout_max
+        return min(self.timeout_max, max(self.timeout_min, self.percentile(0.99) * TIMEOUT_P99_FACTOR))
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executa ``fn`` com as proteções da política.
+
+        Args:
+            fn: Função sem argumentos que cria a corrotina da chamada de rede
+
+        Returns:
+            O resultado de ``fn``
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto
+            ProviderUnavailable: Se todas as tentativas falharem
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.counters["short_circuited"] += 1
+                raise CircuitOpenError(f"Circuito aberto para {self.name}; chamada não realizada")
+            try:
+                await self.bucket.acquire()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            self.counters["calls"] += 1
+            timeout = self.current_timeout()
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(fn(), timeout)
+            except asyncio.TimeoutError:
+                self.counters["timeouts"] += 1
+                error: ProviderUnavailable = ProviderUnavailable(
+                    f"Timeout ({timeout:.2f}s) ao consultar {self.name}"
+                )
+            except ProviderUnavailable as ex:
+                error = ex
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception:
+                # O provedor respondeu (ex.: CEP inexistente): conta como disponível
+                self._record_success(started)
+                raise
+            else:
+                self._record_success(started)
+                return result
+
+            self.counters["failures"] += 1
+            self.breaker.record_failure()
+            if attempt >= self.retries or self.breaker.state == "open":
+                raise error
+            attempt += 1
+            self.counters["retries"] += 1
+            # Full jitter: espera aleatória até o backoff exponencial
+            await asyncio.sleep(random.uniform(0, self.retry_base_delay * 2 ** attempt))
+
+    def _record_success(self, started: float) -> None:
+        elapsed = time.monotonic() - started
+        PROVIDER_REQUEST_SECONDS.observe(elapsed, provider=self.name)
+        self._latencies.append(elapsed)
+        self._sorted = None
+        self.counters["successes"] += 1
+        self.breaker.record_success()
+
+    def status(self) -> Dict[str, Any]:
+        tokens = self.bucket.available()
+        return {
+            "name": self.name,
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "rate_limit": self.bucket.rate if self.bucket.rate > 0 else None,
+            "tokens_available": None if tokens == float("inf") else round(tokens, 2),
+            "rate_limited_waits": self.bucket.waits,
+            "timeout_seconds": round(self.current_timeout(), 3),
+            "latency_p50": self.percentile(0.5),
+            "latency_p95": self.percentile(0.95),
+            "latency_p99": self.percentile(0.99),
+            **self.counters,
+        }
+
+
+def _setting(name: str, key: str, default: Any) -> Any:
+    value = os.getenv(f"{name.upper()}_{key}")
+    return type(default)(value) if value is not None else default
+
+
+_policies: Dict[str, ResiliencePolicy] = {}
+
+
+def get_resilience_policy(name: str) -> ResiliencePolicy:
+    """Política do provedor ``name``, compartilhada por todas as instâncias do processo."""
+    policy = _policies.get(name)
+    if policy is None:
+        policy = _policies[name] = ResiliencePolicy(
+            name,
+            rate_limit=_setting(name, "RATE_LIMIT", PROVIDER_RATE_LIMIT),
+            burst=_setting(name, "BURST", PROVIDER_BURST),
+            failure_threshold=_setting(name, "BREAKER_FAILURE_THRESHOLD", BREAKER_FAILURE_THRESHOLD),
+            reset_seconds=_setting(name, "BREAKER_RESET_SECONDS", BREAKER_RESET_SECONDS),
+            retries=_setting(name, "RETRIES", PROVIDER_RETRIES),
+            retry_base_delay=_setting(name, "RETRY_BASE_DELAY", PROVIDER_RETRY_BASE_DELAY),
+            timeout_min=_setting(name, "TIMEOUT_MIN", PROVIDER_TIMEOUT_MIN),
+            timeout_max=_setting(name, "TIMEOUT_MAX", PROVIDER_TIMEOUT_MAX),
+        )
+    return policy
+
+
+def all_policies() -> Dict[str, ResiliencePolicy]:
+    return dict(_policies)
+
+
+def _policy_counters():
+    for name, policy in list(_policies.items()):
+        for key, value in policy.counters.items():
+            yield (name, key), value
+
+
+register_callback(
+    "geomatch_provider_requests_total",
+    "Chamadas de rede dos provedores remotos por resultado (contadores da política de resiliência).",
+    ["provider", "result"],
+    _policy_counters,
+    kind="counter",
+)
@@ -1,25 +1,37 @@
 """
 Provider real que integra com a API do ViaCEP
 """
-import requests
-from typing import Dict, Any
+import asyncio
+import httpx
+from typing import Dict, Any, List, Tuple, Union
 
-from .base import Provider
-from ..services.matching import normalize_address, similarity_score
+from .base import AsyncProvider, ProviderUnavailable
+from .cep_common import build_cep_result, build_cep_results
+from .http_client import get_http_client
+from .lookup_cache import NEGATIVE, get_lookup_cache
+from .resilience import get_resilience_policy
+from ..config import VIACEP_URL
 from ..utils.validators import extract_cep, normalize_cep
 
 
-class ViaCepProvider(Provider):
+class ViaCepProvider(AsyncProvider):
     """
     Provider que valida endereços usando a API do ViaCEP
     """
     name = "viacep"
     
     def __init__(self):
-        self.api_url = "https://viacep.com.br/ws/{}/json/"
+        self.api_url = VIACEP_URL
         self.timeout = 5  # segundos
+        self.cache = get_lookup_cache(self.name)
+        # Rate limit, circuit breaker, timeout adaptativo e retry das chamadas à API
+        self.policy = get_resilience_policy(self.name)
     
-    def validate(self, address: str) -> Dict[str, Any]:
+    def applies(self, address: str) -> bool:
+        # Sem CEP no texto não há o que consultar
+        return extract_cep(address) is not None
+
+    async def validate(self, address: str) -> Dict[str, Any]:
         """
         Valida endereço consultando a API do ViaCEP
         
@@ -32,6 +44,39 @@ class ViaCepProvider(Provider):
         Raises:
             ValueError: Se CEP não for encontrado ou for inválido
         """
+        clean_cep, data = await self._lookup(address)
+        return build_cep_result(address, clean_cep, data, "viacep")
+
+    async def validate_many(
+        self, addresses: List[str], concurrency: int = 10
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Consulta os CEPs concorrentemente e calcula os scores em lote
+
+        Returns:
+            Lista na mesma ordem da entrada; falhas são retornadas como exceção
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(address: str):
+            async with semaphore:
+                return await self._lookup(address)
+
+        lookups = await asyncio.gather(*(run(a) for a in addresses), return_exceptions=True)
+        # CEPs novos do lote vão para o disco de uma vez
+        await self.cache.aflush()
+        found = [
+            (i, (address, *lookup))
+            for i, (address, lookup) in enumerate(zip(addresses, lookups))
+            if not isinstance(lookup, BaseException)
+        ]
+        out: List[Union[Dict[str, Any], Exception]] = list(lookups)
+        for (i, _), result in zip(found, build_cep_results([item for _, item in found], "viacep")):
+            out[i] = result
+        return out
+
+    async def _lookup(self, address: str) -> Tuple[str, Dict[str, Any]]:
+        """Extrai o CEP do endereço e retorna (CEP normalizado, dados do ViaCEP)."""
         # Extrai CEP do endereço
         cep = extract_cep(address)
         if not cep:
@@ -40,55 +85,34 @@ class ViaCepProvider(Provider):
         # Normaliza CEP (apenas números)
         clean_cep = normalize_cep(cep)
         
-        # Consulta API do ViaCEP
+        # Consulta o cache (memória/disco) e, em caso de ausência, a API do ViaCEP
+        data = await self.cache.get_or_fetch(
+            clean_cep,
+            lambda: self.policy.call(lambda: self._fetch(cep, clean_cep)),
+            is_negative=lambda d: bool(d.get('erro')),
+        )
+        
+        # Verifica se CEP é válido (resposta negativa, possivelmente em cache)
+        if data is NEGATIVE:
+            raise ValueError(f"CEP inválido: {cep}")
+        
+        return clean_cep, data
+    
+    async def _fetch(self, cep: str, clean_cep: str) -> Dict[str, Any]:
+        """Consulta a API do ViaCEP e retorna o JSON bruto."""
         try:
-            response = requests.get(
+            response = await get_http_client().get(
                 self.api_url.format(clean_cep),
                 timeout=self.timeout
             )
             response.raise_for_status()
-            data = response.json()
-            
-            # Verifica se CEP é válido
-            if data.get('erro'):
-                raise ValueError(f"CEP inválido: {cep}")
-            
-            # Monta endereço completo do ViaCEP
-            matched_parts = []
-            if data.get('logradouro'):
-                matched_parts.append(data['logradouro'])
-            if data.get('bairro'):
-                matched_parts.append(data['bairro'])
-            if data.get('localidade'):
-                matched_parts.append(data['localidade'])
-            if data.get('uf'):
-                matched_parts.append(data['uf'])
-            
-            matched_address = ", ".join(matched_parts)
-            
-            # Calcula similaridade
-            norm_input = normalize_address(address)
-            norm_matched = normalize_address(matched_address)
-            score = similarity_score(norm_input, norm_matched)
-            
-            return {
-                "matched_address": matched_address,
-                "score": score,
-                "metadata": {
-                    "source": "viacep",
-                    "cep": clean_cep,
-                    "cep_formatted": f"{clean_cep[:5]}-{clean_cep[5:]}",
-                    "logradouro": data.get('logradouro', ''),
-                    "complemento": data.get('complemento', ''),
-                    "bairro": data.get('bairro', ''),
-                    "localidade": data.get('localidade', ''),
-                    "uf": data.get('uf', ''),
-                    "ibge": data.get('ibge', ''),
-                    "ddd": data.get('ddd', '')
-                }
-            }
-            
-        except requests.exceptions.Timeout:
-            raise ValueError(f"Timeout ao consultar ViaCEP para o CEP: {cep}")
-        except requests.exceptions.RequestException as e:
-            raise ValueError(f"Erro ao consultar ViaCEP: {str(e)}")
+            return response.json()
+        except httpx.TimeoutException:
+            raise ProviderUnavailable(f"Timeout ao consultar ViaCEP para o CEP: {cep}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code < 500 and e.response.status_code != 429:
+                # Requisição recusada (ex.: 400 para CEP mal formado): não é indisponibilidade
+                raise ValueError(f"Erro ao consultar ViaCEP: {str(e)}")
+            raise ProviderUnavailable(f"Erro ao consultar ViaCEP: {str(e)}")
+        except httpx.HTTPError as e:
+            raise ProviderUnavailable(f"Erro ao consultar ViaCEP: {str(e)}")
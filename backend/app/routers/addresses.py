@@ -1,77 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException # type: ignore
-from sqlalchemy.orm import Session # type: ignore
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response # type: ignore
+from sqlalchemy import select # type: ignore
+from sqlalchemy.orm import Session, selectinload # type: ignore
+from typing import List, Literal, Optional, Union
 
 from ..database import get_db
 from ..models import Address
-from ..schemas import AddressOut, ProviderResultOut
+from ..schemas import AddressOut, AddressSummaryOut
 
-from ..services.matching import classify_score
+from ..services.processing import address_out_from_model
+from ..services.queries import address_page_query
+from ..utils.validators import normalize_cep
 
 router = APIRouter()
 
 
-@router.get("/addresses", response_model=List[AddressOut])
-async def list_addresses(db: Session = Depends(get_db)):
-    addrs = db.query(Address).order_by(Address.id.desc()).all()
-    out: List[AddressOut] = []
-    for a in addrs:
-        # determina o melhor resultado
-        best = None
-        for pr in a.provider_results:
-            if not best or (pr.score or 0) >= (best.score or 0):
-                best = pr
-        out.append(
-            AddressOut(
-                id=a.id,
-                raw_address=a.raw_address,
-                normalized_address=a.normalized_address,
-                cep=a.cep,
-                status=a.status,
-                winner_provider=(best.provider_name if best else None),
-                best_score=(best.score if best else None),
-                results=[
-                    ProviderResultOut(
-                        provider_name=pr.provider_name,
-                        matched_address=pr.matched_address,
-                        cep=pr.cep,
-                        score=pr.score,
-                        extra_metadata=pr.extra_metadata,
-                        classification=classify_score(pr.score),
-                    )
-                    for pr in a.provider_results
-                ],
-            )
+def _address_summaries(addrs: List[Address]) -> List[AddressSummaryOut]:
+    # Vencedor já gravado no endereço: nenhuma consulta a provider_results
+    return [
+        AddressSummaryOut(
+            id=a.id,
+            raw_address=a.raw_address,
+            normalized_address=a.normalized_address,
+            cep=a.cep,
+            status=a.status,
+            winner_provider=a.winner_provider,
+            best_score=a.best_score,
         )
-    return out
+        for a in addrs
+    ]
+
+
+@router.get("/addresses", response_model=List[Union[AddressOut, AddressSummaryOut]])
+def list_addresses(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Retorna endereços com id menor que o cursor"),
+    limit: int = Query(100, ge=1, le=1000),
+    status: Optional[str] = None,
+    cep: Optional[str] = None,
+    provider: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    view: Literal["full", "summary"] = "full",
+    db: Session = Depends(get_db),
+):
+    # Paginação por chave (id decrescente): o custo da página não depende do tamanho da tabela
+    stmt = address_page_query(
+        limit, cursor, status, normalize_cep(cep) if cep else None, provider, min_score, max_score
+    )
+    if view == "full":
+        stmt = stmt.options(selectinload(Address.provider_results))
+    addrs = db.scalars(stmt).all()
+
+    if len(addrs) == limit:
+        response.headers["X-Next-Cursor"] = str(addrs[-1].id)
+    if view == "summary":
+        return _address_summaries(addrs)
+    return [address_out_from_model(a) for a in addrs]
 
 
 @router.get("/addresses/{addr_id}", response_model=AddressOut)
-async def get_address(addr_id: int, db: Session = Depends(get_db)):
-    a = db.query(Address).filter(Address.id == addr_id).first()
+def get_address(addr_id: int, db: Session = Depends(get_db)):
+    a = db.scalars(
+        select(Address).where(Address.id == addr_id).options(selectinload(Address.provider_results))
+    ).first()
     if not a:
         raise HTTPException(status_code=404, detail="Endereço não encontrado")
-    best = None
-    for pr in a.provider_results:
-        if not best or (pr.score or 0) >= (best.score or 0):
-            best = pr
-    return AddressOut(
-        id=a.id,
-        raw_address=a.raw_address,
-        normalized_address=a.normalized_address,
-        cep=a.cep,
-        status=a.status,
-        winner_provider=(best.provider_name if best else None),
-        best_score=(best.score if best else None),
-        results=[
-            ProviderResultOut(
-                provider_name=pr.provider_name,
-                matched_address=pr.matched_address,
-                cep=pr.cep,
-                score=pr.score,
-                extra_metadata=pr.extra_metadata,
-                classification=classify_score(pr.score),
-            )
-            for pr in a.provider_results
-        ],
-    )
+    return address_out_from_model(a)
@@ -1,43 +1,103 @@
 import csv
 import io
-from fastapi import APIRouter, Depends
-from fastapi.responses import StreamingResponse, PlainTextResponse
-from sqlalchemy.orm import Session
+import time
+from datetime import datetime
+from typing import Iterator, Optional
 
-from ..database import get_db
-from ..models import Address, ProviderResult
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..config import EXPORT_BATCH_ROWS
+from ..database import SessionLocal
+from ..metrics import EXPORT_ROWS, EXPORT_SECONDS
+from ..services.queries import export_rows_query, sql_dump_queries
+from ..services.sql_export import SQL_DIALECTS, iter_sql_dump
 
 router = APIRouter()
 
 
-@router.get("/export/csv")
-def export_csv(db: Session = Depends(get_db)):
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["id", "raw_address", "normalized_address", "status", "provider", "matched_address", "score"])
+def _csv_chunks(
+    status: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    provider: Optional[str],
+    min_score: Optional[float],
+) -> Iterator[str]:
+    # Sessão própria: o gerador roda depois que a dependência get_db já foi encerrada
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        stmt = export_rows_query(status, date_from, date_to, provider, min_score)
+        # Cursor do lado do servidor, lido em lotes de EXPORT_BATCH_ROWS linhas
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_ROWS))
 
-    q = db.query(Address).all()
-    for a in q:
-        for pr in a.provider_results:
-            writer.writerow([a.id, a.raw_address, a.normalized_address, a.status, pr.provider_name, pr.matched_address, pr.score])
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["id", "raw_address", "normalized_address", "status", "provider", "matched_address", "score"])
+        for rows in result.partitions():
+            writer.writerows(rows)
+            EXPORT_ROWS.inc(len(rows), format="csv")
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+        if output.tell():
+            yield output.getvalue()
+        EXPORT_SECONDS.observe(time.perf_counter() - started, format="csv")
+    finally:
+        db.close()
 
-    output.seek(0)
+
+@router.get("/export/csv")
+def export_csv(
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    provider: Optional[str] = None,
+    min_score: Optional[float] = None,
+):
     headers = {"Content-Disposition": "attachment; filename=geomatch_results.csv"}
-    return StreamingResponse(iter([output.read()]), media_type="text/csv", headers=headers)
+    return StreamingResponse(
+        _csv_chunks(status, date_from, date_to, provider, min_score),
+        media_type="text/csv",
+        headers=headers,
+    )
+
+
+def _sql_chunks(
+    dialect: str,
+    status: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+) -> Iterator[str]:
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        addresses, results = sql_dump_queries(status, date_from, date_to)
+
+        def batches(stmt):
+            # A segunda consulta só é executada quando a primeira termina
+            for rows in db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_ROWS)).partitions():
+                EXPORT_ROWS.inc(len(rows), format="sql")
+                yield rows
+
+        yield from iter_sql_dump(batches(addresses), batches(results), dialect)
+        EXPORT_SECONDS.observe(time.perf_counter() - started, format="sql")
+    finally:
+        db.close()
 
 
 @router.get("/export/sql")
-def export_sql(db: Session = Depends(get_db)):
-    # Dump simples de inserts SQL para integração
-    lines = []
-    for a in db.query(Address).all():
-        lines.append(
-            f"INSERT INTO addresses (id, raw_address, normalized_address, status, created_at) VALUES ({a.id}, '{a.raw_address.replace("'", "''")}', '{a.normalized_address.replace("'", "''")}', '{a.status}', '{a.created_at}');"
-        )
-        for pr in a.provider_results:
-            lines.append(
-                f"INSERT INTO provider_results (address_id, provider_name, matched_address, score, created_at) VALUES ({a.id}, '{pr.provider_name}', '{pr.matched_address.replace("'", "''")}', {pr.score}, '{pr.created_at}');"
-            )
-    sql_text = "\n".join(lines)
+def export_sql(
+    dialect: str = "insert",
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    if dialect not in SQL_DIALECTS:
+        raise HTTPException(status_code=400, detail=f"Dialeto inválido. Use um de: {list(SQL_DIALECTS)}")
     headers = {"Content-Disposition": "attachment; filename=geomatch_results.sql"}
-    return PlainTextResponse(sql_text, headers=headers)
+    return StreamingResponse(
+        _sql_chunks(dialect, status, date_from, date_to),
+        media_type="application/sql",
+        headers=headers,
+    )
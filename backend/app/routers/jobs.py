@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import UploadJob
+from ..schemas import JobOut, JobResultsOut
+from ..services.jobs import job_out
+from ..services.processing import address_out_from_model
+from ..services.queries import job_results_page
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(UploadJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job_out(job)
+
+
+@router.get("/jobs/{job_id}/results", response_model=JobResultsOut)
+def get_job_results(
+    job_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    if not db.get(UploadJob, job_id):
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    total, addrs = job_results_page(db, job_id, offset, limit)
+    return JobResultsOut(
+        job_id=job_id,
+        offset=offset,
+        limit=limit,
+        total=total,
+        items=[address_out_from_model(a) for a in addrs],
+    )
@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from ..config import REFERENCE_TOP_K
+from ..schemas import MatchOut, ReferenceCandidateOut
+from ..services.matching import classify_score, normalize_address
+from ..services.reference_index import get_reference_index
+
+router = APIRouter()
+
+
+@router.get("/match", response_model=MatchOut)
+def match_address(
+    address: str = Query(..., min_length=1),
+    k: int = Query(REFERENCE_TOP_K, ge=1, le=50),
+    city: Optional[str] = None,
+):
+    # Handler síncrono: o FastAPI o executa no threadpool, então a construção
+    # do índice (primeira chamada) e a busca não bloqueiam o event loop
+    matches = get_reference_index().match(address, k=k, city=city)
+    return MatchOut(
+        query=address,
+        normalized_address=normalize_address(address),
+        candidates=[
+            ReferenceCandidateOut(
+                id=m.record.id,
+                address=m.record.address,
+                cep=m.record.cep,
+                city=m.record.city,
+                uf=m.record.uf,
+                score=m.score,
+                classification=classify_score(m.score),
+            )
+            for m in matches
+        ],
+    )
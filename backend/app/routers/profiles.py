@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from ..services.profiling import PROFILE_MODES, admin_authorized, find_artifact
+
+router = APIRouter()
+
+
+def profile_mode(
+    profile: Optional[str] = Query(None, description="cprofile ou sampling (requer X-Admin-Token)"),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+) -> Optional[str]:
+    """Dependência dos endpoints com profiling opcional: retorna o modo pedido, se autorizado."""
+    mode = profile or x_profile
+    if not mode:
+        return None
+    if not admin_authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Profiling requer um X-Admin-Token válido")
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"Modo de profiling inválido. Use um de: {list(PROFILE_MODES)}")
+    return mode
+
+
+@router.get("/profiles/{artifact_id}")
+def download_profile(artifact_id: str, x_admin_token: Optional[str] = Header(None)):
+    if not admin_authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Download de perfis requer um X-Admin-Token válido")
+    found = find_artifact(artifact_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    path, mode = found
+    if mode == "cprofile":
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{artifact_id}.pstats")
+    return FileResponse(path, media_type="application/json", filename=f"{artifact_id}.speedscope.json")
@@ -0,0 +1,29 @@
+from typing import List
+
+from fastapi import APIRouter
+
+from ..config import API_PROVIDERS, EARLY_EXIT_SCORE
+from ..providers import get_async_providers, get_providers
+from ..providers.resilience import all_policies
+from ..schemas import ProviderStatusOut, SchedulerStatsOut
+from ..services.scheduler import scheduler
+
+router = APIRouter()
+
+
+@router.get("/providers/status", response_model=List[ProviderStatusOut])
+def providers_status():
+    # Instancia os provedores configurados para que suas políticas apareçam mesmo sem tráfego
+    get_providers(API_PROVIDERS)
+    return [policy.status() for _, policy in sorted(all_policies().items())]
+
+
+@router.get("/providers/stats", response_model=SchedulerStatsOut)
+def providers_stats():
+    return SchedulerStatsOut(
+        early_exit_score=EARLY_EXIT_SCORE,
+        adaptive=scheduler.adaptive,
+        addresses=scheduler.addresses,
+        order=[p.name for p in scheduler.order(get_async_providers(API_PROVIDERS))],
+        providers=scheduler.snapshot(),
+    )
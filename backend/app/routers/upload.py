@@ -1,184 +1,129 @@
-import io
+import csv
 import logging
-from typing import List, Optional
+from contextlib import nullcontext
+from typing import Iterable, List, Optional
 
-import pandas as pd
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
-from ..database import get_db, engine, Base
-from ..models import Address, ProviderResult, AuditLog
-from ..schemas import AddressOut, ProviderResultOut
-from ..config import API_PROVIDERS
-from ..providers import get_providers
-from ..services.matching import normalize_address, classify_score, similarity_score_with_cep
-from ..services.parser import read_csv_addresses, parse_sql_addresses
-from ..utils.validators import extract_cep, normalize_cep
+from ..database import get_db
+from ..models import AuditLog
+from ..schemas import AddressOut, JobOut
+from ..services.jobs import create_job, job_out, job_pool
+from ..services.parser import ParseError, iter_csv_addresses, iter_sql_addresses
+from ..services.dedup import UploadDeduplicator
+from ..services.pipeline import ListSink, Pipeline, Source
+from ..services.profiling import ProfileSession, ProfilerBusy
+from .profiles import profile_mode
 
 logger = logging.getLogger("upload")
 router = APIRouter()
 
-# Cria tabelas na primeira importação (bootstrap simples)
-Base.metadata.create_all(bind=engine)
 
+async def _handle_upload(
+    addresses: Iterable[str],
+    filename: str,
+    source: str,
+    db: Session,
+    background: bool,
+    profile: Optional[str] = None,
+):
+    if background and profile:
+        raise HTTPException(status_code=400, detail="Profiling não é suportado com background=true")
+    session = ProfileSession(profile) if profile else None
+    pipeline = None
+    try:
+        if background:
+            # Persiste o job e responde imediatamente; o pool de workers processa os chunks
+            job = create_job(db, source, filename, addresses)
+            job_pool.submit(job.id)
+            return JSONResponse(status_code=202, content=jsonable_encoder(job_out(job)))
+
+        dedup = UploadDeduplicator(db)
+        # O arquivo é lido em streaming: se a leitura falhar no meio, os chunks já gravados são apagados
+        pipeline = Pipeline(db, dedup=dedup, track_written=True)
+        with session or nullcontext():
+            out = await pipeline.run(Source(source, addresses), ListSink())
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ParseError as e:
+        _discard_partial_upload(db, pipeline)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Erros de leitura só aparecem durante o streaming do arquivo
+        _discard_partial_upload(db, pipeline)
+        raise HTTPException(status_code=400, detail=f"Arquivo inválido: {e}")
+    db.add(AuditLog(event=f"upload_{source}", details=f"file={filename}; rows={len(out)}; {dedup.summary()}"))
+    db.commit()
+    headers = {"X-Dedup-Ratio": f"{dedup.dedup_ratio:.3f}", "X-Unique-Addresses": str(dedup.processed + dedup.reused)}
+    if session is not None:
+        # Com profiling, a lista de resultados vem em "results" junto com o resumo do perfil
+        artifact_id = session.save(f"upload_{source} {filename}")
+        headers["X-Profile-Id"] = artifact_id
+        return JSONResponse(
+            content={"results": jsonable_encoder(out), "profile": session.summary(artifact_id)},
+            headers=headers,
+        )
+    return JSONResponse(content=jsonable_encoder(out), headers=headers)
 
-def _process_addresses(addresses: List[str], db: Session) -> List[AddressOut]:
-    providers = get_providers(API_PROVIDERS)
-    results_out: List[AddressOut] = []
-
-    for raw_addr in addresses:
-        raw_addr = str(raw_addr)
-        norm = normalize_address(raw_addr)
-        
-        # Extrai CEP do endereço de entrada
-        input_cep = extract_cep(raw_addr)
-        clean_input_cep = normalize_cep(input_cep) if input_cep else None
 
-        addr = Address(
-            raw_address=raw_addr, 
-            normalized_address=norm,
-            cep=clean_input_cep
-        )
-        db.add(addr)
-        db.commit()
-        db.refresh(addr)
-
-        provider_results = []
-        best_score = 0.0
-        winner_provider = None
-        for p in providers:
-            try:
-                r = p.validate(raw_addr)
-                
-                # Extrai CEP do resultado do provider de forma segura
-                provider_cep = None
-                if r.get("metadata") and isinstance(r.get("metadata"), dict):
-                    provider_cep = r["metadata"].get("cep")
-                
-                # Recalcula score considerando CEP se disponível
-                adjusted_score = similarity_score_with_cep(
-                    norm, 
-                    normalize_address(r["matched_address"]),
-                    clean_input_cep,
-                    provider_cep
-                )
-                
-                pr = ProviderResult(
-                    address_id=addr.id,
-                    provider_name=p.name,
-                    matched_address=r["matched_address"],
-                    cep=provider_cep,
-                    score=adjusted_score,
-                    extra_metadata=r.get("metadata"),
-                )
-                db.add(pr)
-                db.commit()
-                db.refresh(pr)
-                provider_results.append(pr)
-                if pr.score >= best_score:
-                    best_score = pr.score
-                    winner_provider = pr.provider_name
-                if pr.score >= 95:
-                    break
-            except Exception as ex:
-                logger.exception("Provedor %s falhou: %s", p.name, ex)
-                db.add(AuditLog(event="provider_error", details=f"{p.name}: {ex}"))
-                db.commit()
-                continue
-
-        addr.status = classify_score(best_score)
-        db.commit()
-
-        results_out.append(
-            AddressOut(
-                id=addr.id,
-                raw_address=addr.raw_address,
-                normalized_address=addr.normalized_address,
-                cep=addr.cep,
-                status=addr.status,
-                winner_provider=winner_provider,
-                best_score=best_score,
-                results=[
-                    ProviderResultOut(
-                        provider_name=pr.provider_name,
-                        matched_address=pr.matched_address,
-                        cep=pr.cep,
-                        score=pr.score,
-                        extra_metadata=pr.extra_metadata,
-                        classification=classify_score(pr.score),
-                    )
-                    for pr in provider_results
-                ],
-            )
-        )
-    return results_out
+def _discard_partial_upload(db: Session, pipeline: Optional[Pipeline]) -> None:
+    db.rollback()
+    if pipeline is not None:
+        pipeline.discard_written()
 
 
-@router.post("/upload/csv", response_model=List[AddressOut])
+@router.post("/upload/csv", response_model=List[AddressOut], responses={202: {"model": JobOut}})
 async def upload_csv(
     file: UploadFile = File(...),
+    background: bool = False,
+    profile: Optional[str] = Depends(profile_mode),
     db: Session = Depends(get_db),
 ):
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Apenas arquivos .csv são aceitos")
-    content = await file.read()
     try:
-        addresses = read_csv_addresses(content)
+        # Lê o arquivo em streaming (o upload já está em disco se for grande)
+        addresses = iter_csv_addresses(file.file)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    out = _process_addresses(addresses, db)
-    db.add(AuditLog(event="upload_csv", details=f"file={file.filename}; rows={len(addresses)}"))
-    db.commit()
-    return out
+    return await _handle_upload(addresses, file.filename, "csv", db, background, profile)
 
 
-@router.post("/upload/sql", response_model=List[AddressOut])
+@router.post("/upload/sql", response_model=List[AddressOut], responses={202: {"model": JobOut}})
 async def upload_sql(
     file: UploadFile = File(...),
+    background: bool = False,
+    profile: Optional[str] = Depends(profile_mode),
     db: Session = Depends(get_db),
 ):
     if not file.filename.lower().endswith(".sql"):
         raise HTTPException(status_code=400, detail="Apenas arquivos .sql são aceitos")
-    content = (await file.read()).decode("utf-8", errors="ignore")
-    try:
-        addresses = parse_sql_addresses(content)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    # Dump lido em streaming; a ausência de endereços só é detectada ao fim da leitura
+    addresses = iter_sql_addresses(file.file)
 
-    out = _process_addresses(addresses, db)
-    db.add(AuditLog(event="upload_sql", details=f"file={file.filename}; rows={len(addresses)}"))
-    db.commit()
-    return out
-    db.commit()
-    return out
+    return await _handle_upload(addresses, file.filename, "sql", db, background, profile)
 
 
-@router.post("/upload", response_model=List[AddressOut])
+@router.post("/upload", response_model=List[AddressOut], responses={202: {"model": JobOut}})
 async def upload_auto(
     file: UploadFile = File(...),
+    background: bool = False,
+    profile: Optional[str] = Depends(profile_mode),
     db: Session = Depends(get_db),
 ):
     name = file.filename.lower()
     if name.endswith(".csv"):
-        content = await file.read()
         try:
-            addresses = read_csv_addresses(content)
+            addresses = iter_csv_addresses(file.file)
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
-        out = _process_addresses(addresses, db)
-        db.add(AuditLog(event="upload_csv", details=f"file={file.filename}; rows={len(addresses)}"))
-        db.commit()
-        return out
+        return await _handle_upload(addresses, file.filename, "csv", db, background, profile)
     elif name.endswith(".sql"):
-        content = (await file.read()).decode("utf-8", errors="ignore")
-        try:
-            addresses = parse_sql_addresses(content)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        out = _process_addresses(addresses, db)
-        db.add(AuditLog(event="upload_sql", details=f"file={file.filename}; rows={len(addresses)}"))
-        db.commit()
-        return out
+        addresses = iter_sql_addresses(file.file)
+        return await _handle_upload(addresses, file.filename, "sql", db, background, profile)
     else:
         raise HTTPException(status_code=400, detail="Extensão de arquivo não suportada. Envie .csv ou .sql")
@@ -0,0 +1,111 @@
+import json
+import logging
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+from ..config import VALIDATE_STREAM_DEDUP_KEYS
+from ..database import SessionLocal, get_db
+from ..models import AuditLog
+from ..schemas import ValidateIn, ValidateOut
+from ..services.address_lookup import UnknownProvider, validate_address
+from ..services.dedup import UploadDeduplicator
+from ..services.parser import ParseError
+from ..services.pipeline import Pipeline, ndjson_source
+
+logger = logging.getLogger("validate")
+router = APIRouter()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@router.get("/validate", response_model=ValidateOut)
+async def validate_get(
+    address: str = Query(..., min_length=1),
+    providers: Optional[str] = Query(None, description="Provedores separados por vírgula (padrão: API_PROVIDERS)"),
+    persist: bool = Query(False, description="Grava o endereço e os resultados (opt-in: um GET não grava por padrão)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Valida um único endereço; acertos no cache respondem sem consultar provedores nem o banco.
+
+    Crawlers, pré-visualizações de links e retentativas repetem GETs: só grava com ``persist=true``.
+    """
+    names = [n.strip() for n in providers.split(",") if n.strip()] if providers else None
+    return await _validate_one(address, names, persist, db)
+
+
+@router.post("/validate", response_model=ValidateOut)
+async def validate_post(payload: ValidateIn, db: Session = Depends(get_db)):
+    return await _validate_one(payload.address, payload.providers, payload.persist, db)
+
+
+async def _validate_one(address: str, providers: Optional[List[str]], persist: bool, db: Session) -> JSONResponse:
+    if not address.strip():
+        raise HTTPException(status_code=400, detail="Endereço vazio")
+    try:
+        value, cached = await validate_address(address, db, providers, persist)
+    except UnknownProvider as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Resposta montada direto do dicionário em cache (sem validação do pydantic no caminho quente)
+    content = {k: v for k, v in value.items() if k != "partial"}
+    content["raw_address"] = address
+    content["cached"] = cached
+    return JSONResponse(content=content)
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """
+    ``StreamingResponse`` que lê o corpo da requisição enquanto responde.
+
+    A implementação padrão escuta ``receive`` em paralelo para detectar a
+    desconexão do cliente, o que consumiria as mensagens do corpo; aqui a
+    desconexão aparece na leitura do corpo (``ClientDisconnect``).
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
+@router.post("/validate/stream", responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}})
+async def validate_stream(
+    request: Request,
+    chunk_size: Optional[int] = Query(None, ge=1, le=5000),
+):
+    """
+    Valida endereços em NDJSON (um por linha: texto ou ``{"address": "..."}``) e
+    devolve um ``AddressOut`` por linha, em NDJSON e na ordem da entrada.
+
+    Cada chunk é respondido assim que é gravado. O corpo só é lido à medida que
+    o pipeline avança e a resposta espera o cliente consumir o que já foi
+    enviado, então a memória dos dois lados não depende do tamanho do stream.
+    Um erro de leitura encerra a resposta com uma linha ``{"error": "..."}``.
+    """
+    return RequestBodyStreamingResponse(_stream_results(request, chunk_size), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def _stream_results(request: Request, chunk_size: Optional[int]) -> AsyncIterator[bytes]:
+    # Sessão própria: o gerador roda depois que o endpoint já retornou
+    db = SessionLocal()
+    try:
+        dedup = UploadDeduplicator(db, max_keys=VALIDATE_STREAM_DEDUP_KEYS)
+        pipeline = Pipeline(db, chunk_size, dedup)
+        try:
+            async for _, results in pipeline.stream(ndjson_source(request.stream())):
+                yield "".join(r.model_dump_json() + "\n" for r in results).encode()
+        except ParseError as e:
+            db.rollback()
+            yield (json.dumps({"error": str(e)}, ensure_ascii=False) + "\n").encode()
+            return
+        except ClientDisconnect:
+            logger.info("Cliente desconectou durante /validate/stream após %s linhas", dedup.rows)
+            return
+        db.add(AuditLog(event="validate_stream", details=f"rows={dedup.rows}; {dedup.summary()}"))
+        db.commit()
+    finally:
+        db.close()
+
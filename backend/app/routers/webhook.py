@@ -1,57 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException
+from contextlib import nullcontext
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..database import get_db
-from ..models import Address, ProviderResult, AuditLog
-from ..providers import get_providers
-from ..config import API_PROVIDERS
-from ..services.matching import normalize_address, classify_score
+from ..models import AuditLog, UploadJob
+from ..schemas import WebhookBatchOut
+from ..services.callbacks import InvalidCallbackUrl, check_callback_url
+from ..services.jobs import create_job, job_pool
+from ..services.pipeline import CountSink, Pipeline, json_source
+from ..services.profiling import ProfileSession, ProfilerBusy
+from .profiles import profile_mode
 
 router = APIRouter()
 
 
-@router.post("/webhook/process")
-def webhook_process(payload: dict, db: Session = Depends(get_db)):
-    """Webhook para ser chamado pelo n8n: espera {"addresses": ["..."]}"""
+@router.post("/webhook/process", status_code=202, response_model=WebhookBatchOut)
+async def webhook_process(
+    payload: dict,
+    wait: bool = False,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    profile: Optional[str] = Depends(profile_mode),
+    db: Session = Depends(get_db),
+):
+    """
+    Webhook para ser chamado pelo n8n: espera {"addresses": ["..."]}
+
+    O lote vira um job em segundo plano e a resposta (202) traz o ``batch_id``;
+    o progresso fica em ``/api/jobs/{id}`` e os resultados em
+    ``/api/jobs/{id}/results``. Com ``callback_url`` no corpo, os resultados são
+    enviados por POST para essa URL ao fim do job, em partes.
+
+    Reenvios com o mesmo ``Idempotency-Key`` (header, ou ``idempotency_key`` no
+    corpo) retornam o lote já criado, sem reprocessar. ``wait=true`` mantém o
+    processamento inline, com a resposta ``{"processed": N}``.
+    """
     addrs: List[str] = payload.get("addresses", [])
     if not isinstance(addrs, list):
         raise HTTPException(status_code=400, detail="O campo 'addresses' deve ser uma lista")
+    callback_url = payload.get("callback_url")
+    if callback_url is not None:
+        try:
+            await check_callback_url(callback_url)
+        except InvalidCallbackUrl as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    idempotency_key = idempotency_key or payload.get("idempotency_key")
+    if idempotency_key is not None and not isinstance(idempotency_key, str):
+        raise HTTPException(status_code=400, detail="O campo 'idempotency_key' deve ser um texto")
+
+    if not wait:
+        if profile:
+            raise HTTPException(status_code=400, detail="Profiling só é suportado com wait=true")
+        return _enqueue_batch(db, addrs, idempotency_key, callback_url)
+    if callback_url:
+        raise HTTPException(status_code=400, detail="callback_url não é suportado com wait=true")
+
+    session = ProfileSession(profile) if profile else None
+    try:
+        with session or nullcontext():
+            processed = await _process_webhook(addrs, db)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if session is not None:
+        content = {"processed": processed, "profile": session.summary(session.save("webhook_process"))}
+    else:
+        content = {"processed": processed}
+    return JSONResponse(content=content)
 
-    providers = get_providers(API_PROVIDERS)
-    processed = 0
-
-    for raw in addrs:
-        norm = normalize_address(str(raw))
-        addr = Address(raw_address=str(raw), normalized_address=norm)
-        db.add(addr)
-        db.commit()
-        db.refresh(addr)
-
-        best_score = 0.0
-        for p in providers:
-            try:
-                r = p.validate(raw)
-                pr = ProviderResult(
-                    address_id=addr.id,
-                    provider_name=p.name,
-                    matched_address=r["matched_address"],
-                    score=r["score"],
-                    extra_metadata=r.get("metadata"),
-                )
-                db.add(pr)
-                db.commit()
-                if pr.score and pr.score >= best_score:
-                    best_score = pr.score
-            except Exception as ex:
-                db.add(AuditLog(event="provider_error", details=f"{p.name}: {ex}"))
-                db.commit()
-                continue
-        addr.status = classify_score(best_score)
-        db.commit()
-        processed += 1
-
-    db.add(AuditLog(event="webhook_process", details=f"rows={processed}"))
-    db.commit()
 
-    return {"processed": processed}
+def _enqueue_batch(
+    db: Session, addrs: List[str], idempotency_key: Optional[str], callback_url: Optional[str]
+) -> JSONResponse:
+    duplicate = False
+    job = _find_batch(db, idempotency_key)
+    if job is None:
+        try:
+            job = create_job(
+                db, "webhook", None, [str(a) for a in addrs],
+                idempotency_key=idempotency_key, callback_url=callback_url,
+            )
+            job_pool.submit(job.id)
+        except IntegrityError:
+            # Reenvio concorrente com a mesma chave: vale o lote criado primeiro
+            db.rollback()
+            job = _find_batch(db, idempotency_key)
+            if job is None:
+                raise
+            duplicate = True
+    else:
+        duplicate = True
+
+    out = WebhookBatchOut(
+        batch_id=job.id,
+        status=job.status,
+        total_rows=job.total_rows or 0,
+        duplicate=duplicate,
+        status_url=f"/api/jobs/{job.id}",
+        results_url=f"/api/jobs/{job.id}/results",
+        callback_url=job.callback_url,
+    )
+    return JSONResponse(status_code=200 if duplicate else 202, content=jsonable_encoder(out))
+
+
+def _find_batch(db: Session, idempotency_key: Optional[str]) -> Optional[UploadJob]:
+    if not idempotency_key:
+        return None
+    return db.scalar(select(UploadJob).where(UploadJob.idempotency_key == idempotency_key))
+
+
+async def _process_webhook(addrs: List[str], db: Session) -> int:
+    # Mesmo pipeline dos uploads: CEP, deduplicação, provedores em ondas e gravação em lote
+    pipeline = Pipeline(db)
+    processed = await pipeline.run(json_source(addrs), CountSink())
+    db.add(AuditLog(event="webhook_process", details=f"rows={processed}; {pipeline.dedup.summary()}"))
+    db.commit()
+    return processed
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional, List, Any
 
 
@@ -15,7 +16,7 @@ class ProviderResultOut(BaseModel):
     classification: Optional[str] = None
 
 
-class AddressOut(BaseModel):
+class AddressSummaryOut(BaseModel):
     id: int
     raw_address: str
     normalized_address: str
@@ -23,7 +24,119 @@ class AddressOut(BaseModel):
     status: Optional[str] = None
     winner_provider: Optional[str] = None
     best_score: Optional[float] = None
+
+
+class AddressOut(AddressSummaryOut):
     results: List[ProviderResultOut]
 
     class Config:
         from_attributes = True
+
+
+class ValidateIn(BaseModel):
+    address: str
+    providers: Optional[List[str]] = None
+    persist: bool = True
+
+
+class ValidateOut(BaseModel):
+    id: Optional[int] = None
+    raw_address: str
+    normalized_address: str
+    cep: Optional[str] = None
+    status: Optional[str] = None
+    winner_provider: Optional[str] = None
+    best_score: Optional[float] = None
+    results: List[ProviderResultOut]
+    cached: bool = False
+
+
+class JobOut(BaseModel):
+    id: int
+    source: str
+    filename: Optional[str] = None
+    status: str
+    total_rows: int
+    processed_rows: int
+    progress: float
+    rows_per_second: Optional[float] = None
+    error_count: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    callback_status: Optional[str] = None
+
+
+class WebhookBatchOut(BaseModel):
+    batch_id: int
+    status: str
+    total_rows: int
+    duplicate: bool = False
+    status_url: str
+    results_url: str
+    callback_url: Optional[str] = None
+
+
+class JobResultsOut(BaseModel):
+    job_id: int
+    offset: int
+    limit: int
+    total: int
+    items: List[AddressOut]
+
+
+class ReferenceCandidateOut(BaseModel):
+    id: int
+    address: str
+    cep: Optional[str] = None
+    city: Optional[str] = None
+    uf: Optional[str] = None
+    score: float
+    classification: str
+
+
+class MatchOut(BaseModel):
+    query: str
+    normalized_address: str
+    candidates: List[ReferenceCandidateOut]
+
+
+class ProviderStatusOut(BaseModel):
+    name: str
+    state: str  # closed | open | half_open
+    consecutive_failures: int
+    rate_limit: Optional[float] = None
+    tokens_available: Optional[float] = None
+    rate_limited_waits: int
+    timeout_seconds: float
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_p99: Optional[float] = None
+    calls: int
+    successes: int
+    failures: int
+    timeouts: int
+    retries: int
+    short_circuited: int
+
+
+class ProviderStatsOut(BaseModel):
+    name: str
+    calls: int
+    errors: int
+    skipped: int
+    resolved: int
+    wins: int
+    latency_seconds: Optional[float] = None
+    resolve_rate: Optional[float] = None
+    win_rate: Optional[float] = None
+    calls_per_address: Optional[float] = None
+
+
+class SchedulerStatsOut(BaseModel):
+    early_exit_score: float
+    adaptive: bool
+    addresses: int
+    order: List[str]
+    providers: List[ProviderStatsOut]
@@ -0,0 +1,190 @@
+"""
+Validação de um único endereço (``/api/validate``) com cache de resultados em memória
+
+O resultado é guardado por (endereço normalizado, CEP, conjunto de provedores)
+em um ``LookupCache`` só de memória, por processo, com TTL
+``VALIDATE_CACHE_TTL_SECONDS``. Em um acerto não há consulta a provedores nem
+ao banco; em uma falta, todos os provedores aplicáveis são consultados ao mesmo
+tempo (sem as ondas do pipeline: aqui importa a latência, não o custo).
+
+Consultas simultâneas à mesma chave são atendidas uma de cada vez: a primeira
+valida (e grava, com ``persist=true``) e as seguintes encontram o resultado no
+cache, com o mesmo id de endereço, em vez de gravar registros duplicados.
+
+Resultados com falha transitória de algum provedor (indisponível, timeout) são
+parciais e não entram no cache; uma recusa definitiva (``ValueError``, ex.:
+endereço fora da cobertura) não torna o resultado parcial. Quando o resultado
+é gravado, o id do endereço fica no cache e acertos seguintes com
+``persist=true`` reaproveitam o mesmo registro, como a deduplicação dos uploads.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import API_PROVIDERS, VALIDATE_CACHE_MAX_ENTRIES, VALIDATE_CACHE_TTL_SECONDS
+from ..metrics import PROVIDER_ERRORS, ROWS_PROCESSED
+from ..providers import get_async_providers
+from ..providers.base import AsyncProvider, ProviderUnavailable
+from ..providers.lookup_cache import LookupCache, get_lookup_cache
+from .cpu_pool import score_batch
+from .dedup import dedup_keys
+from .matching import classify_score
+from .persistence import AddressBatchWriter, best_result
+from .validation import validate_batch
+
+_provider_sets: Dict[Tuple[str, ...], List[AsyncProvider]] = {}
+# Trava e número de interessados por chave do cache; a entrada sai quando ninguém mais a usa
+_key_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
+class UnknownProvider(ValueError):
+    """Nome de provedor não registrado."""
+
+
+def get_validate_cache() -> LookupCache:
+    return get_lookup_cache(
+        "validate",
+        path=None,
+        max_entries=VALIDATE_CACHE_MAX_ENTRIES,
+        ttl=VALIDATE_CACHE_TTL_SECONDS,
+    )
+
+
+@asynccontextmanager
+async def _key_lock(key: str) -> AsyncIterator[None]:
+    lock, users = _key_locks.get(key, (None, 0))
+    lock = lock or asyncio.Lock()
+    _key_locks[key] = (lock, users + 1)
+    try:
+        async with lock:
+            yield
+    finally:
+        lock, users = _key_locks[key]
+        if users > 1:
+            _key_locks[key] = (lock, users - 1)
+        else:
+            del _key_locks[key]
+
+
+def _is_transient(error: Exception) -> bool:
+    # ValueError comum é a resposta definitiva do provedor; o resto pode mudar numa nova tentativa
+    return isinstance(error, (ProviderUnavailable, asyncio.TimeoutError)) or not isinstance(error, ValueError)
+
+
+def _providers_for(names: Tuple[str, ...]) -> List[AsyncProvider]:
+    # Instâncias reaproveitadas entre requisições (o estado de resiliência é global)
+    providers = _provider_sets.get(names)
+    if providers is None:
+        providers = get_async_providers(list(names))
+        if len(providers) != len(names):
+            known = {p.name for p in providers}
+            raise UnknownProvider(f"Provedor desconhecido: {', '.join(n for n in names if n not in known)}")
+        _provider_sets[names] = providers
+    return providers
+
+
+async def validate_address(
+    address: str,
+    db: Session,
+    provider_names: Optional[Sequence[str]] = None,
+    persist: bool = True,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Valida um endereço, usando o cache de resultados quando possível.
+
+    Args:
+        address: Endereço bruto
+        db: Sessão usada só quando o resultado precisa ser gravado
+        provider_names: Provedores consultados (padrão ``API_PROVIDERS``)
+        persist: Grava o endereço e os resultados (uma vez por entrada do cache)
+
+    Returns:
+        (campos de ``ValidateOut`` sem ``raw_address``/``cached``, se veio do cache)
+
+    Raises:
+        UnknownProvider: Se algum nome de provedor não existir
+    """
+    names = tuple(dict.fromkeys(provider_names or API_PROVIDERS))
+    providers = _providers_for(names)
+    norm, cep = dedup_keys([address])[0]
+    key = "\x1f".join((norm, cep or "", ",".join(names)))
+    cache = get_validate_cache()
+    cached = cache.get(key)
+    if cached is not None and (not persist or cached["id"] is not None):
+        return cached, True
+
+    async with _key_lock(key):
+        fetched = False
+
+        async def fetch() -> Dict[str, Any]:
+            nonlocal fetched
+            fetched = True
+            return await _validate_uncached(address, norm, cep, providers)
+
+        value = await cache.get_or_fetch(key, fetch, cacheable=lambda v: not v["partial"])
+        if persist and value["id"] is None:
+            value = {**value, "id": _persist(db, address, value)}
+            if not value["partial"]:
+                cache.set(key, value)
+    return value, not fetched
+
+
+async def _validate_uncached(
+    address: str, norm: str, cep: Optional[str], providers: List[AsyncProvider]
+) -> Dict[str, Any]:
+    applicable = [p for p in providers if p.applies(address)]
+    outcomes = (await validate_batch(applicable, [address], concurrency=1))[0] if applicable else []
+    ok = []
+    transient = 0
+    for p, r in outcomes:
+        if isinstance(r, Exception):
+            PROVIDER_ERRORS.inc(provider=p.name)
+            transient += _is_transient(r)
+        else:
+            ok.append((p, r))
+    provider_ceps = [r["metadata"].get("cep") if isinstance(r.get("metadata"), dict) else None for _, r in ok]
+    scores = score_batch(
+        [norm] * len(ok), [r["matched_address"] for _, r in ok], [cep] * len(ok), provider_ceps
+    ) if ok else []
+
+    results = []
+    for (p, r), provider_cep, score in zip(ok, provider_ceps, scores):
+        results.append({
+            "provider_name": p.name,
+            "matched_address": r["matched_address"],
+            "cep": provider_cep,
+            "score": score,
+            "extra_metadata": r.get("metadata"),
+            "classification": classify_score(score),
+        })
+    best = best_result(results)
+    ROWS_PROCESSED.inc(source="validate")
+    return {
+        "id": None,
+        "normalized_address": norm,
+        "cep": cep,
+        "status": classify_score(best["score"] if best else 0.0),
+        "winner_provider": best["provider_name"] if best else None,
+        "best_score": best["score"] if best else None,
+        "results": results,
+        "partial": transient > 0,
+    }
+
+
+def _persist(db: Session, address: str, value: Dict[str, Any]) -> int:
+    writer = AddressBatchWriter(db, chunk_size=1)
+    records = writer.add(
+        {
+            "raw_address": address,
+            "normalized_address": value["normalized_address"],
+            "cep": value["cep"],
+            "status": value["status"],
+        },
+        [
+            {k: r[k] for k in ("provider_name", "matched_address", "cep", "score", "extra_metadata")}
+            for r in value["results"]
+        ],
+    )
+    return records[0]["address"]["id"]
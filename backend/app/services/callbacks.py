@@ -0,0 +1,151 @@
+"""
+Entrega dos resultados de um job na ``callback_url`` informada pelo cliente
+
+Os resultados são enviados em partes de ``WEBHOOK_CALLBACK_BATCH`` endereços,
+um POST JSON por parte, na ordem das linhas de entrada. Cada POST leva o
+header ``Idempotency-Key`` ``{chave do job}:{parte}``, para que o receptor
+descarte reenvios; falhas de rede e respostas 5xx/429 são repetidas com
+backoff exponencial e jitter.
+
+A ``callback_url`` só é aceita se o host resolver para endereços públicos (ou
+estiver em ``WEBHOOK_CALLBACK_ALLOWED_HOSTS``); a verificação é refeita antes
+da entrega, já que o DNS pode mudar entre o envio do lote e o fim do job.
+"""
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from ..config import (
+    WEBHOOK_CALLBACK_ALLOWED_HOSTS,
+    WEBHOOK_CALLBACK_BATCH,
+    WEBHOOK_CALLBACK_RETRIES,
+    WEBHOOK_CALLBACK_TIMEOUT,
+)
+from ..models import UploadJob
+from ..providers.http_client import get_http_client
+from .processing import address_out_from_model
+from .queries import job_results_page
+
+logger = logging.getLogger("callbacks")
+
+RETRY_BASE_DELAY = 0.5
+
+
+class CallbackError(Exception):
+    """A callback_url não aceitou uma parte dos resultados após todas as tentativas."""
+
+
+class InvalidCallbackUrl(ValueError):
+    """A callback_url não é http(s) ou aponta para um endereço interno."""
+
+
+async def check_callback_url(url: Any) -> None:
+    """
+    Recusa callback_urls que permitiriam alcançar serviços internos (SSRF).
+
+    O host é resolvido e todos os endereços precisam ser públicos: loopback,
+    link-local, redes privadas, reservados e multicast são recusados. Hosts em
+    ``WEBHOOK_CALLBACK_ALLOWED_HOSTS`` dispensam a verificação.
+
+    Args:
+        url: Valor recebido em ``callback_url``
+
+    Raises:
+        InvalidCallbackUrl: URL inválida, host não resolvido ou endereço interno
+    """
+    parsed = urlparse(url) if isinstance(url, str) else None
+    if parsed is None or parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise InvalidCallbackUrl("O campo 'callback_url' deve ser uma URL http(s)")
+    host = parsed.hostname.lower()
+    if host in WEBHOOK_CALLBACK_ALLOWED_HOSTS:
+        return
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (OSError, ValueError):
+        raise InvalidCallbackUrl(f"Host da callback_url não encontrado: {host}")
+    for info in infos:
+        ip = ipaddress.ip_address(info[4][0].split("%")[0])
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise InvalidCallbackUrl(f"A callback_url aponta para um endereço interno ({ip})")
+
+
+def _callback_key(job: UploadJob, part: int) -> str:
+    return f"{job.idempotency_key or f'job-{job.id}'}:{part}"
+
+
+async def _post(url: str, body: Dict[str, Any], key: str) -> None:
+    attempt = 0
+    while True:
+        try:
+            response = await get_http_client().post(
+                url, json=body, headers={"Idempotency-Key": key}, timeout=WEBHOOK_CALLBACK_TIMEOUT
+            )
+            if response.status_code < 300:
+                return
+            error = f"HTTP {response.status_code}"
+            retryable = response.status_code >= 500 or response.status_code == 429
+        except httpx.HTTPError as ex:
+            error = f"{type(ex).__name__}: {ex}"
+            retryable = True
+        if not retryable or attempt >= WEBHOOK_CALLBACK_RETRIES:
+            raise CallbackError(f"Callback {url} recusou a parte {body['part']}: {error}")
+        attempt += 1
+        await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+async def deliver_job_callback(db: Session, job: UploadJob, batch_size: int = WEBHOOK_CALLBACK_BATCH) -> bool:
+    """
+    Envia os resultados do job para ``job.callback_url`` e registra o ``callback_status``.
+
+    Args:
+        db: Sessão usada para ler os resultados e atualizar o job
+        job: Job concluído (ou com falha: envia uma única parte sem resultados)
+        batch_size: Endereços por POST
+
+    Returns:
+        True se todas as partes foram aceitas
+    """
+    batch_size = max(1, batch_size)
+    total = (job.processed_rows or 0) if job.status == "completed" else 0
+    parts = max(1, -(-total // batch_size))
+    base = {
+        "batch_id": job.id,
+        "idempotency_key": job.idempotency_key,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "parts": parts,
+    }
+    if job.status != "completed":
+        base["error"] = job.last_error
+
+    job.callback_status = "pending"
+    db.commit()
+    try:
+        await check_callback_url(job.callback_url)
+        for part in range(1, parts + 1):
+            items: List[Any] = []
+            if job.status == "completed":
+                _, addrs = job_results_page(db, job.id, (part - 1) * batch_size, batch_size)
+                items = [address_out_from_model(a) for a in addrs]
+            body = {**base, "part": part, "offset": (part - 1) * batch_size, "results": jsonable_encoder(items)}
+            await _post(job.callback_url, body, _callback_key(job, part))
+    except (CallbackError, InvalidCallbackUrl) as ex:
+        logger.error("Job %s: %s", job.id, ex)
+        job.callback_status = "failed"
+        job.last_error = str(ex)
+        db.commit()
+        return False
+    job.callback_status = "delivered"
+    db.commit()
+    return True
@@ -0,0 +1,107 @@
+"""
+Pool de processos para as etapas de CPU do pipeline (normalização, CEP e score)
+
+Com ``PIPELINE_WORKERS`` diferente de 0, as chaves de cada chunk (endereço
+normalizado + CEP) e os scores de cada onda de provedores são calculados em
+um ``ProcessPoolExecutor``; o event loop fica livre para as chamadas de rede
+e a gravação no banco continua em um único writer (``AddressBatchWriter``).
+Com 0 (padrão), tudo roda inline como antes.
+
+Os workers não acessam o banco nem os provedores: recebem listas de strings e
+devolvem listas, na mesma ordem.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+from ..config import PIPELINE_MIN_BATCH, PIPELINE_WORKERS, SCORING_WORKERS
+from .dedup import DedupKey, dedup_keys
+from .matching import batch_similarity_scores_with_cep, normalize_many
+
+logger = logging.getLogger("cpu_pool")
+
+T = TypeVar("T")
+
+
+def prepare_keys(addresses: List[str]) -> List[DedupKey]:
+    """Etapa executada nos workers: (endereço normalizado, CEP) de cada endereço."""
+    return dedup_keys(addresses)
+
+
+def score_batch(
+    norms: Sequence[str],
+    matched: Sequence[str],
+    ceps: Sequence[Optional[str]],
+    provider_ceps: Sequence[Optional[str]],
+    workers: int = 1,
+) -> List[float]:
+    """Etapa executada nos workers: normaliza os endereços dos provedores e calcula os scores."""
+    return batch_similarity_scores_with_cep(
+        norms, normalize_many(matched), ceps, provider_ceps, workers=workers
+    ).tolist()
+
+
+def pool_size(workers: Optional[int] = None) -> int:
+    """Quantidade de processos (``-1`` usa todos os núcleos; 0 desativa o pool)."""
+    workers = PIPELINE_WORKERS if workers is None else workers
+    return (os.cpu_count() or 1) if workers < 0 else workers
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_cpu_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool do processo, criado na primeira chamada; None se ``PIPELINE_WORKERS`` for 0."""
+    global _pool
+    size = pool_size()
+    if _pool is None and size > 0:
+        # spawn: os workers não herdam threads nem conexões abertas do servidor
+        _pool = ProcessPoolExecutor(size, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def warm_cpu_pool() -> None:
+    """Inicia os workers antecipadamente (evita a latência de spawn no primeiro upload)."""
+    pool = get_cpu_pool()
+    if pool is not None:
+        list(pool.map(prepare_keys, [["Rua Aquecimento, 1"]] * pool_size()))
+
+
+def shutdown_cpu_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _run(fn: Callable[..., T], rows: int, *args) -> T:
+    pool = get_cpu_pool()
+    if pool is None or rows < PIPELINE_MIN_BATCH:
+        # Lotes pequenos: o custo de serializar para outro processo supera o ganho
+        return fn(*args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        logger.exception("Pool de processos interrompido; recriando e processando o lote inline")
+        shutdown_cpu_pool()
+        return fn(*args)
+
+
+async def prepare_keys_async(addresses: List[str]) -> List[DedupKey]:
+    return await _run(prepare_keys, len(addresses), addresses)
+
+
+async def score_batch_async(
+    norms: Sequence[str],
+    matched: Sequence[str],
+    ceps: Sequence[Optional[str]],
+    provider_ceps: Sequence[Optional[str]],
+) -> List[float]:
+    if get_cpu_pool() is None:
+        # Inline: o cálculo em lote usa as threads de SCORING_WORKERS
+        return score_batch(norms, matched, ceps, provider_ceps, workers=SCORING_WORKERS)
+    return await _run(score_batch, len(norms), list(norms), list(matched), list(ceps), list(provider_ceps))
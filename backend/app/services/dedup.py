@@ -0,0 +1,130 @@
+"""
+Deduplicação de endereços dentro de um upload
+
+Cada endereço único (endereço normalizado + CEP) é validado uma única vez por
+upload; as linhas repetidas apontam para o mesmo ``Address``. Opcionalmente,
+endereços já gravados dentro de uma janela de tempo são reaproveitados sem
+nova consulta aos provedores.
+"""
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from ..config import DEDUP_REUSE_SECONDS
+from ..models import Address
+from ..utils.validators import extract_cep, normalize_cep
+from .matching import normalize_many
+
+DedupKey = Tuple[str, Optional[str]]
+
+
+def dedup_keys(addresses: List[str]) -> List[DedupKey]:
+    """Chaves de deduplicação, iguais às colunas gravadas por ``process_chunk``."""
+    keys = []
+    for addr, norm in zip(addresses, normalize_many(addresses)):
+        cep = extract_cep(addr)
+        keys.append((norm, normalize_cep(cep) if cep else None))
+    return keys
+
+
+class UploadDeduplicator:
+    """
+    Acompanha os endereços únicos de um upload.
+
+    ``known`` mapeia cada chave já resolvida para o id do ``Address``
+    correspondente (processado neste upload ou reaproveitado do banco).
+    Com ``max_keys``, só as chaves usadas mais recentemente são mantidas
+    (streams sem fim): uma repetição mais distante é validada de novo.
+    """
+
+    def __init__(self, db: Session, reuse_seconds: Optional[float] = None, max_keys: Optional[int] = None):
+        self.db = db
+        self.reuse_seconds = DEDUP_REUSE_SECONDS if reuse_seconds is None else reuse_seconds
+        self.max_keys = max_keys
+        self.known: Dict[DedupKey, int] = {}
+        self.rows = 0
+        self.processed = 0
+        self.reused = 0
+
+    def split(
+        self, chunk: List[str], keys: Optional[List[DedupKey]] = None
+    ) -> Tuple[List[DedupKey], List[str], List[Address]]:
+        """
+        Separa um chunk entre o que precisa ser validado e o que já é conhecido.
+
+        Args:
+            chunk: Endereços brutos
+            keys: Chaves já calculadas (ex.: no pool de processos); se omitidas, são calculadas aqui
+
+        Returns:
+            Chave de cada linha do chunk, endereços a validar (primeira
+            ocorrência de cada chave nova) e endereços reaproveitados do banco
+        """
+        keys = dedup_keys(chunk) if keys is None else keys
+        if self.max_keys is not None:
+            self._trim(keys)
+        self.rows += len(chunk)
+        new: Dict[DedupKey, str] = {}
+        for key, addr in zip(keys, chunk):
+            if key not in self.known and key not in new:
+                new[key] = addr
+
+        reused: List[Address] = []
+        if new and self.reuse_seconds > 0:
+            for key, address in self._load_recent(new).items():
+                self.known[key] = address.id
+                del new[key]
+                reused.append(address)
+        self.reused += len(reused)
+        self.processed += len(new)
+        return keys, list(new.values()), reused
+
+    def remember(self, records: Iterable[dict]) -> None:
+        """Registra os endereços gravados pelo ``AddressBatchWriter``."""
+        for rec in records:
+            addr = rec["address"]
+            self.known[(addr["normalized_address"], addr["cep"])] = addr["id"]
+
+    def _trim(self, keys: List[DedupKey]) -> None:
+        # As chaves do chunk atual passam a ser as mais recentes antes do descarte das antigas
+        for key in keys:
+            if key in self.known:
+                self.known[key] = self.known.pop(key)
+        excess = len(self.known) - max(self.max_keys, len(keys))
+        if excess > 0:
+            for key in list(islice(self.known, excess)):
+                del self.known[key]
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Fração das linhas que não precisou ser validada nos provedores."""
+        return (self.rows - self.processed) / self.rows if self.rows else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"unique={self.processed + self.reused}; processed={self.processed}; "
+            f"reused={self.reused}; dedup_ratio={self.dedup_ratio:.3f}"
+        )
+
+    def _load_recent(self, keys: Iterable[DedupKey]) -> Dict[DedupKey, Address]:
+        wanted = set(keys)
+        cutoff = datetime.utcnow() - timedelta(seconds=self.reuse_seconds)
+        stmt = (
+            select(Address)
+            .where(
+                Address.normalized_address.in_({norm for norm, _ in wanted}),
+                Address.created_at >= cutoff,
+            )
+            .options(selectinload(Address.provider_results))
+            .order_by(Address.id)
+        )
+        found: Dict[DedupKey, Address] = {}
+        # Em caso de vários registros, fica o mais recente
+        for address in self.db.scalars(stmt):
+            key = (address.normalized_address, address.cep)
+            if key in wanted:
+                found[key] = address
+        return found
@@ -0,0 +1,430 @@
+"""
+Jobs de upload em segundo plano, processados em chunks por um pool de workers
+
+Cada chunk é gravado na mesma transação que marca as linhas do job como
+processadas (``UploadJobRow.address_id``), então um job interrompido é
+retomado a partir do último chunk confirmado.
+
+Um job só é processado por quem detém a sua posse (``owner``/``lease_until``,
+tomada com um UPDATE condicional em ``claim_job``). A posse é renovada a cada
+chunk gravado e conferida na mesma transação: se ela venceu e outro worker
+assumiu o job, o chunk é desfeito e o worker antigo desiste.
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..config import JOB_CHUNK_SIZE, JOB_LEASE_SECONDS, JOB_WORKERS
+from ..database import SessionLocal
+from ..models import Address, AuditLog, UploadJob, UploadJobRow
+from ..providers.http_client import close_http_client
+from ..schemas import JobOut
+from .callbacks import deliver_job_callback
+from .dedup import UploadDeduplicator
+from .pipeline import Pipeline, Sink, Source
+from .processing import chunks
+
+logger = logging.getLogger("jobs")
+
+
+class LeaseLost(RuntimeError):
+    """A posse do job venceu e outro worker o assumiu."""
+
+
+def create_job(
+    db: Session,
+    source: str,
+    filename: Optional[str],
+    addresses: Iterable[str],
+    idempotency_key: Optional[str] = None,
+    callback_url: Optional[str] = None,
+) -> UploadJob:
+    """
+    Persiste o job e suas linhas de entrada (status ``queued``).
+
+    Uma ``idempotency_key`` já usada por outro job gera ``IntegrityError`` no
+    flush; o chamador deve fazer rollback e retornar o job existente.
+    """
+    job = UploadJob(
+        source=source,
+        filename=filename,
+        status="queued",
+        total_rows=0,
+        idempotency_key=idempotency_key,
+        callback_url=callback_url,
+        callback_status="pending" if callback_url else None,
+    )
+    db.add(job)
+    db.flush()
+    total = 0
+    for chunk in chunks((str(a) for a in addresses), 5000):
+        db.execute(
+            insert(UploadJobRow),
+            [{"job_id": job.id, "seq": total + i, "raw_address": a} for i, a in enumerate(chunk)],
+        )
+        total += len(chunk)
+    job.total_rows = total
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _claimable(now: datetime):
+    """Jobs com trabalho a fazer (processar ou entregar o callback) e sem posse válida."""
+    return and_(
+        or_(UploadJob.status.in_(("queued", "running")), UploadJob.callback_status == "pending"),
+        or_(UploadJob.lease_until.is_(None), UploadJob.lease_until < now),
+    )
+
+
+def claimable_jobs(db: Session) -> List[int]:
+    """Ids dos jobs que um worker pode assumir agora, do mais antigo ao mais novo."""
+    return list(db.scalars(select(UploadJob.id).where(_claimable(datetime.utcnow())).order_by(UploadJob.id)))
+
+
+def claim_job(db: Session, job_id: int, owner: str) -> bool:
+    """
+    Toma a posse do job por ``JOB_LEASE_SECONDS``.
+
+    O UPDATE só altera o job se ele ainda tem trabalho a fazer e ninguém detém
+    uma posse válida; entre workers concorrentes, apenas um vê ``rowcount == 1``.
+
+    Args:
+        db: Sessão do banco (a posse é confirmada com commit)
+        job_id: Job a assumir
+        owner: Identificador único de quem assume
+
+    Returns:
+        True se ``owner`` passou a deter o job
+    """
+    now = datetime.utcnow()
+    result = db.execute(
+        update(UploadJob)
+        .where(UploadJob.id == job_id, _claimable(now))
+        .values(owner=owner, lease_until=now + timedelta(seconds=JOB_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def release_job(db: Session, job_id: int, owner: str) -> None:
+    """Libera a posse do job, se ``owner`` ainda a detém."""
+    db.execute(
+        update(UploadJob)
+        .where(UploadJob.id == job_id, UploadJob.owner == owner)
+        .values(owner=None, lease_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _renew_lease(db: Session, job_id: int, owner: str, **values: Any) -> None:
+    """
+    Renova a posse e grava ``values`` no job, na transação corrente.
+
+    Raises:
+        LeaseLost: Outro worker assumiu o job
+    """
+    result = db.execute(
+        update(UploadJob)
+        .where(UploadJob.id == job_id, UploadJob.owner == owner)
+        .values(lease_until=datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS), **values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise LeaseLost(f"Job {job_id}: a posse passou para outro worker")
+
+
+def job_out(job: UploadJob) -> JobOut:
+    rows_per_second = None
+    if job.started_at and job.processed_rows:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+        if elapsed > 0:
+            rows_per_second = job.processed_rows / elapsed
+    return JobOut(
+        id=job.id,
+        source=job.source,
+        filename=job.filename,
+        status=job.status,
+        total_rows=job.total_rows or 0,
+        processed_rows=job.processed_rows or 0,
+        progress=((job.processed_rows or 0) / job.total_rows) if job.total_rows else 1.0,
+        rows_per_second=rows_per_second,
+        error_count=job.error_count or 0,
+        last_error=job.last_error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        callback_status=job.callback_status,
+    )
+
+
+class JobSink(Sink):
+    """
+    Fonte e destino de um job: lê as linhas pendentes e as marca como
+    processadas na mesma transação que grava cada chunk, renovando a posse do job.
+    """
+
+    needs_results = False
+
+    def __init__(self, db: Session, job_id: int, owner: str):
+        self.db = db
+        self.job_id = job_id
+        self.owner = owner
+        self._row_ids: Deque[int] = deque()
+
+    def pending_rows(self, page_size: int) -> Iterator[str]:
+        """Endereços das linhas ainda sem ``address_id``, na ordem de ``seq``."""
+        last_seq = -1
+        while True:
+            # Paginação por seq: o pipeline lê o próximo chunk antes do commit do atual
+            rows = self.db.execute(
+                select(UploadJobRow.id, UploadJobRow.seq, UploadJobRow.raw_address)
+                .where(
+                    UploadJobRow.job_id == self.job_id,
+                    UploadJobRow.address_id.is_(None),
+                    UploadJobRow.seq > last_seq,
+                )
+                .order_by(UploadJobRow.seq)
+                .limit(page_size)
+            ).all()
+            if not rows:
+                return
+            for row in rows:
+                self._row_ids.append(row.id)
+                yield row.raw_address
+            last_seq = rows[-1].seq
+
+    def before_commit(self, chunk: List[str], address_ids: List[int], logs: List[Dict[str, Any]]) -> None:
+        row_ids = [self._row_ids.popleft() for _ in chunk]
+        self.db.execute(
+            update(UploadJobRow),
+            [{"id": row_id, "address_id": addr_id} for row_id, addr_id in zip(row_ids, address_ids)],
+        )
+        values = {
+            "processed_rows": UploadJob.processed_rows + len(chunk),
+            "error_count": UploadJob.error_count + len(logs),
+        }
+        if logs:
+            values["last_error"] = logs[-1]["details"]
+        _renew_lease(self.db, self.job_id, self.owner, **values)
+
+
+def restore_dedup(db: Session, job_id: int, dedup: UploadDeduplicator) -> None:
+    """
+    Registra no deduplicador os endereços já gravados pelo job.
+
+    Na retomada, as linhas pendentes que repetem um endereço de um chunk já
+    confirmado apontam para ele em vez de gerar um novo ``Address``, como
+    aconteceria se o job não tivesse sido interrompido.
+    """
+    rows = db.execute(
+        select(Address.id, Address.normalized_address, Address.cep)
+        .join(UploadJobRow, UploadJobRow.address_id == Address.id)
+        .where(UploadJobRow.job_id == job_id)
+        .distinct()
+    )
+    dedup.remember(
+        {"address": {"id": row.id, "normalized_address": row.normalized_address, "cep": row.cep}} for row in rows
+    )
+
+
+async def run_job(job_id: int, chunk_size: Optional[int] = None) -> bool:
+    """
+    Processa as linhas pendentes do job, um chunk por transação, e entrega o callback (se houver).
+
+    Args:
+        job_id: Job a processar
+        chunk_size: Endereços por transação (padrão: ``JOB_CHUNK_SIZE``)
+
+    Returns:
+        False se outro worker detém o job (nada foi feito)
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    db = SessionLocal()
+    try:
+        if not claim_job(db, job_id, owner):
+            return False
+        try:
+            await _process_job(db, job_id, chunk_size or JOB_CHUNK_SIZE, owner)
+            job = db.get(UploadJob, job_id)
+            if job is not None and job.owner == owner and job.callback_url and job.callback_status == "pending":
+                _renew_lease(db, job_id, owner)
+                db.commit()
+                try:
+                    await deliver_job_callback(db, job)
+                except Exception as ex:
+                    logger.exception("Job %s: falha ao entregar o callback: %s", job_id, ex)
+        except LeaseLost as ex:
+            logger.warning("%s", ex)
+        finally:
+            # Interrupção (cancelamento, desligamento): desfaz o chunk em andamento antes de liberar
+            db.rollback()
+            release_job(db, job_id, owner)
+        return True
+    finally:
+        db.close()
+
+
+async def _process_job(db: Session, job_id: int, chunk_size: int, owner: str) -> None:
+    try:
+        job = db.get(UploadJob, job_id)
+        if job is None or job.status in ("completed", "failed"):
+            return
+        _renew_lease(db, job_id, owner, status="running", started_at=func.coalesce(UploadJob.started_at, datetime.utcnow()))
+        db.commit()
+
+        # Linhas repetidas apontam para o endereço já processado (ou reaproveitado)
+        pipeline = Pipeline(db, chunk_size)
+        restore_dedup(db, job_id, pipeline.dedup)
+        sink = JobSink(db, job_id, owner)
+        await pipeline.run(Source("job", sink.pending_rows(pipeline.chunk_size)), sink)
+
+        job = db.get(UploadJob, job_id)
+        _renew_lease(db, job_id, owner, status="completed", finished_at=datetime.utcnow())
+        event = "webhook_process" if job.source == "webhook" else f"upload_{job.source}"
+        db.add(AuditLog(event=event, details=f"file={job.filename}; rows={job.total_rows}; job={job_id}; {pipeline.dedup.summary()}"))
+        db.commit()
+    except LeaseLost as ex:
+        # O chunk em andamento foi desfeito; o novo dono continua de onde parou
+        logger.warning("%s", ex)
+        db.rollback()
+    except Exception as ex:
+        logger.exception("Job %s falhou: %s", job_id, ex)
+        db.rollback()
+        db.execute(
+            update(UploadJob)
+            .where(UploadJob.id == job_id, UploadJob.owner == owner)
+            .values(status="failed", last_error=str(ex), finished_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    finally:
+        # As atualizações acima não passam pelo ORM: relê o job no próximo acesso
+        db.expire_all()
+
+
+class JobWorkerPool:
+    """
+    Pool de workers asyncio que consomem ids de jobs de uma fila.
+
+    Os workers rodam em um event loop próprio, numa thread dedicada: a gravação
+    dos chunks, a deduplicação e a leitura das linhas usam o SQLAlchemy de forma
+    síncrona, e no loop da API travariam todas as requisições a cada commit.
+    ``submit`` pode ser chamado de qualquer thread.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, recover_interval: float = JOB_LEASE_SECONDS / 2):
+        self.workers = max(1, workers)
+        self.recover_interval = recover_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._active: Set[int] = set()
+
+    async def start(self) -> None:
+        """
+        Inicia os workers e reenfileira os jobs pendentes ou com callback não
+        entregue; jobs ``running`` só voltam à fila quando a posse vence (o
+        worker que os processava caiu), o que é verificado periodicamente.
+        """
+        self._ensure_started()
+        await asyncio.to_thread(self.submit_claimable)
+
+    def submit_claimable(self) -> None:
+        """Enfileira os jobs que nenhum worker detém."""
+        db = SessionLocal()
+        try:
+            pending = claimable_jobs(db)
+        finally:
+            db.close()
+        for job_id in pending:
+            self.submit(job_id)
+
+    async def stop(self) -> None:
+        """Cancela os workers (os chunks em andamento são desfeitos e a posse liberada) e encerra a thread."""
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = None
+        if thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        await asyncio.to_thread(thread.join)
+        with self._lock:
+            self._active.clear()
+
+    async def join(self) -> None:
+        """Aguarda até a fila esvaziar e os jobs enfileirados terminarem."""
+        if self._thread is not None:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop))
+
+    def submit(self, job_id: int) -> None:
+        self._ensure_started()
+        with self._lock:
+            if job_id in self._active:
+                return
+            self._active.add(job_id)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            ready = threading.Event()
+            self._active.clear()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name="job-workers", daemon=True)
+            self._thread.start()
+        ready.wait()
+
+    def _run(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        tasks.append(loop.create_task(self._recover()))
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(close_http_client())
+            loop.close()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await run_job(job_id)
+            except Exception as ex:
+                # Falha fora do processamento (ex.: banco travado ao tomar ou liberar a posse):
+                # o worker segue para o próximo job e este volta pela varredura de posses vencidas
+                logger.exception("Job %s: falha no worker: %s", job_id, ex)
+            finally:
+                with self._lock:
+                    self._active.discard(job_id)
+                self._queue.task_done()
+
+    async def _recover(self) -> None:
+        while True:
+            await asyncio.sleep(self.recover_interval)
+            try:
+                self.submit_claimable()
+            except Exception as ex:
+                logger.exception("Falha ao buscar jobs com a posse vencida: %s", ex)
+
+
+job_pool = JobWorkerPool()
@@ -1,17 +1,76 @@
 import re
 import unicodedata
-from rapidfuzz import fuzz
-from typing import Optional
+import string
+import numpy as np
+from functools import lru_cache
+from rapidfuzz import fuzz, process
+from typing import Iterable, List, Optional, Sequence
+
+from ..config import NORMALIZE_CACHE_SIZE, SCORING_WORKERS
+from ..metrics import register_callback
+
+
+
+def _translate_table(fold_upper: bool) -> bytes:
+    # Letras minúsculas e dígitos ficam; todo o resto vira espaço
+    table = bytearray(b" ") * 256
+    for c in string.ascii_lowercase + string.digits:
+        table[ord(c)] = ord(c)
+    if fold_upper:
+        for c in string.ascii_uppercase:
+            table[ord(c)] = ord(c.lower())
+    return bytes(table)
+
+
+# Entrada ASCII: a própria tabela converte para minúsculas
+_ASCII_TABLE = _translate_table(fold_upper=True)
+# Após NFKD: maiúsculas só podem vir da decomposição e viram espaço, como antes
+_DECOMPOSED_TABLE = _translate_table(fold_upper=False)
+
+
+def _normalize(addr: str) -> str:
+    if addr.isascii():
+        # Caminho rápido: sem decomposição Unicode
+        data = addr.encode("ascii").translate(_ASCII_TABLE, b"-")
+    else:
+        # Remove acentos; caracteres sem equivalente ASCII são descartados
+        data = unicodedata.normalize("NFKD", addr.lower()).encode("ascii", "ignore")
+        data = data.translate(_DECOMPOSED_TABLE, b"-")
+    # O hífen é removido sem virar espaço (ex.: 12345-678 -> 12345678)
+    return b" ".join(data.split()).decode("ascii")
+
+
+_normalize_cached = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(_normalize)
+
+
+def _normalize_cache_requests():
+    info = _normalize_cached.cache_info()
+    return [(("normalize", "hit_memory"), info.hits), (("normalize", "miss"), info.misses)]
+
+
+register_callback(
+    "geomatch_cache_requests_total",
+    "Consultas aos caches por resultado.",
+    ["namespace", "result"],
+    _normalize_cache_requests,
+    kind="counter",
+)
 
 
 def normalize_address(addr: str) -> str:
-    s = addr.lower().strip()
-    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-    # remove hyphens without adding spaces (e.g., 12345-678 -> 12345678)
-    s = s.replace("-", "")
-    s = re.sub(r"[^a-z0-9\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    """
+    Normaliza um endereço: minúsculas, sem acentos, sem pontuação e com espaços simples.
+
+    O resultado é guardado em um cache LRU limitado (``NORMALIZE_CACHE_SIZE``),
+    já que o mesmo texto é normalizado várias vezes ao longo do pipeline.
+    """
+    return _normalize_cached(addr)
+
+
+def normalize_many(addresses: Iterable[str]) -> List[str]:
+    """Versão em lote de ``normalize_address``, na mesma ordem da entrada."""
+    normalize = _normalize_cached
+    return [normalize(a) for a in addresses]
 
 
 def similarity_score(a: str, b: str) -> float:
@@ -50,6 +109,82 @@ def similarity_score_with_cep(a: str, b: str, cep_a: Optional[str] = None, cep_b
     return base_score
 
 
+def _cep_digits(cep: Optional[str]) -> str:
+    return re.sub(r'\D', '', cep) if cep else ""
+
+
+def batch_similarity_scores(
+    a: Sequence[str], b: Sequence[str], workers: int = SCORING_WORKERS
+) -> np.ndarray:
+    """
+    Versão em lote de ``similarity_score``: compara ``a[i]`` com ``b[i]``.
+
+    Args:
+        a: Endereços de entrada
+        b: Candidatos, na mesma ordem e tamanho de ``a``
+        workers: Threads usadas pelo rapidfuzz (-1 usa todos os núcleos)
+
+    Returns:
+        Array float64 com um score (0-100) por par
+    """
+    if len(a) != len(b):
+        raise ValueError("Listas de endereços e candidatos com tamanhos diferentes")
+    if not len(a):
+        return np.zeros(0, dtype=np.float64)
+    return process.cpdist(
+        a, b, scorer=fuzz.token_sort_ratio, processor=str.lower, dtype=np.float64, workers=workers
+    )
+
+
+def similarity_matrix(
+    queries: Sequence[str], choices: Sequence[str], workers: int = SCORING_WORKERS
+) -> np.ndarray:
+    """
+    Scores de todos os ``queries`` contra todos os ``choices``.
+
+    Returns:
+        Matriz float64 (len(queries) x len(choices))
+    """
+    if not len(queries) or not len(choices):
+        return np.zeros((len(queries), len(choices)), dtype=np.float64)
+    return process.cdist(
+        queries, choices, scorer=fuzz.token_sort_ratio, processor=str.lower, dtype=np.float64, workers=workers
+    )
+
+
+def batch_similarity_scores_with_cep(
+    a: Sequence[str],
+    b: Sequence[str],
+    ceps_a: Optional[Sequence[Optional[str]]] = None,
+    ceps_b: Optional[Sequence[Optional[str]]] = None,
+    workers: int = SCORING_WORKERS,
+) -> np.ndarray:
+    """
+    Versão em lote de ``similarity_score_with_cep``, com o boost de CEP vetorizado.
+
+    Args:
+        a: Endereços de entrada
+        b: Candidatos, na mesma ordem de ``a``
+        ceps_a: CEPs das entradas (itens podem ser None)
+        ceps_b: CEPs dos candidatos (itens podem ser None)
+        workers: Threads usadas pelo rapidfuzz
+
+    Returns:
+        Array float64 com os scores ajustados (0-100)
+    """
+    scores = batch_similarity_scores(a, b, workers)
+    if ceps_a is None or ceps_b is None or not len(scores):
+        return scores
+    same_cep = np.fromiter(
+        (bool(x and y) and _cep_digits(x) == _cep_digits(y) for x, y in zip(ceps_a, ceps_b)),
+        dtype=bool,
+        count=len(scores),
+    )
+    # Mesmo ajuste da versão escalar: quanto menor o score base, maior o boost
+    boosted = np.minimum(100.0, scores + 15 * (1 - scores / 100))
+    return np.where(same_cep, boosted, scores)
+
+
 def pick_best_result(results):
     if not results:
         return None
@@ -69,6 +204,17 @@ def classify_score(score: float) -> str:
     return "NO_MATCH"
 
 
+_SCORE_THRESHOLDS = np.array([50, 70, 80, 90], dtype=np.float64)
+_SCORE_LABELS = np.array(
+    ["NO_MATCH", "MATCH_INDEFINIDO", "MATCH_POSSIVEL", "MATCH_PROVAVEL", "MATCH_CONFIRMADO"]
+)
+
+
+def classify_scores(scores: Sequence[float]) -> np.ndarray:
+    """Versão vetorizada de ``classify_score`` (mesmos limiares)."""
+    return _SCORE_LABELS[np.searchsorted(_SCORE_THRESHOLDS, np.asarray(scores, dtype=np.float64), side="right")]
+
+
 def calculate_match_score(input_addr: str, matched_addr: str) -> dict:
     """Calcula score de similaridade entre enderecos normalizados e retorna classificacao.
 
@@ -1,61 +1,537 @@
+import codecs
+import csv
 import io
+import json
 import re
-import pandas as pd
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
 
+ADDRESS_COLUMNS = ["address", "endereco", "logradouro", "rua"]
 
-def read_csv_addresses(content: bytes):
-    df = pd.read_csv(io.BytesIO(content))
-    col_candidates = ["address", "endereco", "logradouro", "rua"]
-    col = next((c for c in col_candidates if c in df.columns), None)
+
+def iter_csv_addresses(fileobj: BinaryIO, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Lê endereços de um CSV em streaming, linha a linha.
+
+    O cabeçalho é lido imediatamente (erros de coluna são levantados na chamada);
+    as linhas são produzidas sob demanda e apenas a coluna de endereço é
+    materializada, então a memória não depende do tamanho do arquivo.
+
+    Args:
+        fileobj: Arquivo binário (ex.: ``UploadFile.file``, já em disco se grande)
+        encoding: Codificação do arquivo (BOM UTF-8 é ignorado)
+
+    Returns:
+        Gerador de endereços (linhas com endereço vazio são ignoradas)
+
+    Raises:
+        ValueError: Se nenhuma coluna de endereço conhecida existir
+    """
+    if encoding.lower().replace("-", "") == "utf8":
+        encoding = "utf-8-sig"
+    text = io.TextIOWrapper(fileobj, encoding=encoding, newline="")
+    reader = csv.reader(text)
+    header = [h.strip() for h in next(reader, [])]
+    col = next((c for c in ADDRESS_COLUMNS if c in header), None)
     if not col:
-        raise ValueError(f"Coluna de endereço não encontrada. Use uma das: {col_candidates}")
-    return [str(v) for v in df[col].tolist()]
+        text.detach()
+        raise ValueError(f"Coluna de endereço não encontrada. Use uma das: {ADDRESS_COLUMNS}")
+    idx = header.index(col)
+    last = idx == len(header) - 1
 
+    def rows() -> Iterator[str]:
+        try:
+            for row in reader:
+                if len(row) <= idx:
+                    continue
+                # Endereço sem aspas na última coluna: as vírgulas excedentes fazem parte dele
+                value = ",".join(row[idx:]) if last and len(row) > len(header) else row[idx]
+                value = value.strip()
+                if value:
+                    yield value
+        finally:
+            # Não fecha o arquivo subjacente junto com o wrapper
+            text.detach()
 
-def parse_sql_addresses(sql_text: str):
-    # Parser simples: localiza strings entre aspas dentro de VALUES (... 'address' ...)
-    # Aceita aspas simples e duplas, mas prefere simples.
-    # Exemplos de linhas suportadas:
-    # INSERT INTO input_addresses(address) VALUES ('Avenida Paulista, 1000, São Paulo, SP');
-    # Ou: INSERT INTO ... VALUES (1, 'Rua X 123', ...);
-    addresses = []
-    # Extrai texto entre aspas, evitando aspas escapadas
-    # Também procura nomes de colunas comuns após INSERT INTO ... (address|endereco|logradouro|rua)
-    # Se não houver estrutura, fallback para qualquer string entre aspas que se pareça com endereço.
-
-    insert_regex = re.compile(r"INSERT\s+INTO\s+.*?VALUES\s*\((.*?)\)\s*;?", re.IGNORECASE | re.DOTALL)
-    quoted_regex = re.compile(r"'(?:[^']|''|\\')+'|\"(?:[^\"]|\\\")+\"")
-
-    for m in insert_regex.finditer(sql_text):
-        inner = m.group(1)
-        # Find all quoted values in the VALUES list
-        qs = quoted_regex.findall(inner)
-        for q in qs:
-            # Remove aspas e faz unescape
-            if q.startswith("'") and q.endswith("'"):
-                val = q[1:-1].replace("''", "'")
-            elif q.startswith('"') and q.endswith('"'):
-                val = q[1:-1].replace('\"', '"')
-            else:
+    return rows()
+
+
+def read_csv_addresses(content: bytes):
+    return list(iter_csv_addresses(io.BytesIO(content)))
+
+
+class ParseError(ValueError):
+    """Arquivo de entrada sem endereços reconhecíveis."""
+
+
+# Tokens de SQL. Um token que termina no fim do buffer pode estar incompleto e
+# força a leitura de mais dados; "open" marca aspas/comentários ainda não fechados.
+_SQL_TOKEN = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<comment>--[^\n]*|/\*.*?\*/)
+    |(?P<str>'(?:[^'\\]|''|\\.)*')
+    |(?P<ident>"(?:[^"\\]|""|\\.)*"|`(?:[^`]|``)*`)
+    |(?P<punct>[(),;])
+    |(?P<open>['"`]|/\*)
+    |(?P<word>[^\s'"`(),;]+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+# Caminho rápido para tuplas "planas" de VALUES (sem parênteses aninhados):
+# a tupla inteira e seus valores são lidos com uma chamada de regex cada.
+_SQL_STR = r"'[^'\\]*(?:(?:''|\\.)[^'\\]*)*'"
+_SQL_DSTR = r'"[^"\\]*(?:(?:""|\\.)[^"\\]*)*"'
+_SQL_ATOM = r"[^'\"(),\s]+"
+_SQL_VALUE = re.compile(rf"{_SQL_STR}|{_SQL_DSTR}|{_SQL_ATOM}", re.DOTALL)
+_SQL_FLAT_TUPLE = re.compile(
+    rf"\s*,?\s*\(\s*((?:{_SQL_VALUE.pattern})(?:\s*,\s*(?:{_SQL_VALUE.pattern}))*)\s*\)",
+    re.DOTALL,
+)
+_TUPLE_LOOKAHEAD = 1 << 16
+_BACKSLASH_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "0": "\0", "b": "\b", "Z": "\x1a"}
+_COPY_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f", "v": "\v"}
+_BACKSLASH_RE = re.compile(r"\\(.)", re.DOTALL)
+_LETTER_RE = re.compile(r"[a-zA-Z]")
+_DIGIT_RE = re.compile(r"\d")
+_CONSTRAINT_WORDS = {"PRIMARY", "KEY", "UNIQUE", "CONSTRAINT", "INDEX", "FOREIGN", "CHECK", "FULLTEXT", "SPATIAL", "EXCLUDE"}
+_MAX_FALLBACK = 10000
+
+
+def _looks_like_address(val: str) -> bool:
+    # Heurística: provavelmente é endereço se contém letras + dígitos
+    return bool(_LETTER_RE.search(val) and _DIGIT_RE.search(val))
+
+
+def _unquote(token: str) -> str:
+    """Remove aspas de um literal/identificador e desfaz os escapes."""
+    quote, inner = token[0], token[1:-1]
+    if quote == "`":
+        return inner.replace("``", "`")
+    if "\\" in inner:
+        inner = _BACKSLASH_RE.sub(lambda m: _BACKSLASH_ESCAPES.get(m.group(1), m.group(1)), inner)
+    return inner.replace(quote * 2, quote)
+
+
+def _unescape_copy(field: str) -> Optional[str]:
+    if field == "\\N":
+        return None
+    if "\\" not in field:
+        return field
+    return _BACKSLASH_RE.sub(lambda m: _COPY_ESCAPES.get(m.group(1), m.group(1)), field)
+
+
+def _name(parts: List[str]) -> Optional[str]:
+    """Nome de tabela sem esquema/aspas, em minúsculas (ex.: public."T" -> t)."""
+    name = "".join(parts).split(".")[-1]
+    return name.lower() or None
+
+
+def _address_index(columns: Optional[List[str]]) -> Optional[int]:
+    if not columns:
+        return None
+    for c in ADDRESS_COLUMNS:
+        if c in columns:
+            return columns.index(c)
+    return None
+
+
+class _SqlStream:
+    """Buffer de texto sobre um arquivo binário, lido em blocos sob demanda."""
+
+    def __init__(self, fileobj: BinaryIO, encoding: str, chunk_size: int):
+        self._file = fileobj
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+        self._chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> None:
+        data = self._file.read(self._chunk_size)
+        if not data:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self._decoder.decode(data or b"", final=not data)
+        self.pos = 0
+
+    def tokens(self) -> Iterator[Tuple[str, str]]:
+        while True:
+            m = _SQL_TOKEN.match(self.buf, self.pos)
+            if m is None or (not self.eof and (m.end() == len(self.buf) or m.lastgroup == "open")):
+                if self.eof:
+                    return
+                self._fill()
                 continue
-            # Heurística: provavelmente é endereço se contém letras + dígitos ou separadores comuns
-            if re.search(r"[a-zA-Z]", val) and re.search(r"\d", val):
-                addresses.append(val)
-                break  # assume que a primeira string adequada entre aspas é o endereço
-
-    if not addresses:
-        # Fallback: qualquer string entre aspas, linha por linha (ex: um endereço por linha)
-        for q in quoted_regex.findall(sql_text):
-            if q.startswith("'") and q.endswith("'"):
-                val = q[1:-1].replace("''", "'")
-            elif q.startswith('"') and q.endswith('"'):
-                val = q[1:-1].replace('\"', '"')
+            self.pos = m.end()
+            kind = m.lastgroup
+            if kind == "ws" or kind == "comment":
+                continue
+            if kind == "open":
+                # Aspas/comentário nunca fechados no fim do arquivo
+                kind = "word"
+            yield kind, m.group()
+
+    def take_flat_tuple(self) -> Optional[str]:
+        """Consome ``[,] (v1, v2, ...)`` se a próxima tupla for plana; senão None."""
+        while not self.eof and len(self.buf) - self.pos < _TUPLE_LOOKAHEAD:
+            self._fill()
+        m = _SQL_FLAT_TUPLE.match(self.buf, self.pos)
+        if m is None:
+            return None
+        self.pos = m.end()
+        return m.group(1)
+
+    def readline(self) -> Optional[str]:
+        while True:
+            i = self.buf.find("\n", self.pos)
+            if i >= 0:
+                line = self.buf[self.pos:i]
+                self.pos = i + 1
+                return line[:-1] if line.endswith("\r") else line
+            if self.eof:
+                if self.pos < len(self.buf):
+                    line = self.buf[self.pos:]
+                    self.pos = len(self.buf)
+                    return line
+                return None
+            self._fill()
+
+
+class _SqlAddressParser:
+    """
+    Extrai endereços de um dump SQL em uma única passada.
+
+    - ``INSERT``/``REPLACE`` com uma ou várias tuplas: usa a coluna de endereço
+      da lista de colunas do INSERT ou do ``CREATE TABLE`` visto antes; sem
+      coluna conhecida, usa a primeira string da tupla que pareça endereço.
+    - ``COPY ... FROM stdin`` (pg_dump): lê as linhas de dados até ``\\.``.
+    - Sem nenhum INSERT/COPY com endereço, strings soltas que pareçam endereço
+      são usadas (guardadas até um limite e então emitidas em streaming).
+    """
+
+    def __init__(self, stream: _SqlStream):
+        self.stream = stream
+        self.tokens = stream.tokens()
+        self.tables: Dict[str, List[str]] = {}
+        self.found = 0
+        self.fallback: List[str] = []
+        self.fallback_streaming = False
+
+    def addresses(self) -> Iterator[str]:
+        for kind, value in self.tokens:
+            if kind == "word":
+                keyword = value.upper()
+                if keyword in ("INSERT", "REPLACE"):
+                    yield from self._insert()
+                    continue
+                if keyword == "COPY":
+                    yield from self._copy()
+                    continue
+                if keyword == "CREATE":
+                    yield from self._create()
+                    continue
+            if kind != "punct" or value != ";":
+                yield from self._skip_statement((kind, value))
+
+        if not self.found and self.fallback:
+            self.found += len(self.fallback)
+            yield from self.fallback
+            self.fallback = []
+        if not self.found:
+            raise ParseError("Não foi possível extrair endereços do SQL enviado.")
+
+    def _emit(self, value: Optional[str]) -> Iterator[str]:
+        if value:
+            self.found += 1
+            # Há endereços estruturados: as strings soltas deixam de valer
+            if not self.fallback_streaming:
+                self.fallback = []
+            yield value
+
+    def _loose_string(self, value: str) -> Iterator[str]:
+        if self.found and not self.fallback_streaming:
+            return
+        if not _looks_like_address(value):
+            return
+        if self.fallback_streaming:
+            self.found += 1
+            yield value
+            return
+        self.fallback.append(value)
+        if len(self.fallback) > _MAX_FALLBACK:
+            # Limite atingido: passa a emitir em streaming para manter memória constante
+            self.fallback_streaming = True
+            self.found += len(self.fallback)
+            yield from self.fallback
+            self.fallback = []
+
+    def _skip_statement(self, first: Optional[Tuple[str, str]] = None, loose: bool = True) -> Iterator[str]:
+        if first is not None:
+            kind, value = first
+            if kind == "punct" and value == ";":
+                return
+            if loose and kind in ("str", "ident"):
+                yield from self._loose_string(_unquote(value))
+        for kind, value in self.tokens:
+            if kind == "punct" and value == ";":
+                return
+            if loose and kind in ("str", "ident"):
+                yield from self._loose_string(_unquote(value))
+
+    def _name_list(self) -> List[str]:
+        """Lê ``a, b, c)`` após um parêntese de abertura."""
+        names = []
+        for kind, value in self.tokens:
+            if kind == "punct" and value == ")":
+                break
+            if kind == "ident":
+                names.append(_unquote(value).lower())
+            elif kind == "word":
+                names.append(value.lower())
+        return names
+
+    def _insert(self) -> Iterator[str]:
+        parts: List[str] = []
+        columns = None
+        for kind, value in self.tokens:
+            if kind == "word":
+                keyword = value.upper()
+                if keyword in ("VALUES", "VALUE"):
+                    break
+                if keyword == "SELECT":
+                    yield from self._skip_statement(loose=False)
+                    return
+                if keyword in ("INTO", "IGNORE", "LOW_PRIORITY", "DELAYED", "HIGH_PRIORITY"):
+                    continue
+                parts.append(value)
+            elif kind == "ident":
+                parts.append(_unquote(value))
+            elif kind == "punct" and value == "(":
+                columns = self._name_list()
+            elif kind == "punct" and value == ";":
+                return
+        else:
+            return
+
+        if columns is None:
+            columns = self.tables.get(_name(parts))
+        index = _address_index(columns)
+        while True:
+            inner = self.stream.take_flat_tuple()
+            if inner is not None:
+                yield from self._emit(self._pick(_SQL_VALUE.findall(inner), index))
+                continue
+            kind, value = next(self.tokens, (None, None))
+            if kind is None:
+                return
+            if kind == "punct":
+                if value == "(":
+                    yield from self._emit(self._tuple(index))
+                    continue
+                if value == ",":
+                    continue
+                if value == ";":
+                    return
+            # ON DUPLICATE KEY UPDATE, RETURNING, ...
+            yield from self._skip_statement((kind, value), loose=False)
+            return
+
+    def _pick(self, values: List[str], index: Optional[int]) -> Optional[str]:
+        if index is not None:
+            if index < len(values) and values[index][0] in "'\"":
+                return _unquote(values[index])
+            return None
+        for v in values:
+            if v[0] in "'\"":
+                candidate = _unquote(v)
+                if _looks_like_address(candidate):
+                    return candidate
+        return None
+
+    def _tuple(self, index: Optional[int]) -> Optional[str]:
+        """Lê uma tupla de VALUES após ``(`` e devolve o endereço dela."""
+        depth, position, picked = 1, 0, None
+        for kind, value in self.tokens:
+            if kind == "punct":
+                if value == "(":
+                    depth += 1
+                elif value == ")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                elif value == "," and depth == 1:
+                    position += 1
+                continue
+            if picked is not None or kind not in ("str", "ident"):
+                continue
+            if index is not None:
+                if position == index:
+                    picked = _unquote(value)
             else:
+                # Sem coluna conhecida: primeira string que pareça endereço
+                candidate = _unquote(value)
+                if _looks_like_address(candidate):
+                    picked = candidate
+        return picked
+
+    def _create(self) -> Iterator[str]:
+        parts: List[str] = []
+        is_table = False
+        for kind, value in self.tokens:
+            if kind == "punct":
+                if value == "(" and is_table:
+                    break
+                if value == ";":
+                    return
+                continue
+            keyword = value.upper() if kind == "word" else ""
+            if keyword == "TABLE":
+                is_table = True
+            elif not is_table:
+                if keyword not in ("TEMPORARY", "TEMP", "UNLOGGED", "OR", "REPLACE", "GLOBAL", "LOCAL"):
+                    # CREATE INDEX/VIEW/...: ignora o comando
+                    yield from self._skip_statement(loose=False)
+                    return
+            elif keyword not in ("IF", "NOT", "EXISTS"):
+                parts.append(_unquote(value) if kind == "ident" else value)
+        else:
+            return
+
+        columns: List[str] = []
+        depth, item_start = 1, True
+        for kind, value in self.tokens:
+            if kind == "punct":
+                if value == "(":
+                    depth += 1
+                elif value == ")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                elif value == "," and depth == 1:
+                    item_start = True
                 continue
-            if re.search(r"[a-zA-Z]", val) and re.search(r"\d", val):
-                addresses.append(val)
+            if item_start and depth == 1:
+                item_start = False
+                name = _unquote(value) if kind == "ident" else value
+                if kind == "ident" or name.upper() not in _CONSTRAINT_WORDS:
+                    columns.append(name.lower())
+        table = _name(parts)
+        if table:
+            self.tables[table] = columns
+        yield from self._skip_statement(loose=False)
+
+    def _copy(self) -> Iterator[str]:
+        parts: List[str] = []
+        columns = None
+        from_stdin = False
+        for kind, value in self.tokens:
+            if kind == "punct":
+                if value == "(" and columns is None:
+                    columns = self._name_list()
+                elif value == ";":
+                    break
+                continue
+            keyword = value.upper() if kind == "word" else ""
+            if keyword == "FROM":
+                from_stdin = None
+            elif from_stdin is None:
+                from_stdin = keyword == "STDIN"
+            elif from_stdin is False and columns is None:
+                parts.append(_unquote(value) if kind == "ident" else value)
+        else:
+            return
+        if not from_stdin:
+            return
+
+        if columns is None:
+            columns = self.tables.get(_name(parts))
+        index = _address_index(columns)
+        self.stream.readline()  # resto da linha do COPY
+        while True:
+            line = self.stream.readline()
+            if line is None or line == "\\.":
+                return
+            fields = line.split("\t")
+            if index is not None:
+                value = _unescape_copy(fields[index]) if index < len(fields) else None
+            else:
+                value = next(
+                    (v for v in map(_unescape_copy, fields) if v and _looks_like_address(v)),
+                    None,
+                )
+            yield from self._emit(value)
+
+
+def iter_sql_addresses(fileobj: BinaryIO, encoding: str = "utf-8", chunk_size: int = 1 << 16) -> Iterator[str]:
+    """
+    Extrai endereços de um dump SQL (mysqldump/pg_dump ou inserts simples) em
+    streaming, lendo o arquivo em blocos de ``chunk_size`` bytes.
+
+    Args:
+        fileobj: Arquivo binário
+        encoding: Codificação (bytes inválidos são ignorados)
+        chunk_size: Tamanho dos blocos lidos
+
+    Returns:
+        Gerador de endereços
+
+    Raises:
+        ParseError: Ao fim da leitura, se nenhum endereço for encontrado
+    """
+    return _SqlAddressParser(_SqlStream(fileobj, encoding, chunk_size)).addresses()
+
+
+def parse_sql_addresses(sql_text: str):
+    return list(iter_sql_addresses(io.BytesIO(sql_text.encode("utf-8"))))
+
+
+async def aiter_ndjson_addresses(
+    chunks: AsyncIterable[bytes], encoding: str = "utf-8", max_line: int = 1 << 20
+) -> AsyncIterator[str]:
+    """
+    Lê endereços de um corpo NDJSON (um valor JSON por linha) recebido em blocos.
+
+    Cada linha é uma string com o endereço ou um objeto com uma das colunas
+    ``ADDRESS_COLUMNS`` (ex.: ``{"address": "..."}``); linhas em branco são ignoradas.
+
+    Args:
+        chunks: Blocos de bytes em qualquer tamanho (ex.: ``Request.stream()``)
+        encoding: Codificação do corpo
+        max_line: Tamanho máximo de uma linha, em bytes
+
+    Returns:
+        Gerador assíncrono de endereços (endereços vazios são ignorados)
+
+    Raises:
+        ParseError: Linha que não é JSON, sem endereço ou maior que ``max_line``
+    """
+    buffer = b""
+    line_no = 0
 
-    if not addresses:
-        raise ValueError("Não foi possível extrair endereços do SQL enviado.")
+    def parse(line: bytes) -> Optional[str]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            value = json.loads(line.decode(encoding))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise ParseError(f"Linha {line_no}: JSON inválido ({e})")
+        if isinstance(value, dict):
+            value = next((value[c] for c in ADDRESS_COLUMNS if c in value), None)
+        if not isinstance(value, str):
+            raise ParseError(f"Linha {line_no}: esperado um texto ou um objeto com uma das colunas {ADDRESS_COLUMNS}")
+        return value.strip() or None
 
-    return addresses
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            value = parse(line)
+            if value:
+                yield value
+        if len(buffer) > max_line:
+            raise ParseError(f"Linha {line_no + 1}: maior que {max_line} bytes")
+    line_no += 1
+    value = parse(buffer)
+    if value:
+        yield value
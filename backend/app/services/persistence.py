@@ -0,0 +1,124 @@
+"""
+Gravação em lote (unit of work) de endereços e resultados de provedores
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..config import DB_CHUNK_SIZE
+from ..metrics import DB_FLUSH_ROWS, DB_FLUSH_SECONDS
+from ..models import Address, ProviderResult, AuditLog
+
+
+def best_result(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Resultado vencedor: maior score; no empate, o último da lista.
+
+    É a única implementação da regra: o ``AddressBatchWriter``, a validação
+    avulsa e o preenchimento da migração 0006 a usam.
+    """
+    best = None
+    for r in results:
+        if best is None or (r["score"] or 0) >= (best["score"] or 0):
+            best = r
+    return best
+
+
+class AddressBatchWriter:
+    """
+    Acumula endereços, resultados de provedores e logs de auditoria e os grava
+    com inserts em lote, em uma única transação por chunk.
+
+    Cada item pendente é um dicionário de colunas de ``Address`` acompanhado
+    da lista de dicionários de colunas de ``ProviderResult`` (sem ``address_id``).
+    Os IDs dos endereços são obtidos em lote via ``INSERT ... RETURNING``.
+    ``best_score`` e ``winner_provider`` do endereço são preenchidos a partir
+    dos resultados ao enfileirar, para que leituras não precisem agregá-los.
+
+    ``before_commit(records, logs)``, se informado, roda dentro da transação de
+    cada flush, permitindo gravar estado adicional (ex.: progresso de um job)
+    atomicamente com o chunk.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: Optional[int] = None,
+        before_commit: Optional[Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], None]] = None,
+    ):
+        self.db = db
+        self.chunk_size = max(1, chunk_size or DB_CHUNK_SIZE)
+        self.before_commit = before_commit
+        self._pending: List[Dict[str, Any]] = []
+        self._logs: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, address: Dict[str, Any], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Enfileira um endereço e seus resultados.
+
+        Returns:
+            Registros gravados, caso o chunk tenha sido completado (senão lista vazia)
+        """
+        best = best_result(results)
+        address["best_score"] = best["score"] if best else None
+        address["winner_provider"] = best["provider_name"] if best else None
+        self._pending.append({"address": address, "results": results})
+        if len(self._pending) >= self.chunk_size:
+            return self.flush()
+        return []
+
+    def log(self, event: str, details: str) -> None:
+        """Enfileira um registro de auditoria para o próximo flush."""
+        self._logs.append({"event": event, "details": details})
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Grava o chunk pendente em uma transação.
+
+        Returns:
+            Lista de registros ``{"address": {..., "id": N}, "results": [...]}``
+            na mesma ordem em que foram adicionados
+        """
+        pending, logs = self._pending, self._logs
+        self._pending, self._logs = [], []
+        if not pending and not logs:
+            return []
+
+        started = time.perf_counter()
+        try:
+            if pending:
+                ids = self._insert_addresses([p["address"] for p in pending])
+                result_rows = []
+                for p, addr_id in zip(pending, ids):
+                    p["address"]["id"] = addr_id
+                    for r in p["results"]:
+                        r["address_id"] = addr_id
+                        result_rows.append(r)
+                if result_rows:
+                    self.db.execute(insert(ProviderResult), result_rows)
+            if logs:
+                self.db.execute(insert(AuditLog), logs)
+            if self.before_commit is not None:
+                self.before_commit(pending, logs)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        DB_FLUSH_SECONDS.observe(time.perf_counter() - started)
+        DB_FLUSH_ROWS.inc(len(pending))
+        return pending
+
+    def _insert_addresses(self, rows: List[Dict[str, Any]]) -> List[int]:
+        if self.db.get_bind().dialect.insert_executemany_returning:
+            stmt = insert(Address).returning(Address.id, sort_by_parameter_order=True)
+            return list(self.db.scalars(stmt, rows))
+        # Backends sem RETURNING em executemany: um INSERT por linha, ainda na mesma transação
+        ids = []
+        for row in rows:
+            ids.append(self.db.execute(insert(Address).values(**row)).inserted_primary_key[0])
+        return ids
@@ -0,0 +1,285 @@
+"""
+Motor do pipeline de endereços, comum a todos os pontos de entrada
+
+    fonte → parse → normalização/CEP → deduplicação → provedores (ondas) → score → gravação em lote → destino
+
+Uma fonte (``Source``) entrega endereços brutos, de um iterável comum ou
+assíncrono: ``csv_source``, ``sql_source``, ``json_source`` (webhook),
+``ndjson_source`` (corpo em streaming) ou as linhas de um job. O ``Pipeline``
+agrupa os endereços em chunks de ``DB_CHUNK_SIZE``; cada chunk é deduplicado,
+validado nos provedores e gravado em uma transação pelo ``AddressBatchWriter``.
+
+Um destino (``Sink``) recebe cada chunk: pode gravar estado na mesma
+transação (``before_commit``, ex.: progresso de um job) e recebe os
+``AddressOut`` de cada linha depois do commit (``write``). ``Pipeline.stream``
+entrega os chunks a quem itera, para respostas em streaming.
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import (
+    Any, AsyncIterable, AsyncIterator, BinaryIO, Deque, Dict, Iterable, List, Optional, Tuple, Union,
+)
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, selectinload
+
+from ..config import API_PROVIDERS, PIPELINE_PREFETCH
+from ..metrics import ROWS_PROCESSED, STAGE_SECONDS
+from ..models import Address, ProviderResult
+from ..providers import get_async_providers
+from ..providers.base import AsyncProvider
+from ..schemas import AddressOut
+from .cpu_pool import get_cpu_pool, prepare_keys_async
+from .dedup import DedupKey, UploadDeduplicator
+from .parser import aiter_ndjson_addresses, iter_csv_addresses, iter_sql_addresses
+from .persistence import AddressBatchWriter
+from .processing import address_out, address_out_from_model, process_chunk
+
+# Resultados mantidos em memória para duplicatas de chunks anteriores; além
+# disso, são relidos do banco
+OUTPUT_CACHE_SIZE = 10_000
+
+
+@dataclass
+class Source:
+    """Endereços de entrada e o rótulo da origem (métricas e audit log)."""
+
+    name: str
+    addresses: Union[Iterable[str], AsyncIterable[str]]
+
+
+def csv_source(fileobj: BinaryIO, name: str = "csv") -> Source:
+    """CSV lido em streaming; erros de cabeçalho são levantados aqui (``ValueError``)."""
+    return Source(name, iter_csv_addresses(fileobj))
+
+
+def sql_source(fileobj: BinaryIO, name: str = "sql") -> Source:
+    return Source(name, iter_sql_addresses(fileobj))
+
+
+def json_source(addresses: Iterable[Any], name: str = "webhook") -> Source:
+    """Lista de endereços de um corpo JSON (valores convertidos para texto)."""
+    return Source(name, (str(a) for a in addresses))
+
+
+def ndjson_source(chunks: AsyncIterable[bytes], name: str = "stream") -> Source:
+    """Corpo NDJSON recebido em blocos (ver ``aiter_ndjson_addresses``)."""
+    return Source(name, aiter_ndjson_addresses(chunks))
+
+
+class Sink:
+    """
+    Destino dos resultados do pipeline; a implementação base descarta tudo.
+
+    Com ``needs_results = False`` o pipeline não monta os ``AddressOut`` das
+    linhas e ``write`` recebe ``None``.
+    """
+
+    needs_results = True
+
+    def before_commit(self, chunk: List[str], address_ids: List[int], logs: List[Dict[str, Any]]) -> None:
+        """Roda na transação do chunk; ``address_ids`` tem o id gravado de cada linha."""
+
+    def write(self, chunk: List[str], results: Optional[List[AddressOut]]) -> None:
+        """Resultados do chunk, um por linha e na mesma ordem, após o commit."""
+
+    def result(self) -> Any:
+        return None
+
+
+class ListSink(Sink):
+    """Acumula os resultados de todas as linhas (resposta de um upload síncrono)."""
+
+    def __init__(self):
+        self.results: List[AddressOut] = []
+
+    def write(self, chunk: List[str], results: Optional[List[AddressOut]]) -> None:
+        self.results.extend(results)
+
+    def result(self) -> List[AddressOut]:
+        return self.results
+
+
+class CountSink(Sink):
+    """Só conta as linhas processadas."""
+
+    needs_results = False
+
+    def __init__(self):
+        self.rows = 0
+
+    def write(self, chunk: List[str], results: Optional[List[AddressOut]]) -> None:
+        self.rows += len(chunk)
+
+    def result(self) -> int:
+        return self.rows
+
+
+class Pipeline:
+    """
+    Processa fontes de endereços com deduplicação, provedores em ondas e gravação em lote.
+
+    Args:
+        db: Sessão usada para deduplicação e gravação
+        chunk_size: Endereços por chunk/transação (padrão ``DB_CHUNK_SIZE``)
+        dedup: Deduplicador compartilhado entre execuções (ex.: vários arquivos)
+        providers: Provedores assíncronos (padrão ``API_PROVIDERS``)
+        track_written: Guarda os ids dos endereços gravados, para ``discard_written``
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: Optional[int] = None,
+        dedup: Optional[UploadDeduplicator] = None,
+        providers: Optional[List[AsyncProvider]] = None,
+        track_written: bool = False,
+    ):
+        self.db = db
+        self.written_ids: Optional[List[int]] = [] if track_written else None
+        self.dedup = dedup or UploadDeduplicator(db)
+        self.providers = get_async_providers(API_PROVIDERS) if providers is None else providers
+        self.writer = AddressBatchWriter(db, chunk_size, before_commit=self._before_commit)
+        self.chunk_size = self.writer.chunk_size
+        self._outputs: "OrderedDict[int, AddressOut]" = OrderedDict()
+        self._current: Optional[Tuple[List[str], List[DedupKey], Sink]] = None
+
+    async def run(self, source: Source, sink: Optional[Sink] = None) -> Any:
+        """Processa a fonte inteira e retorna ``sink.result()``."""
+        sink = sink or Sink()
+        async for chunk, results in self.stream(source, sink):
+            sink.write(chunk, results)
+        return sink.result()
+
+    async def stream(
+        self, source: Source, sink: Optional[Sink] = None
+    ) -> AsyncIterator[Tuple[List[str], Optional[List[AddressOut]]]]:
+        """
+        Processa a fonte e produz ``(chunk, resultados)`` a cada chunk gravado.
+
+        ``sink`` só é usado para ``before_commit`` e ``needs_results``; ``write``
+        fica a cargo de quem itera.
+        """
+        sink = sink or Sink()
+        it = self._chunks(source.addresses)
+        # Chunks seguintes são normalizados (no pool de processos, se ativo) enquanto o atual
+        # passa pelos provedores e pelo banco; a fila preserva a ordem da entrada
+        window: Deque[Tuple[List[str], "asyncio.Future[List[DedupKey]]"]] = deque()
+        prefetch = max(1, PIPELINE_PREFETCH if get_cpu_pool() is not None else 1)
+
+        async def fill_window() -> None:
+            while len(window) < prefetch:
+                # A leitura da fonte é feita em streaming: o tempo de parse é o de cada chunk lido
+                started = time.perf_counter()
+                chunk = await anext(it, None)
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage="parse")
+                if chunk is None:
+                    return
+                window.append((chunk, asyncio.ensure_future(prepare_keys_async(chunk))))
+
+        try:
+            await fill_window()
+            while window:
+                chunk, prepared = window.popleft()
+                with STAGE_SECONDS.time(stage="normalize"):
+                    chunk_keys = await prepared
+                await fill_window()
+                results = await self._process(chunk, chunk_keys, sink)
+                ROWS_PROCESSED.inc(len(chunk), source=source.name)
+                yield chunk, results
+        finally:
+            for _, prepared in window:
+                prepared.cancel()
+            await it.aclose()
+
+    async def _chunks(self, addresses: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[List[str]]:
+        if isinstance(addresses, AsyncIterable):
+            chunk: List[str] = []
+            async for a in addresses:
+                chunk.append(a)
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+            return
+        it = iter(addresses)
+        while True:
+            chunk = list(islice(it, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    async def _process(
+        self, chunk: List[str], chunk_keys: List[DedupKey], sink: Sink
+    ) -> Optional[List[AddressOut]]:
+        keys, pending, reused = self.dedup.split(chunk, chunk_keys)
+        self._current = (chunk, keys, sink)
+        outputs: Dict[int, AddressOut] = {}
+        if pending:
+            key_of = dict(zip(chunk, keys))
+            records = await process_chunk(pending, self.providers, self.writer, [key_of[a] for a in pending])
+            records.extend(self.writer.flush())
+            if sink.needs_results:
+                for rec in records:
+                    outputs[rec["address"]["id"]] = address_out(rec)
+        else:
+            # Chunk só com duplicatas: nada a gravar além do estado do destino
+            self._before_commit([], [])
+            self.db.commit()
+        self._current = None
+        if not sink.needs_results:
+            return None
+
+        for a in reused:
+            outputs[a.id] = address_out_from_model(a)
+        ids = [self.dedup.known[key] for key in keys]
+        for addr_id in set(ids) - outputs.keys():
+            if addr_id in self._outputs:
+                outputs[addr_id] = self._outputs[addr_id]
+        missing = set(ids) - outputs.keys()
+        if missing:
+            # Chaves resolvidas em chunks (ou chamadas com o mesmo ``dedup``) anteriores
+            stmt = select(Address).where(Address.id.in_(missing)).options(selectinload(Address.provider_results))
+            for a in self.db.scalars(stmt):
+                outputs[a.id] = address_out_from_model(a)
+        self._remember_outputs(outputs)
+        return [outputs[addr_id] for addr_id in ids]
+
+    def discard_written(self, batch_size: int = 1000) -> int:
+        """
+        Apaga os endereços (e seus resultados) gravados por esta execução.
+
+        Desfaz os chunks já confirmados quando a fonte falha no meio da leitura
+        (ex.: arquivo com bytes inválidos), sem segurar o arquivo inteiro em
+        memória. Endereços reaproveitados de execuções anteriores são mantidos.
+
+        Returns:
+            Quantidade de endereços apagados
+        """
+        ids, self.written_ids = self.written_ids or [], []
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            self.db.execute(delete(ProviderResult).where(ProviderResult.address_id.in_(batch)))
+            self.db.execute(delete(Address).where(Address.id.in_(batch)))
+        self.db.commit()
+        return len(ids)
+
+    def _before_commit(self, records: List[Dict[str, Any]], logs: List[Dict[str, Any]]) -> None:
+        self.dedup.remember(records)
+        if self.written_ids is not None:
+            self.written_ids.extend(rec["address"]["id"] for rec in records)
+        if self._current is None:
+            return
+        chunk, keys, sink = self._current
+        sink.before_commit(chunk, [self.dedup.known[key] for key in keys], logs)
+
+    def _remember_outputs(self, outputs: Dict[int, AddressOut]) -> None:
+        for addr_id, out in outputs.items():
+            self._outputs[addr_id] = out
+            self._outputs.move_to_end(addr_id)
+        while len(self._outputs) > OUTPUT_CACHE_SIZE:
+            self._outputs.popitem(last=False)
@@ -0,0 +1,173 @@
+"""
+Processamento de endereços: validação nos provedores, score e gravação em lote
+"""
+import logging
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..metrics import PROVIDER_ERRORS, STAGE_SECONDS
+from ..models import Address
+from ..providers.base import AsyncProvider
+from ..schemas import AddressOut, ProviderResultOut
+from .matching import classify_score, classify_scores
+from .cpu_pool import prepare_keys_async
+from .dedup import DedupKey, UploadDeduplicator
+from .persistence import AddressBatchWriter
+from .scheduler import scheduler
+
+logger = logging.getLogger("upload")
+
+
+def chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def address_out(record: Dict[str, Any]) -> AddressOut:
+    """Converte um registro gravado pelo ``AddressBatchWriter`` em ``AddressOut``."""
+    addr = record["address"]
+    results = record["results"]
+    return AddressOut(
+        id=addr["id"],
+        raw_address=addr["raw_address"],
+        normalized_address=addr["normalized_address"],
+        cep=addr["cep"],
+        status=addr["status"],
+        winner_provider=addr["winner_provider"],
+        best_score=addr["best_score"],
+        results=[
+            ProviderResultOut(
+                provider_name=r["provider_name"],
+                matched_address=r["matched_address"],
+                cep=r["cep"],
+                score=r["score"],
+                extra_metadata=r["extra_metadata"],
+                classification=classify_score(r["score"]),
+            )
+            for r in results
+        ],
+    )
+
+
+def address_out_from_model(a: Address) -> AddressOut:
+    """
+    Converte um ``Address`` persistido (com ``provider_results``) em ``AddressOut``.
+
+    O vencedor vem das colunas ``best_score``/``winner_provider``, gravadas pelo
+    ``AddressBatchWriter``; os resultados não são reagregados aqui.
+    """
+    return AddressOut(
+        id=a.id,
+        raw_address=a.raw_address,
+        normalized_address=a.normalized_address,
+        cep=a.cep,
+        status=a.status,
+        winner_provider=a.winner_provider,
+        best_score=a.best_score,
+        results=[
+            ProviderResultOut(
+                provider_name=pr.provider_name,
+                matched_address=pr.matched_address,
+                cep=pr.cep,
+                score=pr.score,
+                extra_metadata=pr.extra_metadata,
+                classification=classify_score(pr.score),
+            )
+            for pr in a.provider_results
+        ],
+    )
+
+
+async def process_chunk(
+    chunk: List[str],
+    providers: List[AsyncProvider],
+    writer: AddressBatchWriter,
+    keys: Optional[List[DedupKey]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Valida um chunk de endereços e o enfileira no ``writer``.
+
+    Args:
+        keys: (endereço normalizado, CEP) de cada endereço, se já calculados
+
+    Returns:
+        Registros gravados durante a chamada (flushes automáticos do writer)
+    """
+    flushed: List[Dict[str, Any]] = []
+    if keys is None:
+        with STAGE_SECONDS.time(stage="normalize"):
+            keys = await prepare_keys_async(chunk)
+    norms = [norm for norm, _ in keys]
+    input_ceps = [cep for _, cep in keys]
+
+    # Provedores consultados em ondas, até cada endereço atingir o score de parada
+    with STAGE_SECONDS.time(stage="providers"):
+        outcomes = await scheduler.run(providers, chunk, norms, input_ceps)
+
+    staged = []
+    best_scores = []
+    for raw_addr, norm, clean_input_cep, address_outcomes in zip(chunk, norms, input_ceps, outcomes):
+        provider_results = []
+        best_score = 0.0
+        for p, r, adjusted_score in address_outcomes:
+            if isinstance(r, Exception):
+                PROVIDER_ERRORS.inc(provider=p.name)
+                logger.error("Provedor %s falhou: %s", p.name, r, exc_info=r)
+                writer.log("provider_error", f"{p.name}: {r}")
+                continue
+
+            provider_cep = None
+            if r.get("metadata") and isinstance(r.get("metadata"), dict):
+                provider_cep = r["metadata"].get("cep")
+            provider_results.append({
+                "provider_name": p.name,
+                "matched_address": r["matched_address"],
+                "cep": provider_cep,
+                "score": adjusted_score,
+                "extra_metadata": r.get("metadata"),
+            })
+            if adjusted_score >= best_score:
+                best_score = adjusted_score
+
+        staged.append(({
+            "raw_address": raw_addr,
+            "normalized_address": norm,
+            "cep": clean_input_cep,
+        }, provider_results))
+        best_scores.append(best_score)
+
+    for (addr, provider_results), status in zip(staged, classify_scores(best_scores).tolist()):
+        addr["status"] = status
+        flushed.extend(writer.add(addr, provider_results))
+    return flushed
+
+
+async def process_addresses(
+    addresses: Iterable[str],
+    db: Session,
+    chunk_size: Optional[int] = None,
+    dedup: Optional[UploadDeduplicator] = None,
+    source: str = "upload",
+) -> List[AddressOut]:
+    """
+    Valida e grava os endereços, um chunk por transação (atalho para ``Pipeline.run``).
+
+    Endereços repetidos (mesmo endereço normalizado e CEP) são validados uma
+    única vez; as linhas duplicadas recebem o mesmo resultado. As estatísticas
+    ficam em ``dedup``, se informado.
+
+    Args:
+        source: Rótulo da origem nas métricas (ex.: ``csv``, ``sql``)
+
+    Returns:
+        Um ``AddressOut`` por linha da entrada, na mesma ordem
+    """
+    from .pipeline import ListSink, Pipeline, Source  # pipeline importa este módulo
+
+    return await Pipeline(db, chunk_size, dedup).run(Source(source, addresses), ListSink())
@@ -0,0 +1,245 @@
+"""
+Profiling sob demanda de uploads e webhooks
+
+Dois modos:
+
+- ``cprofile``: ``cProfile`` determinístico; artefato em formato pstats
+  (abrir com ``python -m pstats arquivo`` ou snakeviz);
+- ``sampling``: amostra a pilha da thread do event loop a cada
+  ``PROFILE_SAMPLE_INTERVAL`` segundos, com overhead baixo; artefato em JSON
+  do speedscope (https://www.speedscope.app).
+
+O processamento é assíncrono, então o perfil cobre tudo o que rodou no event
+loop durante a requisição (inclusive outras requisições simultâneas).
+"""
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import ADMIN_TOKEN, PROFILE_DIR, PROFILE_MAX_ARTIFACTS, PROFILE_SAMPLE_INTERVAL
+
+PROFILE_MODES = ("cprofile", "sampling")
+ARTIFACT_EXTENSIONS = {"cprofile": ".pstats", "sampling": ".speedscope.json"}
+_ARTIFACT_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+Frame = Tuple[str, str, int]  # (função, arquivo, linha)
+
+
+class ProfilerBusy(RuntimeError):
+    """Já existe um perfil em andamento no processo."""
+
+
+# cProfile e a amostragem são globais ao processo: um perfil por vez
+_active = threading.Lock()
+
+
+def admin_authorized(token: Optional[str]) -> bool:
+    """Indica se ``token`` corresponde ao ``ADMIN_TOKEN`` configurado (vazio nunca autoriza)."""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+class SamplingProfiler:
+    """Amostra periodicamente a pilha de uma thread (por padrão, a que chamou ``start``)."""
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = max(0.0005, interval)
+        self.samples: List[Tuple[Frame, ...]] = []
+        self.duration = 0.0
+        self._thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        self._thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run, name="geomatch-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                # Da raiz para a folha, como o speedscope espera
+                self.samples.append(tuple(reversed(stack)))
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """Perfil no formato de arquivo do speedscope (tipo ``sampled``)."""
+        frames: Dict[Frame, int] = {}
+        samples = []
+        for stack in self.samples:
+            samples.append([frames.setdefault(f, len(frames)) for f in stack])
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": n, "file": f, "line": line} for n, f, line in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.duration,
+                "samples": samples,
+                "weights": [self.interval] * len(samples),
+            }],
+            "name": name,
+            "exporter": "geomatch",
+        }
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack in self.samples:
+            own[stack[-1]] += 1
+            total.update(set(stack))
+        # Empate no acumulado (ex.: frames da raiz): o mais interno primeiro
+        ranked = sorted(total.items(), key=lambda item: (item[1], own[item[0]]), reverse=True)[:limit]
+        return [
+            {
+                "function": _frame_label(frame),
+                "calls": None,
+                "self_seconds": round(own[frame] * self.interval, 6),
+                "cumulative_seconds": round(count * self.interval, 6),
+            }
+            for frame, count in ranked
+        ]
+
+
+class ProfileSession:
+    """
+    Perfil de um trecho de código, usado como context manager::
+
+        with ProfileSession("sampling") as prof:
+            await process_addresses(...)
+        artifact_id = prof.save("upload csv")
+
+    Args:
+        mode: ``cprofile`` ou ``sampling``
+        interval: Intervalo de amostragem do modo ``sampling``
+    """
+
+    def __init__(self, mode: str, interval: float = PROFILE_SAMPLE_INTERVAL):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de profiling inválido. Use um de: {list(PROFILE_MODES)}")
+        self.mode = mode
+        self.duration = 0.0
+        self._cprofile = cProfile.Profile() if mode == "cprofile" else None
+        self._sampler = SamplingProfiler(interval) if mode == "sampling" else None
+        self._started = 0.0
+
+    def __enter__(self) -> "ProfileSession":
+        if not _active.acquire(blocking=False):
+            raise ProfilerBusy("Já existe um profiling em andamento; tente novamente em instantes")
+        self._started = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        else:
+            self._sampler.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if self._cprofile is not None:
+                self._cprofile.disable()
+            else:
+                self._sampler.stop()
+        finally:
+            _active.release()
+        self.duration = time.perf_counter() - self._started
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Funções com maior tempo acumulado (inclui o tempo das funções chamadas)."""
+        if self._sampler is not None:
+            return self._sampler.top(limit)
+        stats = pstats.Stats(self._cprofile).stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": _frame_label((func, filename, line)),
+                "calls": calls,
+                "self_seconds": round(own, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            }
+            for (filename, line, func), (_, calls, own, cumulative, _) in ranked
+        ]
+
+    def save(self, name: str, directory: str = PROFILE_DIR) -> str:
+        """
+        Grava o artefato do perfil e remove os mais antigos além de ``PROFILE_MAX_ARTIFACTS``.
+
+        Returns:
+            Id do artefato (usado em ``GET /api/profiles/{id}``)
+        """
+        os.makedirs(directory, exist_ok=True)
+        artifact_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(directory, artifact_id + ARTIFACT_EXTENSIONS[self.mode])
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self._sampler.speedscope(name), f)
+        _prune_artifacts(directory)
+        return artifact_id
+
+    def summary(self, artifact_id: str, limit: int = 20) -> Dict[str, Any]:
+        return {
+            "id": artifact_id,
+            "mode": self.mode,
+            "format": "pstats" if self.mode == "cprofile" else "speedscope",
+            "duration_seconds": round(self.duration, 6),
+            "download": f"/api/profiles/{artifact_id}",
+            "top_functions": self.top_functions(limit),
+        }
+
+
+def _frame_label(frame: Frame) -> str:
+    func, filename, line = frame
+    if not filename or filename == "~":
+        return func  # funções nativas no cProfile, ex.: "<built-in method time.sleep>"
+    return f"{func} ({os.path.basename(filename)}:{line})"
+
+
+def _prune_artifacts(directory: str) -> None:
+    paths = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory)
+         if name.endswith(tuple(ARTIFACT_EXTENSIONS.values()))),
+        key=os.path.getmtime,
+    )
+    for path in paths[:max(0, len(paths) - PROFILE_MAX_ARTIFACTS)]:
+        os.remove(path)
+
+
+def find_artifact(artifact_id: str, directory: str = PROFILE_DIR) -> Optional[Tuple[str, str]]:
+    """
+    Localiza o arquivo de um artefato.
+
+    Returns:
+        (caminho, modo) ou None se o id for inválido ou o arquivo não existir
+    """
+    if not _ARTIFACT_ID.match(artifact_id):
+        return None
+    for mode, ext in ARTIFACT_EXTENSIONS.items():
+        path = os.path.join(directory, artifact_id + ext)
+        if os.path.isfile(path):
+            return path, mode
+    return None
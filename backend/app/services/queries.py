@@ -0,0 +1,151 @@
+"""
+Filtros e consultas compartilhados pelas rotas de leitura/exportação
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session, selectinload
+
+from ..models import Address, ProviderResult, UploadJobRow
+from .sql_export import ADDRESS_DUMP_COLUMNS, RESULT_DUMP_COLUMNS
+
+
+def filter_address_results(
+    stmt: Select,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    provider: Optional[str] = None,
+    min_score: Optional[float] = None,
+) -> Select:
+    """
+    Aplica filtros a uma consulta de ``Address`` unida a ``ProviderResult``.
+
+    ``provider`` e ``min_score`` restringem as linhas de resultado; os demais
+    filtros valem para o endereço.
+    """
+    if status:
+        stmt = stmt.where(Address.status == status)
+    if date_from:
+        stmt = stmt.where(Address.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(Address.created_at <= date_to)
+    if provider:
+        stmt = stmt.where(ProviderResult.provider_name == provider)
+    if min_score is not None:
+        stmt = stmt.where(ProviderResult.score >= min_score)
+    return stmt
+
+
+def filter_addresses(
+    stmt: Select,
+    status: Optional[str] = None,
+    cep: Optional[str] = None,
+    provider: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+) -> Select:
+    """
+    Aplica filtros a uma consulta de ``Address``.
+
+    ``provider`` e a faixa de score exigem que exista ao menos um resultado
+    de provedor que atenda a todos eles ao mesmo tempo. Só com ``min_score``,
+    basta o ``best_score`` do próprio endereço.
+    """
+    if status:
+        stmt = stmt.where(Address.status == status)
+    if cep:
+        stmt = stmt.where(Address.cep == cep)
+    if min_score is not None and not provider and max_score is None:
+        stmt = stmt.where(Address.best_score >= min_score)
+    elif provider or min_score is not None or max_score is not None:
+        match = select(ProviderResult.id).where(ProviderResult.address_id == Address.id)
+        if provider:
+            match = match.where(ProviderResult.provider_name == provider)
+        if min_score is not None:
+            match = match.where(ProviderResult.score >= min_score)
+        if max_score is not None:
+            match = match.where(ProviderResult.score <= max_score)
+        stmt = stmt.where(match.exists())
+    return stmt
+
+
+def address_page_query(
+    limit: int,
+    cursor: Optional[int] = None,
+    status: Optional[str] = None,
+    cep: Optional[str] = None,
+    provider: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+) -> Select:
+    """Página de ``GET /addresses``: id decrescente, a partir do ``cursor`` (exclusivo)."""
+    stmt = select(Address).order_by(Address.id.desc()).limit(limit)
+    if cursor is not None:
+        stmt = stmt.where(Address.id < cursor)
+    return filter_addresses(stmt, status, cep, provider, min_score, max_score)
+
+
+def export_rows_query(
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    provider: Optional[str] = None,
+    min_score: Optional[float] = None,
+) -> Select:
+    """Linhas de ``GET /export/csv``: um resultado de provedor por linha, em ordem de endereço."""
+    stmt = (
+        select(
+            Address.id,
+            Address.raw_address,
+            Address.normalized_address,
+            Address.status,
+            ProviderResult.provider_name,
+            ProviderResult.matched_address,
+            ProviderResult.score,
+        )
+        .join(ProviderResult, ProviderResult.address_id == Address.id)
+        .order_by(Address.id, ProviderResult.id)
+    )
+    return filter_address_results(stmt, status, date_from, date_to, provider, min_score)
+
+
+def sql_dump_queries(
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Tuple[Select, Select]:
+    """Consultas de ``GET /export/sql``: (endereços, resultados de provedores)."""
+    addresses = filter_address_results(
+        select(*(getattr(Address, c) for c in ADDRESS_DUMP_COLUMNS)).order_by(Address.id),
+        status, date_from, date_to,
+    )
+    results = filter_address_results(
+        select(*(getattr(ProviderResult, c) for c in RESULT_DUMP_COLUMNS))
+        .join(Address, ProviderResult.address_id == Address.id)
+        .order_by(ProviderResult.id),
+        status, date_from, date_to,
+    )
+    return addresses, results
+
+
+def job_results_page(db: Session, job_id: int, offset: int, limit: int) -> Tuple[int, List[Address]]:
+    """
+    Endereços já processados de um job, na ordem das linhas de entrada.
+
+    Returns:
+        (total de linhas processadas, endereços da página com ``provider_results``)
+    """
+    processed = UploadJobRow.job_id == job_id, UploadJobRow.address_id.is_not(None)
+    total = db.scalar(select(func.count()).select_from(UploadJobRow).where(*processed))
+    addrs = db.scalars(
+        select(Address)
+        .join(UploadJobRow, UploadJobRow.address_id == Address.id)
+        .where(*processed)
+        .order_by(UploadJobRow.seq)
+        .offset(offset)
+        .limit(limit)
+        .options(selectinload(Address.provider_results))
+    ).all()
+    return total, addrs
@@ -0,0 +1,281 @@
+"""
+Índice em memória de endereços de referência para busca de candidatos
+
+Os candidatos são recuperados por blocagem (prefixo de 5 dígitos do CEP e/ou
+cidade) e por um índice invertido de tokens ponderado por IDF; só os melhores
+candidatos são pontuados com ``token_sort_ratio``. Assim a consulta não
+percorre a base inteira mesmo com milhões de endereços.
+
+Carga de um CSV (colunas ``address``/``endereco``/``logradouro``/``rua`` e,
+opcionalmente, ``cep``, ``cidade``/``city``/``localidade`` e ``uf``) na tabela
+``reference_addresses``::
+
+    python -m app.services.reference_index load referencias.csv
+"""
+import argparse
+import csv
+import logging
+import math
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..config import REFERENCE_CSV_PATH, REFERENCE_MAX_CANDIDATES, REFERENCE_TOP_K
+from ..models import ReferenceAddress
+from ..utils.validators import extract_cep, normalize_cep
+from .matching import batch_similarity_scores_with_cep, normalize_address
+from .parser import ADDRESS_COLUMNS
+
+logger = logging.getLogger("reference_index")
+
+CITY_COLUMNS = ["cidade", "city", "localidade", "municipio"]
+
+# Tokens presentes em mais que esta fração da base (ex.: "rua") não geram candidatos
+MAX_TOKEN_FRACTION = 0.05
+MIN_TOKEN_POSTINGS = 1000
+
+
+class ReferenceRecord(NamedTuple):
+    id: int
+    address: str
+    cep: Optional[str]
+    city: Optional[str]
+    uf: Optional[str]
+
+
+class ReferenceMatch(NamedTuple):
+    record: ReferenceRecord
+    score: float
+
+
+class ReferenceIndex:
+    """
+    Índice de endereços de referência com blocagem e índice invertido de tokens.
+
+    Args:
+        records: Endereços de referência
+        max_candidates: Candidatos pontuados por consulta
+    """
+
+    def __init__(self, records: Iterable[ReferenceRecord], max_candidates: int = REFERENCE_MAX_CANDIDATES):
+        self.max_candidates = max(1, max_candidates)
+        self.records: List[ReferenceRecord] = []
+        self.norms: List[str] = []
+        self.ceps: List[Optional[str]] = []
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        by_cep5: Dict[str, List[int]] = defaultdict(list)
+        by_city: Dict[str, List[int]] = defaultdict(list)
+        for rec in records:
+            i = len(self.records)
+            cep = normalize_cep(rec.cep) if rec.cep else None
+            norm = normalize_address(rec.address)
+            self.records.append(rec._replace(cep=cep))
+            self.norms.append(norm)
+            self.ceps.append(cep)
+            for token in set(norm.split()):
+                postings[token].append(i)
+            if cep:
+                by_cep5[cep[:5]].append(i)
+            if rec.city:
+                by_city[normalize_address(rec.city)].append(i)
+
+        # Listas de ids ordenadas (ordem de inserção) como arrays compactos
+        self._postings = {t: np.asarray(ids, dtype=np.int32) for t, ids in postings.items()}
+        self._by_cep5 = {k: np.asarray(ids, dtype=np.int32) for k, ids in by_cep5.items()}
+        self._by_city = {k: np.asarray(ids, dtype=np.int32) for k, ids in by_city.items()}
+        self._max_postings = max(MIN_TOKEN_POSTINGS, int(len(self.records) * MAX_TOKEN_FRACTION))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def match(self, address: str, k: int = REFERENCE_TOP_K, city: Optional[str] = None) -> List[ReferenceMatch]:
+        """
+        Retorna os ``k`` endereços de referência mais parecidos.
+
+        Args:
+            address: Endereço de entrada (texto livre; o CEP é extraído se houver)
+            k: Quantidade de resultados
+            city: Restringe a busca a uma cidade (opcional)
+
+        Returns:
+            Lista ordenada por score decrescente (0-100, com bônus de CEP igual)
+        """
+        norm = normalize_address(address)
+        cep = extract_cep(address)
+        cep = normalize_cep(cep) if cep else None
+
+        candidates = self._candidates(norm.split(), cep, city)
+        if not len(candidates):
+            return []
+        scores = batch_similarity_scores_with_cep(
+            [norm] * len(candidates),
+            [self.norms[i] for i in candidates],
+            [cep] * len(candidates),
+            [self.ceps[i] for i in candidates],
+            workers=1,
+        )
+        k = min(max(1, k), len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Empate: prevalece o registro mais antigo, para resultados estáveis
+        top = sorted(top, key=lambda j: (-scores[j], candidates[j]))
+        return [ReferenceMatch(self.records[candidates[j]], float(scores[j])) for j in top]
+
+    def match_many(self, addresses: List[str], k: int = 1) -> List[List[ReferenceMatch]]:
+        return [self.match(a, k) for a in addresses]
+
+    def _candidates(self, tokens: List[str], cep: Optional[str], city: Optional[str]) -> np.ndarray:
+        block = None
+        if cep:
+            block = self._by_cep5.get(cep[:5])
+        if city:
+            city_ids = self._by_city.get(normalize_address(city), np.zeros(0, dtype=np.int32))
+            block = city_ids if block is None else np.intersect1d(block, city_ids, assume_unique=True)
+        if block is not None and len(block) <= self.max_candidates:
+            # Bloco pequeno: todos os endereços do bloco são pontuados
+            return block
+
+        lists = sorted(
+            (self._postings[t] for t in set(tokens) if t in self._postings),
+            key=len,
+        )
+        selective = [p for p in lists if len(p) <= self._max_postings] or lists[:1]
+        if not selective:
+            return block[:self.max_candidates] if block is not None else np.zeros(0, dtype=np.int32)
+
+        ids = np.concatenate(selective)
+        weights = np.concatenate(
+            [np.full(len(p), math.log(len(self.records) / len(p)) + 1.0) for p in selective]
+        )
+        if block is not None:
+            inside = np.isin(ids, block)
+            ids, weights = ids[inside], weights[inside]
+            if not len(ids):
+                return block[:self.max_candidates]
+        unique, inverse = np.unique(ids, return_inverse=True)
+        if len(unique) <= self.max_candidates:
+            return unique
+        # Candidatos com maior soma de IDF dos tokens em comum
+        relevance = np.bincount(inverse, weights=weights)
+        return np.sort(unique[np.argpartition(-relevance, self.max_candidates - 1)[:self.max_candidates]])
+
+
+def _pick(header: List[str], names: List[str]) -> Optional[int]:
+    return next((header.index(n) for n in names if n in header), None)
+
+
+def iter_reference_csv(path: str) -> Iterator[Dict[str, Any]]:
+    """Lê endereços de referência de um CSV (ver colunas aceitas no docstring do módulo)."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        addr_idx = _pick(header, ADDRESS_COLUMNS)
+        if addr_idx is None:
+            raise ValueError(f"Coluna de endereço não encontrada. Use uma das: {ADDRESS_COLUMNS}")
+        cep_idx = _pick(header, ["cep"])
+        city_idx = _pick(header, CITY_COLUMNS)
+        uf_idx = _pick(header, ["uf", "estado"])
+
+        def col(row, idx):
+            if idx is None or idx >= len(row):
+                return None
+            return row[idx].strip() or None
+
+        for row in reader:
+            address = col(row, addr_idx)
+            if address:
+                yield {"address": address, "cep": col(row, cep_idx), "city": col(row, city_idx), "uf": col(row, uf_idx)}
+
+
+def load_reference_csv(db: Session, path: str, chunk_size: int = 5000) -> int:
+    """
+    Insere os endereços de um CSV na tabela ``reference_addresses``.
+
+    Returns:
+        Quantidade de endereços inseridos
+    """
+    total = 0
+    batch: List[Dict[str, Any]] = []
+    for row in iter_reference_csv(path):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            db.execute(insert(ReferenceAddress), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(ReferenceAddress), batch)
+        total += len(batch)
+    db.commit()
+    return total
+
+
+def build_index_from_csv(path: str) -> ReferenceIndex:
+    return ReferenceIndex(
+        ReferenceRecord(i, r["address"], r["cep"], r["city"], r["uf"])
+        for i, r in enumerate(iter_reference_csv(path), start=1)
+    )
+
+
+def build_index_from_db(db: Session) -> ReferenceIndex:
+    stmt = select(
+        ReferenceAddress.id, ReferenceAddress.address, ReferenceAddress.cep, ReferenceAddress.city, ReferenceAddress.uf
+    ).order_by(ReferenceAddress.id)
+    rows = db.execute(stmt.execution_options(yield_per=10000))
+    return ReferenceIndex(ReferenceRecord(*row) for row in rows)
+
+
+_index: Optional[ReferenceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_reference_index() -> ReferenceIndex:
+    """Índice do processo, construído na primeira chamada (CSV configurado ou banco)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if REFERENCE_CSV_PATH:
+                    index = build_index_from_csv(REFERENCE_CSV_PATH)
+                else:
+                    from ..database import SessionLocal
+
+                    db = SessionLocal()
+                    try:
+                        index = build_index_from_db(db)
+                    finally:
+                        db.close()
+                logger.info("Índice de referência carregado: %d endereços", len(index))
+                _index = index
+    return _index
+
+
+def reset_reference_index() -> None:
+    """Descarta o índice do processo; o próximo acesso o reconstrói."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Endereços de referência")
+    sub = ap.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load", help="insere um CSV na tabela reference_addresses")
+    load.add_argument("csv_path")
+    args = ap.parse_args()
+
+    from ..database import SessionLocal, upgrade_schema
+
+    upgrade_schema()
+    db = SessionLocal()
+    try:
+        print(f"{load_reference_csv(db, args.csv_path)} endereços inseridos")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Agendamento de provedores: ordem, aplicabilidade e parada antecipada
+
+Em vez de consultar todos os provedores para todos os endereços, o chunk é
+processado em ondas: cada provedor recebe (em lote) só os endereços que ainda
+não atingiram ``EARLY_EXIT_SCORE`` e aos quais ele se aplica
+(``Provider.applies``). A ordem das ondas vem das estatísticas de cada
+provedor: primeiro os de menor custo por endereço resolvido.
+"""
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..config import EARLY_EXIT_SCORE, PROVIDER_CONCURRENCY, SCHEDULER_ADAPTIVE, SCHEDULER_MIN_CALLS
+from ..metrics import PROVIDER_BATCH_SECONDS, PROVIDER_CALLS
+from ..providers.base import AsyncProvider
+from .cpu_pool import score_batch_async
+
+Outcome = Union[Dict[str, Any], Exception]
+# (provedor, resultado ou exceção, score ajustado ou None em caso de falha)
+ScoredOutcome = Tuple[AsyncProvider, Outcome, Optional[float]]
+
+
+class ProviderStats:
+    """Contadores acumulados de um provedor."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.resolved = 0
+        self.wins = 0
+        self.skipped = 0
+        self.seconds = 0.0
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Tempo médio por endereço consultado (duração da onda / endereços)."""
+        return self.seconds / self.calls if self.calls else None
+
+    @property
+    def resolve_rate(self) -> Optional[float]:
+        """Fração das consultas que atingiu o score de parada."""
+        return self.resolved / self.calls if self.calls else None
+
+    @property
+    def win_rate(self) -> Optional[float]:
+        """Fração das consultas em que o provedor teve o melhor resultado do endereço."""
+        return self.wins / self.calls if self.calls else None
+
+
+class ProviderScheduler:
+    """
+    Mantém estatísticas por provedor e decide a ordem das ondas.
+
+    Com ``adaptive`` desligado vale a ordem configurada em ``API_PROVIDERS``.
+    Com ele ligado, os provedores que ainda têm menos de ``min_calls`` consultas
+    vão primeiro (na ordem configurada) para coletar estatísticas; sem isso, um
+    provedor que a parada antecipada nunca alcança nunca seria medido. Os demais
+    seguem pelo custo por endereço resolvido.
+    """
+
+    def __init__(self, adaptive: bool = SCHEDULER_ADAPTIVE, min_calls: int = SCHEDULER_MIN_CALLS):
+        self.adaptive = adaptive
+        self.min_calls = min_calls
+        self.stats: Dict[str, ProviderStats] = {}
+        self.addresses = 0
+
+    def _stats(self, name: str) -> ProviderStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = ProviderStats()
+        return stats
+
+    def order(self, providers: Sequence[AsyncProvider]) -> List[AsyncProvider]:
+        """
+        Ordena os provedores para a próxima onda.
+
+        Args:
+            providers: Provedores na ordem configurada
+
+        Returns:
+            Primeiro os provedores ainda sem ``min_calls`` consultas (ordem
+            configurada); depois os demais pela latência por endereço resolvido,
+            desempatando pela maior taxa de vitórias
+        """
+        if not self.adaptive:
+            return list(providers)
+
+        def cost(item):
+            position, p = item
+            s = self._stats(p.name)
+            if s.calls < self.min_calls:
+                return (0, 0.0, 0.0, position)
+            return (1, s.latency / max(s.resolve_rate, 0.01), -s.win_rate, position)
+
+        return [p for _, p in sorted(enumerate(providers), key=cost)]
+
+    async def run(
+        self,
+        providers: Sequence[AsyncProvider],
+        addresses: List[str],
+        norms: List[str],
+        ceps: List[Optional[str]],
+        threshold: float = EARLY_EXIT_SCORE,
+        concurrency: Optional[int] = None,
+    ) -> List[List[ScoredOutcome]]:
+        """
+        Consulta os provedores em ondas até cada endereço atingir ``threshold``.
+
+        Args:
+            providers: Provedores disponíveis
+            addresses: Endereços brutos do chunk
+            norms: Endereços normalizados (mesma ordem)
+            ceps: CEPs normalizados das entradas (ou None)
+            threshold: Score que encerra as consultas de um endereço
+            concurrency: Chamadas simultâneas por provedor
+
+        Returns:
+            Para cada endereço, os resultados na ordem em que foram consultados,
+            com o score já ajustado pelo CEP
+        """
+        concurrency = concurrency or PROVIDER_CONCURRENCY
+        outcomes: List[List[ScoredOutcome]] = [[] for _ in addresses]
+        pending = list(range(len(addresses)))
+        self.addresses += len(addresses)
+
+        for p in self.order(providers):
+            if not pending:
+                break
+            stats = self._stats(p.name)
+            targets = [i for i in pending if p.applies(addresses[i])]
+            stats.skipped += len(pending) - len(targets)
+            if not targets:
+                continue
+
+            started = time.perf_counter()
+            results = await p.validate_many([addresses[i] for i in targets], concurrency)
+            elapsed = time.perf_counter() - started
+            stats.seconds += elapsed
+            stats.calls += len(targets)
+            PROVIDER_BATCH_SECONDS.observe(elapsed, provider=p.name)
+            PROVIDER_CALLS.inc(len(targets), provider=p.name)
+
+            ok = [(i, r) for i, r in zip(targets, results) if not isinstance(r, Exception)]
+            stats.errors += len(targets) - len(ok)
+            scores = await score_batch_async(
+                [norms[i] for i, _ in ok],
+                [r["matched_address"] for _, r in ok],
+                [ceps[i] for i, _ in ok],
+                [_result_cep(r) for _, r in ok],
+            )
+
+            resolved = set()
+            scored = iter(scores)
+            for i, r in zip(targets, results):
+                score = None if isinstance(r, Exception) else next(scored)
+                outcomes[i].append((p, r, score))
+                if score is not None and score >= threshold:
+                    resolved.add(i)
+            stats.resolved += len(resolved)
+            pending = [i for i in pending if i not in resolved]
+
+        for address_outcomes in outcomes:
+            best = None
+            for p, _, score in address_outcomes:
+                if score is not None and (best is None or score >= best[1]):
+                    best = (p.name, score)
+            if best:
+                self._stats(best[0]).wins += 1
+        return outcomes
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        out = []
+        for name, s in sorted(self.stats.items()):
+            out.append({
+                "name": name,
+                "calls": s.calls,
+                "errors": s.errors,
+                "skipped": s.skipped,
+                "resolved": s.resolved,
+                "wins": s.wins,
+                "latency_seconds": s.latency,
+                "resolve_rate": s.resolve_rate,
+                "win_rate": s.win_rate,
+                "calls_per_address": s.calls / self.addresses if self.addresses else None,
+            })
+        return out
+
+
+def _result_cep(result: Dict[str, Any]) -> Optional[str]:
+    # Extrai CEP do resultado do provider de forma segura
+    metadata = result.get("metadata")
+    if metadata and isinstance(metadata, dict):
+        return metadata.get("cep")
+    return None
+
+
+scheduler = ProviderScheduler()
@@ -0,0 +1,123 @@
+"""
+Geração de dumps SQL em streaming para reimportação em outros bancos
+"""
+import math
+from datetime import datetime
+from typing import Iterable, Iterator, List, Sequence
+
+SQL_DIALECTS = ("insert", "postgres", "sqlite")
+
+ADDRESS_DUMP_COLUMNS = [
+    "id", "raw_address", "normalized_address", "cep", "status", "best_score", "winner_provider", "created_at",
+]
+RESULT_DUMP_COLUMNS = ["address_id", "provider_name", "matched_address", "cep", "score", "created_at"]
+
+# Limite conservador de linhas por INSERT multi-linha (SQLite antigo aceita até 500)
+INSERT_ROWS_PER_STATEMENT = 500
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _non_finite(value) -> bool:
+    return isinstance(value, float) and not math.isfinite(value)
+
+
+def sql_literal(value) -> str:
+    """
+    Converte um valor Python em literal SQL.
+
+    Args:
+        value: Valor da coluna (None, número, data ou texto)
+
+    Returns:
+        Literal pronto para uso em um VALUES (``NULL`` também para floats não
+        finitos, que não têm literal portável)
+    """
+    if value is None or _non_finite(value):
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def copy_field(value) -> str:
+    """
+    Converte um valor Python em campo do formato texto do COPY do PostgreSQL.
+
+    Args:
+        value: Valor da coluna
+
+    Returns:
+        Campo escapado (``\\N`` para nulo e, como em ``sql_literal``, para
+        floats não finitos)
+    """
+    if value is None or _non_finite(value):
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _insert_statements(table: str, columns: Sequence[str], rows: Sequence[Sequence]) -> Iterator[str]:
+    head = f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n"
+    for start in range(0, len(rows), INSERT_ROWS_PER_STATEMENT):
+        part = rows[start:start + INSERT_ROWS_PER_STATEMENT]
+        values = ",\n".join("(" + ", ".join(sql_literal(v) for v in row) + ")" for row in part)
+        yield head + values + ";\n"
+
+
+def _table_dump(table: str, columns: List[str], batches: Iterable[Sequence[Sequence]], dialect: str) -> Iterator[str]:
+    if dialect == "postgres":
+        yield f"COPY {table} ({', '.join(columns)}) FROM stdin;\n"
+        for rows in batches:
+            yield "".join("\t".join(copy_field(v) for v in row) + "\n" for row in rows)
+        yield "\\.\n\n"
+        return
+
+    for rows in batches:
+        if not rows:
+            continue
+        statements = "".join(_insert_statements(table, columns, rows))
+        if dialect == "sqlite":
+            # Uma transação por lote evita um fsync por INSERT na reimportação
+            yield "BEGIN TRANSACTION;\n" + statements + "COMMIT;\n"
+        else:
+            yield statements
+
+
+def iter_sql_dump(
+    address_batches: Iterable[Sequence[Sequence]],
+    result_batches: Iterable[Sequence[Sequence]],
+    dialect: str = "insert",
+) -> Iterator[str]:
+    """
+    Gera o dump SQL das tabelas ``addresses`` e ``provider_results`` em pedaços.
+
+    Os lotes são consumidos sob demanda, então a memória fica limitada a um
+    lote por vez. As linhas seguem a ordem de ``ADDRESS_DUMP_COLUMNS`` e
+    ``RESULT_DUMP_COLUMNS``.
+
+    Args:
+        address_batches: Lotes de linhas de endereços
+        result_batches: Lotes de linhas de resultados de provedores
+        dialect: "insert" (INSERT multi-linha), "postgres" (COPY FROM stdin)
+            ou "sqlite" (INSERTs em transações por lote)
+
+    Returns:
+        Iterador de pedaços de texto SQL
+    """
+    if dialect not in SQL_DIALECTS:
+        raise ValueError(f"Dialeto inválido: {dialect}. Use um de: {list(SQL_DIALECTS)}")
+
+    yield f"-- GeoMatch export ({dialect})\n"
+    yield from _table_dump("addresses", ADDRESS_DUMP_COLUMNS, address_batches, dialect)
+    if dialect == "postgres":
+        yield (
+            "SELECT setval(pg_get_serial_sequence('addresses', 'id'), "
+            "(SELECT COALESCE(MAX(id), 1) FROM addresses));\n\n"
+        )
+    yield from _table_dump("provider_results", RESULT_DUMP_COLUMNS, result_batches, dialect)
@@ -0,0 +1,35 @@
+"""
+Fan-out concorrente de endereços para os provedores
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..config import PROVIDER_CONCURRENCY
+from ..providers.base import AsyncProvider
+
+Outcome = Union[Dict[str, Any], Exception]
+
+
+async def validate_batch(
+    providers: List[AsyncProvider],
+    addresses: List[str],
+    concurrency: Optional[int] = None,
+) -> List[List[Tuple[AsyncProvider, Outcome]]]:
+    """
+    Consulta todos os provedores para um lote de endereços.
+
+    Os provedores rodam em paralelo entre si e cada um processa o lote com no
+    máximo ``concurrency`` chamadas simultâneas.
+
+    Returns:
+        Para cada endereço (na ordem de entrada), a lista de pares
+        (provedor, resultado ou exceção) na ordem dos provedores
+    """
+    concurrency = concurrency or PROVIDER_CONCURRENCY
+    per_provider = await asyncio.gather(
+        *(p.validate_many(addresses, concurrency) for p in providers)
+    )
+    return [
+        [(p, per_provider[j][i]) for j, p in enumerate(providers)]
+        for i in range(len(addresses))
+    ]
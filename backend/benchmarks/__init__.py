@@ -0,0 +1,3 @@
+"""
+Benchmarks do backend do GeoMatch (executar a partir da pasta backend)
+"""
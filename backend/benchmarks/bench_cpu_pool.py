@@ -0,0 +1,91 @@
+"""
+Benchmark das etapas de CPU (normalização, CEP e score) no pool de processos.
+
+Uso (a partir da pasta backend):
+    python -m benchmarks.bench_cpu_pool --rows 200000 --workers 0 1 2 4 8
+
+Para cada quantidade de workers (0 = inline, como com ``PIPELINE_WORKERS=0``)
+processa os mesmos chunks: chaves de deduplicação de cada endereço e score
+contra um endereço "retornado pelo provedor". Com workers, até
+``2 x workers`` chunks ficam em andamento, como no prefetch do pipeline.
+Endereços sem repetição, para não medir o cache LRU de normalização.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.services.cpu_pool import prepare_keys, score_batch
+from app.services.matching import _normalize_cached
+from benchmarks.bench_pipeline import generate_addresses, street_table
+
+
+def make_chunks(rows: int, chunk_size: int, seed: int = 42) -> List[Tuple[List[str], List[str], List[Optional[str]]]]:
+    addresses = generate_addresses(rows, dup_ratio=0.0, cep_ratio=0.6, seed=seed)
+    table = street_table()
+    rnd = random.Random(seed)
+    out = []
+    for i in range(0, rows, chunk_size):
+        chunk = addresses[i:i + chunk_size]
+        streets = [rnd.choice(table) for _ in chunk]
+        matched = [f"{s['logradouro']}, {s['bairro']}, {s['localidade']} - {s['uf']}" for s in streets]
+        out.append((chunk, matched, [s["cep"].replace("-", "") for s in streets]))
+    return out
+
+
+def process(chunk: List[str], matched: List[str], provider_ceps: List[Optional[str]]) -> int:
+    keys = prepare_keys(chunk)
+    score_batch([k[0] for k in keys], matched, [k[1] for k in keys], provider_ceps)
+    return len(chunk)
+
+
+async def run_pool(chunks, workers: int) -> Tuple[int, float]:
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        # Aquece os processos fora da medição
+        await asyncio.gather(*(loop.run_in_executor(pool, process, *chunks[0]) for _ in range(workers)))
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(2 * workers)
+
+        async def one(args):
+            async with semaphore:
+                return await loop.run_in_executor(pool, process, *args)
+
+        rows = sum(await asyncio.gather(*(one(c) for c in chunks)))
+        return rows, time.perf_counter() - start
+
+
+def run_inline(chunks) -> Tuple[int, float]:
+    _normalize_cached.cache_clear()
+    start = time.perf_counter()
+    rows = sum(process(*c) for c in chunks)
+    return rows, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--chunk-size", type=int, default=500)
+    ap.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    args = ap.parse_args()
+
+    chunks = make_chunks(args.rows, args.chunk_size)
+    print(f"{args.rows} endereços, chunks de {args.chunk_size}, {os.cpu_count()} núcleos")
+    baseline = None
+    for workers in args.workers:
+        if workers == 0:
+            rows, elapsed = run_inline(chunks)
+        else:
+            rows, elapsed = asyncio.run(run_pool(chunks, workers))
+        rate = rows / elapsed
+        baseline = baseline or rate
+        label = "inline" if workers == 0 else f"{workers} workers"
+        print(f"  {label:>10}: {rate:>10.0f} endereços/s  {elapsed:7.2f}s  speedup {rate / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
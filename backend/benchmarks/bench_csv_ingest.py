@@ -0,0 +1,91 @@
+"""
+Benchmark de leitura de CSV: pandas (arquivo inteiro) x iter_csv_addresses (streaming).
+
+Uso (a partir da pasta backend):
+    python -m benchmarks.bench_csv_ingest --rows 1000000
+
+Gera um CSV sintético com várias colunas e mede, em um processo separado por
+cenário, linhas/segundo, pico de memória alocada (tracemalloc) e pico de RSS.
+"""
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from app.services.parser import iter_csv_addresses
+
+
+def generate_csv(path: str, rows: int) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["id", "nome", "address", "observacao"])
+        for i in range(rows):
+            w.writerow([
+                i,
+                f"Cliente {i}",
+                f"Rua José da Silva {i % 5000}, {i % 900 + 1}, São Paulo - SP, {i % 99999:05d}-{i % 999:03d}",
+                "entregar em horário comercial",
+            ])
+
+
+def _pandas_full(path: str) -> int:
+    """Comportamento anterior: DataFrame completo + lista com todas as linhas."""
+    import pandas as pd
+
+    with open(path, "rb") as f:
+        content = f.read()
+    df = pd.read_csv(io.BytesIO(content))
+    addresses = [str(v) for v in df["address"].tolist()]
+    return len(addresses)
+
+
+def _streaming(path: str) -> int:
+    count = 0
+    with open(path, "rb") as f:
+        for _ in iter_csv_addresses(f):
+            count += 1
+    return count
+
+
+def _run(name: str, path: str, queue) -> None:
+    fn = {"pandas (arquivo inteiro)": _pandas_full, "streaming (csv)": _streaming}[name]
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = fn(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # ru_maxrss em KiB no Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((name, rows, rows / elapsed, peak / 2**20, rss))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--file", default=None, help="CSV existente (com coluna address) em vez do sintético")
+    args = parser.parse_args()
+
+    path = args.file
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "bench.csv")
+        generate_csv(path, args.rows)
+    print(f"arquivo: {path} ({os.path.getsize(path) / 2**20:.1f} MiB)")
+
+    ctx = multiprocessing.get_context("spawn")
+    for name in ("pandas (arquivo inteiro)", "streaming (csv)"):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(name, path, queue))
+        proc.start()
+        name, rows, rate, peak, rss = queue.get()
+        proc.join()
+        print(f"{name:>26}: {rows} linhas  {rate:>10.0f} linhas/s  pico alocado {peak:>8.1f} MiB  pico RSS {rss:>8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
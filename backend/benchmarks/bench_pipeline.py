@@ -0,0 +1,380 @@
+"""
+Benchmark ponta a ponta da ingestão: arquivo sintético -> provedores -> banco.
+
+Uso (a partir da pasta backend):
+    python -m benchmarks.bench_pipeline --rows 1000 100000 --formats csv sql --output bench.json
+    python -m benchmarks.bench_pipeline --rows 100000 --compare bench.json
+
+Gera CSV/SQL com endereços brasileiros sintéticos (fração controlada de linhas
+duplicadas e de endereços com CEP) e mede cada cenário em um processo
+separado (banco SQLite temporário, caches frios):
+
+- ``api``: ``POST /api/upload`` via TestClient, em requisições de
+  ``--request-rows`` linhas; latência por requisição;
+- ``pipeline``: ``process_addresses`` direto sobre o arquivo lido em
+  streaming, um lote de ``DB_CHUNK_SIZE`` por vez; latência por lote.
+
+O provedor ``viacep`` consulta um servidor HTTP local que imita o ViaCEP
+(``--viacep-latency`` simula a rede). O resultado (linhas/s, p50/p99 e pico de
+RSS) pode ser salvo em JSON e comparado com uma execução anterior.
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty
+from typing import Any, Dict, List, Optional, Tuple
+
+STREET_TYPES = ["Rua", "Avenida", "Travessa", "Alameda", "Praça", "Estrada"]
+STREET_NAMES = [
+    "José da Silva", "Maria Antônia", "Dom Pedro II", "Tiradentes", "Sete de Setembro",
+    "XV de Novembro", "Getúlio Vargas", "Santos Dumont", "das Flores", "São João",
+    "Marechal Deodoro", "Barão do Rio Branco", "Castro Alves", "Rui Barbosa", "Paulista",
+    "Brigadeiro Faria Lima", "Independência", "dos Andradas", "Presidente Vargas", "Osvaldo Cruz",
+]
+NEIGHBORHOODS = ["Centro", "Jardim América", "Vila Nova", "Boa Vista", "Santa Cecília", "Liberdade", "Bela Vista"]
+CITIES = [
+    ("São Paulo", "SP", 1), ("Rio de Janeiro", "RJ", 20), ("Belo Horizonte", "MG", 30),
+    ("Curitiba", "PR", 80), ("Porto Alegre", "RS", 90), ("Salvador", "BA", 40),
+    ("Recife", "PE", 50), ("Fortaleza", "CE", 60), ("Goiânia", "GO", 74), ("Belém", "PA", 66),
+]
+# Logradouros distintos na tabela de CEPs do servidor falso
+STREET_TABLE_SIZE = 5000
+# Fração dos CEPs gerados que o servidor responde como inexistentes
+UNKNOWN_CEP_RATIO = 0.02
+
+
+def street_table(size: int = STREET_TABLE_SIZE, seed: int = 7) -> List[Dict[str, str]]:
+    """Logradouros determinísticos (mesma tabela no gerador e no servidor falso)."""
+    rnd = random.Random(seed)
+    table = []
+    for i in range(size):
+        city, uf, prefix = CITIES[i % len(CITIES)]
+        cep = f"{prefix:02d}{i:03d}{rnd.randint(0, 999):03d}"[:8]
+        table.append({
+            "cep": f"{cep[:5]}-{cep[5:]}",
+            "logradouro": f"{rnd.choice(STREET_TYPES)} {rnd.choice(STREET_NAMES)}",
+            "complemento": "",
+            "bairro": rnd.choice(NEIGHBORHOODS),
+            "localidade": city,
+            "uf": uf,
+        })
+    return table
+
+
+def generate_addresses(rows: int, dup_ratio: float, cep_ratio: float, seed: int = 42) -> List[str]:
+    """
+    Endereços sintéticos com variações de escrita.
+
+    Args:
+        rows: Quantidade de linhas
+        dup_ratio: Fração das linhas que repete um endereço anterior
+        cep_ratio: Fração dos endereços únicos que trazem CEP
+    """
+    rnd = random.Random(seed)
+    table = street_table()
+    out: List[str] = []
+    for _ in range(rows):
+        if out and rnd.random() < dup_ratio:
+            out.append(out[rnd.randrange(len(out))])
+            continue
+        street = rnd.choice(table)
+        logradouro = street["logradouro"]
+        if rnd.random() < 0.3:
+            logradouro = logradouro.upper()
+        addr = f"{logradouro}, {rnd.randint(1, 3000)} - {street['bairro']}, {street['localidade']} - {street['uf']}"
+        if rnd.random() < cep_ratio:
+            cep = street["cep"]
+            if rnd.random() < UNKNOWN_CEP_RATIO:
+                cep = f"99{cep[2:]}"
+            addr += f", {cep if rnd.random() < 0.7 else cep.replace('-', '')}"
+        out.append(addr)
+    return out
+
+
+def write_file(addresses: List[str], fmt: str, path: str) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            w = csv.writer(f)
+            w.writerow(["id", "address"])
+            w.writerows(enumerate(addresses, start=1))
+        else:
+            f.write("CREATE TABLE enderecos (id integer, address text);\n")
+            for start in range(0, len(addresses), 500):
+                values = ",\n".join(
+                    "({}, '{}')".format(i, a.replace("'", "''"))
+                    for i, a in enumerate(addresses[start:start + 500], start=start + 1)
+                )
+                f.write(f"INSERT INTO enderecos (id, address) VALUES\n{values};\n")
+
+
+class FakeViaCep:
+    """Servidor HTTP local com as respostas do ViaCEP para a tabela sintética."""
+
+    def __init__(self, latency: float = 0.0):
+        ceps = {s["cep"].replace("-", ""): s for s in street_table()}
+        body_unknown = json.dumps({"erro": True}).encode()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")  # ws/{cep}/json
+                data = ceps.get(parts[1]) if len(parts) == 3 else None
+                body = json.dumps(data).encode() if data else body_unknown
+                if latency:
+                    time.sleep(latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/ws/{{}}/json/"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakeViaCep":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _file_batches(path: str, fmt: str, size: int) -> List[bytes]:
+    """Divide o arquivo em arquivos menores de ``size`` endereços (modo api)."""
+    from app.services.parser import iter_csv_addresses, iter_sql_addresses
+
+    with open(path, "rb") as f:
+        addresses = list(iter_csv_addresses(f) if fmt == "csv" else iter_sql_addresses(f))
+    batches = []
+    for start in range(0, len(addresses), size):
+        buf = io.StringIO()
+        part = addresses[start:start + size]
+        if fmt == "csv":
+            w = csv.writer(buf)
+            w.writerow(["address"])
+            w.writerows([a] for a in part)
+        else:
+            values = ",\n".join("('{}')".format(a.replace("'", "''")) for a in part)
+            buf.write(f"INSERT INTO enderecos (address) VALUES\n{values};\n")
+        batches.append(buf.getvalue().encode("utf-8"))
+    return batches
+
+
+def _run_api(path: str, fmt: str, request_rows: int) -> Tuple[int, float, List[float]]:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    batches = _file_batches(path, fmt, request_rows)
+    latencies = []
+    rows = 0
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        for body in batches:
+            start = time.perf_counter()
+            response = client.post("/api/upload", files={"file": (f"bench.{fmt}", body, "application/octet-stream")})
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+            rows += len(response.json())
+        elapsed = time.perf_counter() - started
+    return rows, elapsed, latencies
+
+
+def _run_pipeline(path: str, fmt: str) -> Tuple[int, float, List[float]]:
+    import asyncio
+
+    from app.config import DB_CHUNK_SIZE
+    from app.database import Base, SessionLocal, engine
+    from app.providers.http_client import close_http_client
+    from app.services.dedup import UploadDeduplicator
+    from app.services.parser import iter_csv_addresses, iter_sql_addresses
+    from app.services.processing import chunks, process_addresses
+
+    Base.metadata.create_all(bind=engine)
+
+    async def run():
+        db = SessionLocal()
+        latencies = []
+        rows = 0
+        started = time.perf_counter()
+        try:
+            dedup = UploadDeduplicator(db)
+            with open(path, "rb") as f:
+                addresses = iter_csv_addresses(f) if fmt == "csv" else iter_sql_addresses(f)
+                for chunk in chunks(addresses, DB_CHUNK_SIZE):
+                    start = time.perf_counter()
+                    rows += len(await process_addresses(chunk, db, dedup=dedup, source="bench"))
+                    latencies.append(time.perf_counter() - start)
+            elapsed = time.perf_counter() - started
+        finally:
+            db.close()
+            await close_http_client()
+        return rows, elapsed, latencies
+
+    return asyncio.run(run())
+
+
+def _run_scenario(mode: str, path: str, fmt: str, env: Dict[str, str], request_rows: int, queue) -> None:
+    # Processo novo: as variáveis de ambiente valem antes de importar a aplicação
+    os.environ.update(env)
+    import logging
+
+    logging.disable(logging.INFO)
+    # O tempo medido exclui a importação da aplicação e a preparação dos arquivos
+    if mode == "api":
+        rows, elapsed, latencies = _run_api(path, fmt, request_rows)
+    else:
+        rows, elapsed, latencies = _run_pipeline(path, fmt)
+    # ru_maxrss em KiB no Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put({
+        "rows": rows,
+        "seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+        "batches": len(latencies),
+        "latency_p50": _percentile(latencies, 0.5),
+        "latency_p99": _percentile(latencies, 0.99),
+        "latency_mean": statistics.fmean(latencies) if latencies else None,
+        "peak_rss_mib": round(rss, 1),
+    })
+
+
+def _wait_result(proc, queue) -> Dict[str, Any]:
+    # Se o processo do cenário morrer com erro, não espera para sempre pelo resultado
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except Empty:
+            if not proc.is_alive():
+                raise RuntimeError(f"cenário terminou sem resultado (exit code {proc.exitcode})")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> bool:
+    """
+    Compara com uma execução anterior e imprime as diferenças.
+
+    Returns:
+        True se algum cenário ficou mais lento que ``tolerance`` (fração)
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+    regressed = False
+    print(f"\ncomparação com {baseline_path} (tolerância {tolerance:.0%}):")
+    for r in results:
+        base = baseline.get(r["scenario"])
+        if not base or not base.get("rows_per_second"):
+            print(f"  {r['scenario']:<28} sem referência")
+            continue
+        change = r["rows_per_second"] / base["rows_per_second"] - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSÃO"
+            regressed = True
+        print(f"  {r['scenario']:<28} linhas/s {change:+7.1%}  p99 {base['latency_p99']:.3f}s -> {r['latency_p99']:.3f}s{flag}")
+    return regressed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    ap.add_argument("--formats", nargs="+", choices=["csv", "sql"], default=["csv"])
+    ap.add_argument("--modes", nargs="+", choices=["api", "pipeline"], default=["api", "pipeline"])
+    ap.add_argument("--dup-ratio", type=float, default=0.2, help="fração de linhas duplicadas")
+    ap.add_argument("--cep-ratio", type=float, default=0.6, help="fração dos endereços com CEP")
+    ap.add_argument("--providers", default="local,dummy,viacep", help="API_PROVIDERS dos cenários")
+    ap.add_argument("--viacep-latency", type=float, default=0.0, help="latência simulada do ViaCEP (s)")
+    ap.add_argument("--request-rows", type=int, default=1000, help="linhas por requisição no modo api")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--output", help="grava os resultados em JSON")
+    ap.add_argument("--compare", help="JSON de uma execução anterior para comparação")
+    ap.add_argument("--tolerance", type=float, default=0.1, help="queda de linhas/s tolerada na comparação")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="geomatch-bench-")
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    with FakeViaCep(args.viacep_latency) as viacep:
+        for rows in args.rows:
+            addresses = generate_addresses(rows, args.dup_ratio, args.cep_ratio, args.seed)
+            for fmt in args.formats:
+                path = os.path.join(workdir, f"bench_{rows}.{fmt}")
+                write_file(addresses, fmt, path)
+                for mode in args.modes:
+                    scenario = f"{mode}/{fmt}/{rows}"
+                    db_path = os.path.join(workdir, f"{mode}_{fmt}_{rows}.db")
+                    env = {
+                        "DATABASE_URL": f"sqlite:///{db_path}",
+                        "CEP_CACHE_PATH": "",
+                        "CEP_CACHE_PREWARM_FILE": "",
+                        "VIACEP_URL": viacep.url,
+                        "API_PROVIDERS": args.providers,
+                    }
+                    queue = ctx.Queue()
+                    proc = ctx.Process(target=_run_scenario, args=(mode, path, fmt, env, args.request_rows, queue))
+                    proc.start()
+                    result = {"scenario": scenario, "mode": mode, "format": fmt, **_wait_result(proc, queue)}
+                    proc.join()
+                    results.append(result)
+                    print(
+                        f"{scenario:<28} {result['rows_per_second']:>9.0f} linhas/s  "
+                        f"p50 {result['latency_p50']:.3f}s  p99 {result['latency_p99']:.3f}s  "
+                        f"pico RSS {result['peak_rss_mib']:.0f} MiB"
+                    )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **{k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"resultados gravados em {args.output}")
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark do agendamento de provedores: chamadas por endereço e tempo por chunk.
+
+Uso (a partir da pasta backend):
+    python -m benchmarks.bench_provider_scheduler --rows 10000 --chunk-size 500
+
+Usa provedores simulados com custos e taxas de acerto diferentes e compara:
+
+- ``all``: comportamento anterior, todos os provedores para todos os endereços;
+- ``fixed``: ondas com parada antecipada, na ordem configurada;
+- ``adaptive``: ondas ordenadas pelas estatísticas do scheduler.
+"""
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from typing import List
+
+from app.providers.base import AsyncProvider
+from app.services.matching import normalize_many
+from app.services.scheduler import ProviderScheduler
+from app.services.validation import validate_batch
+from app.utils.validators import extract_cep, normalize_cep
+
+
+class SimulatedProvider(AsyncProvider):
+    """
+    Provedor com latência por chamada (``concurrency`` chamadas em paralelo) e
+    taxa de acerto determinística por endereço.
+    """
+
+    def __init__(self, name: str, latency: float, hit_rate: float, needs_cep: bool = False):
+        self.name = name
+        self.latency = latency
+        self.hit_rate = hit_rate
+        self.needs_cep = needs_cep
+
+    def applies(self, address: str) -> bool:
+        return not self.needs_cep or extract_cep(address) is not None
+
+    async def validate(self, address: str):
+        return (await self.validate_many([address]))[0]
+
+    async def validate_many(self, addresses: List[str], concurrency: int = 10):
+        await asyncio.sleep(self.latency * -(-len(addresses) // max(1, concurrency)))
+        out = []
+        for a in addresses:
+            if self.needs_cep and extract_cep(a) is None:
+                out.append(ValueError("CEP não encontrado no endereço"))
+                continue
+            hit = (zlib.crc32(f"{self.name}:{a}".encode()) % 1000) / 1000 < self.hit_rate
+            out.append({"matched_address": a if hit else "endereco divergente", "score": 0.0, "metadata": {}})
+        return out
+
+
+def make_providers() -> List[AsyncProvider]:
+    # Ordem "configurada" propositalmente ruim: o provedor caro vem primeiro
+    return [
+        SimulatedProvider("remote_cep", latency=0.040, hit_rate=0.9, needs_cep=True),
+        SimulatedProvider("fuzzy", latency=0.004, hit_rate=0.7),
+        SimulatedProvider("cache", latency=0.0005, hit_rate=0.5),
+    ]
+
+
+def make_addresses(rows: int, cep_ratio: float, seed: int = 42) -> List[str]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(rows):
+        addr = f"Rua Teste {i}, {rnd.randint(1, 999)}, São Paulo - SP"
+        if rnd.random() < cep_ratio:
+            addr += f", {rnd.randint(1000, 99999):05d}-{rnd.randint(0, 999):03d}"
+        out.append(addr)
+    return out
+
+
+def chunked(items: List[str], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def run_all(addresses: List[str], chunk_size: int):
+    providers = make_providers()
+    calls = 0
+    for chunk in chunked(addresses, chunk_size):
+        await validate_batch(providers, chunk)
+        calls += len(providers) * len(chunk)
+    return calls
+
+
+async def run_scheduled(addresses: List[str], chunk_size: int, adaptive: bool):
+    providers = make_providers()
+    sched = ProviderScheduler(adaptive=adaptive, min_calls=chunk_size)
+    for chunk in chunked(addresses, chunk_size):
+        norms = normalize_many(chunk)
+        ceps = [normalize_cep(c) if c else None for c in map(extract_cep, chunk)]
+        await sched.run(providers, chunk, norms, ceps)
+    return sum(s["calls"] for s in sched.snapshot()), sched
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--chunk-size", type=int, default=500)
+    ap.add_argument("--cep-ratio", type=float, default=0.6, help="fração dos endereços com CEP")
+    args = ap.parse_args()
+
+    addresses = make_addresses(args.rows, args.cep_ratio)
+    print(f"{args.rows} endereços, chunk {args.chunk_size}, {args.cep_ratio:.0%} com CEP")
+
+    start = time.perf_counter()
+    calls = asyncio.run(run_all(addresses, args.chunk_size))
+    elapsed = time.perf_counter() - start
+    print(f"  {'all':<9} {calls / args.rows:5.2f} chamadas/endereço  {elapsed:7.2f}s")
+
+    for label, adaptive in (("fixed", False), ("adaptive", True)):
+        start = time.perf_counter()
+        calls, sched = asyncio.run(run_scheduled(addresses, args.chunk_size, adaptive))
+        elapsed = time.perf_counter() - start
+        per_provider = ", ".join(f"{s['name']}={s['calls']}" for s in sched.snapshot())
+        print(f"  {label:<9} {calls / args.rows:5.2f} chamadas/endereço  {elapsed:7.2f}s  ({per_provider})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Teste de carga de ``GET /api/validate`` sob uvicorn com vários workers.
+
+Uso (a partir da pasta backend):
+    python -m benchmarks.bench_validate --workers 1 2 4 --duration 10
+    python -m benchmarks.bench_validate --workers 4 --clients 4 --concurrency 32 --output validate.json
+
+Para cada quantidade de workers, sobe ``uvicorn app.main:app --workers N``
+com um banco SQLite temporário e o ViaCEP falso de ``bench_pipeline``, aquece
+o cache de resultados (``--warmup-rounds`` passagens pelos endereços: o cache
+é por processo, então cada worker precisa ver cada endereço) e então mede por
+``--duration`` segundos com ``--clients`` processos clientes, cada um com
+``--concurrency`` requisições simultâneas sobre endereços sorteados.
+
+O relatório traz requisições/s, latência p50/p99 (geral e só dos acertos de
+cache, medida no cliente) e a taxa de acerto. Cliente e servidor dividem a
+mesma máquina: com poucos núcleos, os clientes limitam o resultado.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from queue import Empty
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.bench_pipeline import FakeViaCep, _git_commit, _percentile, generate_addresses
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base_url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn terminou com código {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("uvicorn não respondeu a tempo")
+
+
+async def _load(base_url: str, addresses: List[str], duration: float, concurrency: int, persist: bool, seed: int):
+    rnd = random.Random(seed)
+    latencies: List[float] = []
+    hits: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                params = {"address": rnd.choice(addresses), "persist": str(persist).lower()}
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/api/validate", params=params)
+                    elapsed = time.perf_counter() - started
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(elapsed)
+                if response.json()["cached"]:
+                    hits.append(elapsed)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, hits, errors
+
+
+def _client(base_url, addresses, duration, concurrency, persist, seed, queue) -> None:
+    queue.put(asyncio.run(_load(base_url, addresses, duration, concurrency, persist, seed)))
+
+
+def _warm(base_url: str, addresses: List[str], rounds: int, persist: bool) -> None:
+    async def run():
+        limits = httpx.Limits(max_connections=16)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            semaphore = asyncio.Semaphore(16)
+
+            async def one(address):
+                async with semaphore:
+                    await client.get("/api/validate", params={"address": address, "persist": str(persist).lower()})
+
+            for _ in range(rounds):
+                await asyncio.gather(*(one(a) for a in addresses))
+
+    asyncio.run(run())
+
+
+def run_scenario(args, workers: int, addresses: List[str], env: Dict[str, str]) -> Dict[str, Any]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, **env}
+    # Migra o banco antes: assim os workers não disputam a trava das migrações ao subir
+    subprocess.run([sys.executable, "-c", "import app.main"], env=env, check=True)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    try:
+        _wait_ready(base_url, proc)
+        rounds = args.warmup_rounds if args.warmup_rounds is not None else 4 * workers
+        _warm(base_url, addresses, rounds, args.persist)
+
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        clients = [
+            ctx.Process(target=_client, args=(
+                base_url, addresses, args.duration, args.concurrency, args.persist, args.seed + i, queue,
+            ))
+            for i in range(args.clients)
+        ]
+        for c in clients:
+            c.start()
+        latencies: List[float] = []
+        hits: List[float] = []
+        errors = 0
+        for _ in clients:
+            try:
+                lat, hit, err = queue.get(timeout=args.duration + 120)
+            except Empty:
+                raise RuntimeError("cliente de carga não respondeu")
+            latencies += lat
+            hits += hit
+            errors += err
+        for c in clients:
+            c.join()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / args.duration,
+        "hit_ratio": len(hits) / len(latencies) if latencies else 0.0,
+        "latency_p50": _percentile(latencies, 0.50),
+        "latency_p99": _percentile(latencies, 0.99),
+        "hit_latency_p50": _percentile(hits, 0.50),
+        "hit_latency_p99": _percentile(hits, 0.99),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--clients", type=int, default=2, help="processos clientes")
+    ap.add_argument("--concurrency", type=int, default=16, help="requisições simultâneas por cliente")
+    ap.add_argument("--duration", type=float, default=10.0, help="segundos de medição por cenário")
+    ap.add_argument("--addresses", type=int, default=1000, help="endereços distintos consultados")
+    ap.add_argument("--warmup-rounds", type=int, help="passagens de aquecimento (padrão: 4 x workers)")
+    ap.add_argument("--persist", action="store_true", help="grava os resultados (persist=true)")
+    ap.add_argument("--providers", default="local,dummy,viacep", help="API_PROVIDERS do servidor")
+    ap.add_argument("--cep-ratio", type=float, default=0.6, help="fração dos endereços com CEP")
+    ap.add_argument("--viacep-latency", type=float, default=0.0, help="latência simulada do ViaCEP (s)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--output", help="grava os resultados em JSON")
+    args = ap.parse_args()
+
+    addresses = generate_addresses(args.addresses, dup_ratio=0.0, cep_ratio=args.cep_ratio, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="geomatch-bench-")
+    print(f"{args.addresses} endereços, {args.clients} clientes x {args.concurrency} conexões, {os.cpu_count()} núcleos")
+    results = []
+    with FakeViaCep(args.viacep_latency) as viacep:
+        for workers in args.workers:
+            env = {
+                "DATABASE_URL": f"sqlite:///{os.path.join(workdir, f'validate_{workers}.db')}",
+                "CEP_CACHE_PATH": "",
+                "CEP_CACHE_PREWARM_FILE": "",
+                "VIACEP_URL": viacep.url,
+                "API_PROVIDERS": args.providers,
+                "LOG_LEVEL": "WARNING",
+            }
+            result = run_scenario(args, workers, addresses, env)
+            results.append(result)
+            print(
+                f"  {workers} workers: {result['requests_per_second']:>8.0f} req/s  "
+                f"p50 {result['latency_p50'] * 1e3:6.2f}ms  p99 {result['latency_p99'] * 1e3:6.2f}ms  "
+                f"acertos {result['hit_ratio']:.1%} (p99 {result['hit_latency_p99'] * 1e3:.2f}ms)  "
+                f"erros {result['errors']}"
+            )
+
+    if args.output:
+        report = {
+            "meta": {"commit": _git_commit(), "cpus": os.cpu_count(), **{k: v for k, v in vars(args).items() if k != "output"}},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"resultados gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Ambiente do Alembic: usa o ``DATABASE_URL`` da aplicação e os modelos de ``app.models``.
+
+Chamado por ``app.database.upgrade_schema``, recebe a conexão já aberta (e
+travada) em ``config.attributes["connection"]``.
+"""
+from alembic import context
+from sqlalchemy import create_engine
+
+from app.config import DATABASE_URL
+from app.database import Base
+from app import models  # noqa: F401  (registra as tabelas em Base.metadata)
+
+config = context.config
+
+
+def _configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=Base.metadata,
+        # SQLite não altera colunas com ALTER TABLE: recria a tabela em lote
+        render_as_batch=True,
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    _configure(url=DATABASE_URL, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
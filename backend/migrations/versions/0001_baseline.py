@@ -0,0 +1,64 @@
+"""
+Schema inicial: endereços, resultados de provedores e auditoria
+
+Bancos criados pelo antigo ``create_all`` recebem esta revisão via ``stamp``
+em ``app.database.upgrade_schema``, sem executar o ``upgrade``. Como o
+``create_all`` também criava as tabelas e índices adicionados depois, as
+revisões seguintes só criam o que ainda não existe no banco.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "addresses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("raw_address", sa.String()),
+        sa.Column("normalized_address", sa.String()),
+        sa.Column("cep", sa.String(), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_addresses_id", "addresses", ["id"])
+    op.create_index("ix_addresses_raw_address", "addresses", ["raw_address"])
+    op.create_index("ix_addresses_normalized_address", "addresses", ["normalized_address"])
+    op.create_index("ix_addresses_cep", "addresses", ["cep"])
+
+    op.create_table(
+        "provider_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("address_id", sa.Integer(), sa.ForeignKey("addresses.id")),
+        sa.Column("provider_name", sa.String()),
+        sa.Column("matched_address", sa.String()),
+        sa.Column("cep", sa.String(), nullable=True),
+        sa.Column("score", sa.Float()),
+        sa.Column("extra_metadata", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_provider_results_id", "provider_results", ["id"])
+    op.create_index("ix_provider_results_provider_name", "provider_results", ["provider_name"])
+
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("event", sa.String()),
+        sa.Column("details", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_audit_logs_id", "audit_logs", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("audit_logs")
+    op.drop_table("provider_results")
+    op.drop_table("addresses")
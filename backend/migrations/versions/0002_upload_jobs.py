@@ -0,0 +1,51 @@
+"""
+Jobs de upload em segundo plano e suas linhas de entrada
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Bancos do antigo create_all podem já ter as tabelas
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if "upload_jobs" not in tables:
+        op.create_table(
+            "upload_jobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("source", sa.String()),
+            sa.Column("filename", sa.String(), nullable=True),
+            sa.Column("status", sa.String()),
+            sa.Column("total_rows", sa.Integer()),
+            sa.Column("processed_rows", sa.Integer()),
+            sa.Column("error_count", sa.Integer()),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_upload_jobs_id", "upload_jobs", ["id"])
+        op.create_index("ix_upload_jobs_status", "upload_jobs", ["status"])
+    if "upload_job_rows" not in tables:
+        op.create_table(
+            "upload_job_rows",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("job_id", sa.Integer(), sa.ForeignKey("upload_jobs.id"), nullable=False),
+            sa.Column("seq", sa.Integer(), nullable=False),
+            sa.Column("raw_address", sa.String()),
+            sa.Column("address_id", sa.Integer(), sa.ForeignKey("addresses.id"), nullable=True),
+            sa.UniqueConstraint("job_id", "seq"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("upload_job_rows")
+    op.drop_table("upload_jobs")
@@ -0,0 +1,24 @@
+"""
+Índice de ``provider_results.address_id`` (carga dos resultados de cada endereço)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    indexes = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("provider_results")}
+    if "ix_provider_results_address_id" not in indexes:
+        op.create_index("ix_provider_results_address_id", "provider_results", ["address_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_provider_results_address_id", table_name="provider_results")
@@ -0,0 +1,33 @@
+"""
+Endereços de referência usados pelo índice de referência
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if "reference_addresses" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "reference_addresses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.Column("cep", sa.String(), nullable=True),
+        sa.Column("city", sa.String(), nullable=True),
+        sa.Column("uf", sa.String(2), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_reference_addresses_cep", "reference_addresses", ["cep"])
+
+
+def downgrade() -> None:
+    op.drop_table("reference_addresses")
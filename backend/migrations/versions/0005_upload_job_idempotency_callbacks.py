@@ -0,0 +1,36 @@
+"""
+Chave de idempotência e callback dos jobs (lotes do webhook)
+
+A unicidade de ``idempotency_key`` é um índice único: o SQLite não adiciona
+constraints com ``ALTER TABLE``. Em bancos do antigo ``create_all`` o índice
+convive com a constraint ``UNIQUE`` que já existia.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("upload_jobs")}
+    for name in ("idempotency_key", "callback_url", "callback_status"):
+        if name not in columns:
+            op.add_column("upload_jobs", sa.Column(name, sa.String(), nullable=True))
+    if "ix_upload_jobs_idempotency_key" not in {ix["name"] for ix in inspector.get_indexes("upload_jobs")}:
+        op.create_index("ix_upload_jobs_idempotency_key", "upload_jobs", ["idempotency_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_upload_jobs_idempotency_key", table_name="upload_jobs")
+    with op.batch_alter_table("upload_jobs") as batch:
+        batch.drop_column("callback_status")
+        batch.drop_column("callback_url")
+        batch.drop_column("idempotency_key")
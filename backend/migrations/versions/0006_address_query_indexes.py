@@ -0,0 +1,99 @@
+"""
+Índices das consultas de leitura e vencedor desnormalizado em ``addresses``
+
+- remove os índices de ``raw_address`` (nunca filtrado) e os índices
+  duplicados das chaves primárias;
+- troca o índice de ``normalized_address`` por (``normalized_address``,
+  ``created_at``), a consulta da deduplicação;
+- cria (``status``, ``id``) para a listagem paginada por status e
+  (``status``, ``created_at``) e (``created_at``) para as exportações;
+- adiciona ``best_score``/``winner_provider``, preenchidos a partir de
+  ``provider_results`` com ``persistence.best_result``, a mesma regra do
+  ``AddressBatchWriter`` (resultados na ordem de gravação).
+
+``provider_results.address_id`` já é indexado pela revisão 0003.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.persistence import best_result
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+_BACKFILL_BATCH = 1000
+
+
+def _backfill_winners() -> None:
+    """Preenche o vencedor de cada endereço, em lotes de ids de endereço."""
+    conn = op.get_bind()
+    addresses = sa.table("addresses", sa.column("id"), sa.column("best_score"), sa.column("winner_provider"))
+    update = (
+        addresses.update()
+        .where(addresses.c.id == sa.bindparam("address_id"))
+        .values(best_score=sa.bindparam("score"), winner_provider=sa.bindparam("provider_name"))
+    )
+    last = 0
+    while True:
+        ids = conn.execute(
+            sa.text("SELECT id FROM addresses WHERE id > :last ORDER BY id LIMIT :limit"),
+            {"last": last, "limit": _BACKFILL_BATCH},
+        ).scalars().all()
+        if not ids:
+            return
+        last = ids[-1]
+        rows = conn.execute(
+            sa.text(
+                "SELECT address_id, provider_name, score FROM provider_results "
+                "WHERE address_id BETWEEN :first AND :last ORDER BY address_id, id"
+            ),
+            {"first": ids[0], "last": last},
+        ).mappings().all()
+        winners = []
+        for address_id, results in groupby(rows, key=lambda r: r["address_id"]):
+            best = best_result(list(results))
+            winners.append({"address_id": address_id, "score": best["score"], "provider_name": best["provider_name"]})
+        if winners:
+            conn.execute(update, winners)
+
+
+def upgrade() -> None:
+    op.drop_index("ix_addresses_id", table_name="addresses")
+    op.drop_index("ix_addresses_raw_address", table_name="addresses")
+    op.drop_index("ix_addresses_normalized_address", table_name="addresses")
+    op.drop_index("ix_provider_results_id", table_name="provider_results")
+
+    op.add_column("addresses", sa.Column("best_score", sa.Float(), nullable=True))
+    op.add_column("addresses", sa.Column("winner_provider", sa.String(), nullable=True))
+    _backfill_winners()
+
+    op.create_index(
+        "ix_addresses_normalized_address_created_at", "addresses", ["normalized_address", "created_at"]
+    )
+    op.create_index("ix_addresses_status_id", "addresses", ["status", "id"])
+    op.create_index("ix_addresses_status_created_at", "addresses", ["status", "created_at"])
+    op.create_index("ix_addresses_created_at", "addresses", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_addresses_created_at", table_name="addresses")
+    op.drop_index("ix_addresses_status_created_at", table_name="addresses")
+    op.drop_index("ix_addresses_status_id", table_name="addresses")
+    op.drop_index("ix_addresses_normalized_address_created_at", table_name="addresses")
+
+    with op.batch_alter_table("addresses") as batch:
+        batch.drop_column("winner_provider")
+        batch.drop_column("best_score")
+
+    op.create_index("ix_provider_results_id", "provider_results", ["id"])
+    op.create_index("ix_addresses_normalized_address", "addresses", ["normalized_address"])
+    op.create_index("ix_addresses_raw_address", "addresses", ["raw_address"])
+    op.create_index("ix_addresses_id", "addresses", ["id"])
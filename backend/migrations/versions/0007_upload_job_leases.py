@@ -0,0 +1,28 @@
+"""
+Posse dos jobs por worker (owner e lease_until)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("upload_jobs")}
+    if "owner" not in columns:
+        op.add_column("upload_jobs", sa.Column("owner", sa.String(), nullable=True))
+    if "lease_until" not in columns:
+        op.add_column("upload_jobs", sa.Column("lease_until", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("upload_jobs") as batch:
+        batch.drop_column("lease_until")
+        batch.drop_column("owner")
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark da normalização de endereços
+
+Compara ``normalize_address`` (tabelas pré-compiladas + cache LRU) com a
+implementação anterior baseada em ``re.sub``, em endereços brasileiros
+sintéticos. Não é coletado pelo pytest; execute a partir de ``backend``:
+
+    python -m tests.bench_normalize --rows 200000
+"""
+import argparse
+import random
+import re
+import time
+import unicodedata
+from typing import Callable, List
+
+from app.services import matching
+
+LOGRADOUROS = ["Rua", "R.", "Avenida", "Av.", "Travessa", "Praça", "Alameda", "Estrada", "Rodovia"]
+NOMES = [
+    "XV de Novembro", "São João", "Brigadeiro Faria Lima", "Dom Pedro II", "Getúlio Vargas",
+    "Conceição", "Marechal Floriano Peixoto", "José Bonifácio", "Tiradentes", "Paraná",
+    "Visconde de Mauá", "Santa Efigênia", "Nossa Senhora Aparecida", "Coronel Araújo",
+]
+BAIRROS = ["Centro", "Bela Vista", "Jardim América", "Vila Mariana", "Botafogo", "Água Verde", "Itaim Bibi"]
+CIDADES = [("São Paulo", "SP"), ("Curitiba", "PR"), ("Rio de Janeiro", "RJ"), ("Belém", "PA"), ("Goiânia", "GO")]
+COMPLEMENTOS = ["", "", "apto 12", "Apto. 301 - Bloco B", "sala 5", "fundos", "casa 2", "2º andar"]
+
+
+def legacy_normalize_address(addr: str) -> str:
+    """Implementação anterior de ``normalize_address`` (referência de comportamento)."""
+    s = addr.lower().strip()
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    s = s.replace("-", "")
+    s = re.sub(r"[^a-z0-9\s]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def generate_addresses(rows: int, seed: int = 42, ascii_ratio: float = 0.3) -> List[str]:
+    """Gera endereços realistas; ``ascii_ratio`` controla a fração sem acentos."""
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(rows):
+        cidade, uf = rnd.choice(CIDADES)
+        parts = [
+            f"{rnd.choice(LOGRADOUROS)} {rnd.choice(NOMES)}, Nº {rnd.randint(1, 9999)}",
+            rnd.choice(COMPLEMENTOS),
+            rnd.choice(BAIRROS),
+            f"{cidade} - {uf}",
+            f"{rnd.randint(1000, 99999):05d}-{rnd.randint(0, 999):03d}",
+        ]
+        address = ", ".join(p for p in parts if p)
+        if rnd.random() < ascii_ratio:
+            address = unicodedata.normalize("NFKD", address).encode("ascii", "ignore").decode("ascii")
+        out.append(address)
+    return out
+
+
+def _bench(fn: Callable[[str], str], data: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for a in data:
+            fn(a)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--unique", type=int, default=20000, help="endereços distintos (o resto são repetições)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    distinct = generate_addresses(args.unique)
+    rnd = random.Random(7)
+    data = [rnd.choice(distinct) for _ in range(args.rows)]
+    assert all(matching._normalize(a) == legacy_normalize_address(a) for a in distinct)
+
+    scenarios = [
+        ("legacy (re.sub)", legacy_normalize_address),
+        ("tables, no cache", matching._normalize),
+        ("tables + LRU warm", matching.normalize_address),
+    ]
+    print(f"{args.rows} endereços ({args.unique} distintos), melhor de {args.repeat}")
+    baseline = None
+    for label, fn in scenarios:
+        matching._normalize_cached.cache_clear()
+        elapsed = _bench(fn, data, args.repeat)
+        baseline = baseline or elapsed
+        print(f"  {label:<18} {elapsed:8.3f}s  {args.rows / elapsed:12,.0f} addr/s  {baseline / elapsed:5.1f}x")
+
+    matching._normalize_cached.cache_clear()
+    start = time.perf_counter()
+    matching.normalize_many(data)
+    elapsed = time.perf_counter() - start
+    print(f"  {'normalize_many':<18} {elapsed:8.3f}s  {args.rows / elapsed:12,.0f} addr/s  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
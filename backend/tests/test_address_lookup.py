@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Address
+from app.providers import lookup_cache
+from app.providers.base import AsyncProvider, ProviderUnavailable
+from app.services import address_lookup
+from app.services.address_lookup import UnknownProvider, validate_address
+
+
+class _Provider(AsyncProvider):
+    def __init__(self, name, fail=False, error=None, delay=0.0):
+        self.name = name
+        self.fail = fail
+        self.error = error or ProviderUnavailable("indisponível")
+        self.delay = delay
+        self.calls = 0
+
+    async def validate(self, address):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise self.error
+        return {"matched_address": address, "score": 1.0, "metadata": {"cep": None}}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(lookup_cache, "_caches", {})
+    monkeypatch.setattr(address_lookup, "_provider_sets", {})
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_cache_hit_reuses_result_and_persisted_id(db):
+    provider = _Provider("fake")
+    address_lookup._provider_sets[("fake",)] = [provider]
+
+    first, cached = asyncio.run(validate_address("Rua A, 10", db, ["fake"], persist=False))
+    assert not cached and first["id"] is None and first["winner_provider"] == "fake"
+
+    # Mesma chave normalizada: acerto no cache, gravado uma única vez
+    second, cached = asyncio.run(validate_address("rua a 10", db, ["fake"]))
+    third, cached_again = asyncio.run(validate_address("RUA A - 10", db, ["fake"]))
+    assert cached and cached_again
+    assert second["id"] is not None and third["id"] == second["id"]
+    assert provider.calls == 1
+    assert db.scalar(select(func.count()).select_from(Address)) == 1
+
+
+def test_partial_results_are_not_cached(db):
+    ok, broken = _Provider("ok"), _Provider("broken", fail=True)
+    address_lookup._provider_sets[("ok", "broken")] = [ok, broken]
+
+    value, _ = asyncio.run(validate_address("Rua B, 1", db, ["ok", "broken"], persist=False))
+    assert value["partial"] and [r["provider_name"] for r in value["results"]] == ["ok"]
+    _, cached = asyncio.run(validate_address("Rua B, 1", db, ["ok", "broken"], persist=False))
+    assert not cached and ok.calls == 2
+
+
+def test_definitive_provider_error_is_not_partial(db):
+    ok, refused = _Provider("ok"), _Provider("refused", fail=True, error=ValueError("fora da cobertura"))
+    address_lookup._provider_sets[("ok", "refused")] = [ok, refused]
+
+    value, _ = asyncio.run(validate_address("Rua D, 1", db, ["ok", "refused"], persist=False))
+    assert not value["partial"]
+    _, cached = asyncio.run(validate_address("Rua D, 1", db, ["ok", "refused"], persist=False))
+    assert cached and ok.calls == 1
+
+
+def test_concurrent_misses_persist_once(db):
+    provider = _Provider("slow", delay=0.05)
+    address_lookup._provider_sets[("slow",)] = [provider]
+
+    async def burst():
+        return await asyncio.gather(*(validate_address("Rua E, 5", db, ["slow"]) for _ in range(5)))
+
+    results = asyncio.run(burst())
+    assert len({value["id"] for value, _ in results}) == 1
+    assert sum(not cached for _, cached in results) == 1
+    assert provider.calls == 1
+    assert db.scalar(select(func.count()).select_from(Address)) == 1
+    assert address_lookup._key_locks == {}
+
+
+def test_get_validate_persists_only_on_request(db):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.database import get_db
+    from app.routers import validate
+
+    address_lookup._provider_sets[("fake",)] = [_Provider("fake")]
+    app = FastAPI()
+    app.include_router(validate.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+
+    plain = client.get("/api/validate", params={"address": "Rua F, 6", "providers": "fake"}).json()
+    assert plain["id"] is None
+    assert db.scalar(select(func.count()).select_from(Address)) == 0
+
+    stored = client.get("/api/validate", params={"address": "Rua F, 6", "providers": "fake", "persist": "true"}).json()
+    assert stored["id"] is not None and stored["cached"]
+    assert db.scalar(select(func.count()).select_from(Address)) == 1
+
+
+def test_unknown_provider(db):
+    with pytest.raises(UnknownProvider, match="nope"):
+        asyncio.run(validate_address("Rua C, 1", db, ["local", "nope"]))
@@ -0,0 +1,117 @@
+"""
+Testes da listagem de endereços: paginação por cursor e filtros
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_db
+from app.models import Address
+from app.routers import addresses
+from app.services.persistence import AddressBatchWriter
+from app.utils.validators import normalize_cep
+
+TOTAL = 25
+
+
+def _result(provider, score):
+    return {"provider_name": provider, "matched_address": "x", "cep": None, "score": score, "extra_metadata": None}
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    writer = AddressBatchWriter(db, chunk_size=10)
+    for i in range(TOTAL):
+        # p1 em todos (score 4*i); p2 com score 50 só nos ímpares
+        results = [_result("p1", 4.0 * i)] + ([_result("p2", 50.0)] if i % 2 else [])
+        writer.add(
+            {
+                "raw_address": f"Rua {i}",
+                "normalized_address": f"rua {i}",
+                "cep": normalize_cep(f"0100{i % 5}-000"),
+                "status": "valid" if i % 3 == 0 else "invalid",
+            },
+            results,
+        )
+    writer.flush()
+
+    app = FastAPI()
+    app.include_router(addresses.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    db.close()
+
+
+def _walk(client, limit, **params):
+    """Percorre todas as páginas seguindo ``X-Next-Cursor``; devolve os números das ruas por página."""
+    pages, cursor = [], None
+    while True:
+        query = {"limit": limit, "view": "summary", **params}
+        if cursor is not None:
+            query["cursor"] = cursor
+        response = client.get("/api/addresses", params=query)
+        assert response.status_code == 200
+        pages.append([int(a["raw_address"].split()[1]) for a in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        assert len(pages) <= TOTAL
+
+
+def test_cursor_walks_every_address_once_newest_first(client):
+    pages = _walk(client, 7)
+    assert [len(p) for p in pages] == [7, 7, 7, 4]
+    assert [n for page in pages for n in page] == list(range(TOTAL - 1, -1, -1))
+
+
+def test_last_full_page_ends_with_empty_page(client):
+    pages = _walk(client, 5)
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 5, 0]
+    assert sorted(n for page in pages for n in page) == list(range(TOTAL))
+
+
+def test_status_filter_keeps_cursor_continuity(client):
+    pages = _walk(client, 3, status="valid")
+    assert [n for page in pages for n in page] == [i for i in range(TOTAL - 1, -1, -1) if i % 3 == 0]
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"provider": "p2"}, lambda i: i % 2 == 1),
+    ({"min_score": 80}, lambda i: 4 * i >= 80),
+    # Vencedor p2 (50) nos ímpares abaixo de 13: o filtro usa o best_score
+    ({"min_score": 50}, lambda i: 4 * i >= 50 or i % 2 == 1),
+    ({"provider": "p1", "min_score": 80}, lambda i: 4 * i >= 80),
+    ({"provider": "p2", "min_score": 60}, lambda i: False),
+    ({"min_score": 20, "max_score": 30}, lambda i: 20 <= 4 * i <= 30),
+    ({"cep": "01002000"}, lambda i: i % 5 == 2),
+    ({"status": "invalid", "provider": "p2"}, lambda i: i % 3 != 0 and i % 2 == 1),
+])
+def test_filters(client, params, expected):
+    pages = _walk(client, 4, **params)
+    assert [n for page in pages for n in page] == [i for i in range(TOTAL - 1, -1, -1) if expected(i)]
+
+
+def test_full_view_includes_results(client):
+    response = client.get("/api/addresses", params={"limit": 2})
+    first, second = response.json()
+    assert first["raw_address"] == "Rua 24" and first["best_score"] == 96.0
+    assert [r["provider_name"] for r in first["results"]] == ["p1"]
+    assert second["winner_provider"] == "p1" and len(second["results"]) == 2
+    assert response.headers["X-Next-Cursor"] == str(second["id"])
+
+
+def test_full_view_uses_stored_winner(client):
+    db = client.app.dependency_overrides[get_db]()
+    # Colunas desnormalizadas são a fonte do vencedor; os resultados não são reagregados
+    db.execute(update(Address).where(Address.raw_address == "Rua 24").values(winner_provider="p9", best_score=1.0))
+    db.commit()
+    first = client.get("/api/addresses", params={"limit": 1}).json()[0]
+    assert (first["winner_provider"], first["best_score"]) == ("p9", 1.0)
+    single = client.get(f"/api/addresses/{first['id']}").json()
+    assert (single["winner_provider"], single["best_score"]) == ("p9", 1.0)
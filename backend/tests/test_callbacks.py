@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Address, UploadJob, UploadJobRow
+from app.services import callbacks
+from app.services.callbacks import InvalidCallbackUrl, check_callback_url, deliver_job_callback
+from app.services.jobs import create_job
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    """Stand-in do receptor do n8n: guarda os POSTs e recusa as primeiras ``fail_first`` tentativas."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.attempts += 1
+            failed = server.attempts <= server.fail_first
+            if not failed:
+                server.received.append((self.headers["Idempotency-Key"], body))
+        self.send_response(503 if failed else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def receiver():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Receiver)
+    server.lock = threading.Lock()
+    server.attempts = 0
+    server.fail_first = 0
+    server.received = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(callbacks, "RETRY_BASE_DELAY", 0.001)
+    # O receptor de teste escuta em loopback, recusado sem a lista de hosts liberados
+    monkeypatch.setattr(callbacks, "WEBHOOK_CALLBACK_ALLOWED_HOSTS", ["127.0.0.1"])
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _completed_job(db, url, raws):
+    job = create_job(db, "webhook", None, raws, idempotency_key="n8n-1", callback_url=url)
+    rows = db.query(UploadJobRow).filter_by(job_id=job.id).order_by(UploadJobRow.seq).all()
+    for row in rows:
+        addr = Address(raw_address=row.raw_address, normalized_address=row.raw_address.lower(), status="valid")
+        db.add(addr)
+        db.flush()
+        row.address_id = addr.id
+    db.execute(update(UploadJob).where(UploadJob.id == job.id).values(status="completed", processed_rows=len(rows)))
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def test_results_are_posted_in_parts_with_idempotency_keys(db, receiver):
+    url = f"http://127.0.0.1:{receiver.server_port}/hook"
+    job = _completed_job(db, url, [f"Rua {i}, {i}" for i in range(5)])
+    receiver.fail_first = 1  # a primeira tentativa recebe 503 e é repetida
+
+    assert asyncio.run(deliver_job_callback(db, job, batch_size=2)) is True
+
+    assert [key for key, _ in receiver.received] == ["n8n-1:1", "n8n-1:2", "n8n-1:3"]
+    bodies = [body for _, body in receiver.received]
+    assert [b["part"] for b in bodies] == [1, 2, 3]
+    assert all(b["parts"] == 3 and b["batch_id"] == job.id for b in bodies)
+    assert [r["raw_address"] for b in bodies for r in b["results"]] == [f"Rua {i}, {i}" for i in range(5)]
+    assert job.callback_status == "delivered"
+
+
+def test_failed_delivery_is_recorded(db, receiver, monkeypatch):
+    monkeypatch.setattr(callbacks, "WEBHOOK_CALLBACK_RETRIES", 1)
+    url = f"http://127.0.0.1:{receiver.server_port}/hook"
+    job = _completed_job(db, url, ["Rua A, 1"])
+    receiver.fail_first = 10
+
+    assert asyncio.run(deliver_job_callback(db, job)) is False
+
+    assert receiver.attempts == 2
+    assert job.callback_status == "failed"
+    assert "HTTP 503" in job.last_error
+
+
+def test_idempotency_key_is_unique(db):
+    from sqlalchemy.exc import IntegrityError
+
+    create_job(db, "webhook", None, ["Rua A, 1"], idempotency_key="n8n-1")
+    with pytest.raises(IntegrityError):
+        create_job(db, "webhook", None, ["Rua A, 1"], idempotency_key="n8n-1")
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://example.com/hook",
+    "http:///hook",
+    "http://localhost:8000/hook",
+    "http://127.0.0.1/hook",
+    "http://[::1]/hook",
+    "http://[::ffff:10.0.0.5]/hook",
+    "http://10.0.0.5/hook",
+    "http://192.168.0.10/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://0.0.0.0/hook",
+    "http://nao-existe.invalid/hook",
+])
+def test_internal_callback_urls_are_rejected(url):
+    with pytest.raises(InvalidCallbackUrl):
+        asyncio.run(check_callback_url(url))
+
+
+def test_public_and_allowed_callback_urls_are_accepted(monkeypatch):
+    asyncio.run(check_callback_url("https://8.8.8.8/hook"))
+    monkeypatch.setattr(callbacks, "WEBHOOK_CALLBACK_ALLOWED_HOSTS", ["n8n"])
+    asyncio.run(check_callback_url("http://n8n:5678/webhook/geomatch"))
+
+
+def test_delivery_to_internal_address_is_refused(db, receiver, monkeypatch):
+    monkeypatch.setattr(callbacks, "WEBHOOK_CALLBACK_ALLOWED_HOSTS", [])
+    job = _completed_job(db, f"http://127.0.0.1:{receiver.server_port}/hook", ["Rua A, 1"])
+
+    assert asyncio.run(deliver_job_callback(db, job)) is False
+
+    assert receiver.attempts == 0
+    assert job.callback_status == "failed"
+    assert "endereço interno" in job.last_error
+
+
+def test_webhook_rejects_internal_callback_url(db):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.database import get_db
+    from app.routers import webhook
+
+    app = FastAPI()
+    app.include_router(webhook.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: db
+    response = TestClient(app).post(
+        "/api/webhook/process",
+        json={"addresses": ["Rua A, 1"], "callback_url": "http://169.254.169.254/latest/meta-data"},
+    )
+    assert response.status_code == 400
+    assert "endereço interno" in response.json()["detail"]
+    assert db.query(UploadJob).count() == 0
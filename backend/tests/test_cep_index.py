@@ -0,0 +1,75 @@
+"""
+Testes unitários para o índice offline de CEPs
+"""
+import pytest
+
+from app.providers.cep_index import CepIndex, compile_cep_index
+from app.providers.offline_cep_provider import OfflineCepProvider
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    src = tmp_path / "ceps.csv"
+    src.write_text(
+        "cep,logradouro,bairro,localidade,uf,ibge,ddd\n"
+        "80020-310,Rua XV de Novembro,Centro,Curitiba,PR,4106902,41\n"
+        "01310-100,Avenida Paulista,Bela Vista,São Paulo,SP,3550308,11\n"
+        "22250-040,Praia de Botafogo,Botafogo,Rio de Janeiro,RJ,3304557,21\n"
+        "invalido,Rua X,,,,,\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "cep_index.bin"
+    assert compile_cep_index(str(src), str(out)) == 3
+    return str(out)
+
+
+class TestCepIndex:
+    """Testes do índice binário"""
+
+    def test_lookup_all_positions(self, index_path):
+        """Testa busca no início, meio e fim do índice"""
+        index = CepIndex(index_path)
+        assert len(index) == 3
+        assert index.get("01310100")["logradouro"] == "Avenida Paulista"
+        assert index.get("22250-040")["localidade"] == "Rio de Janeiro"
+        assert index.get("80020310")["uf"] == "PR"
+
+    def test_lookup_missing(self, index_path):
+        """Testa CEPs inexistentes ou malformados"""
+        index = CepIndex(index_path)
+        assert index.get("00000000") is None
+        assert index.get("99999999") is None
+        assert index.get("123") is None
+
+    def test_invalid_file(self, tmp_path):
+        """Testa arquivo com formato desconhecido"""
+        path = tmp_path / "x.bin"
+        path.write_bytes(b"0" * 32)
+        with pytest.raises(ValueError):
+            CepIndex(str(path))
+
+
+class TestOfflineCepProvider:
+    """Testes do provider offline"""
+
+    def test_validate(self, index_path):
+        """Testa validação com CEP presente na base"""
+        r = OfflineCepProvider(index_path).validate("Av. Paulista, 1000, São Paulo - SP, 01310-100")
+        assert r["matched_address"] == "Avenida Paulista, Bela Vista, São Paulo, SP"
+        assert r["metadata"]["cep"] == "01310100"
+        assert r["metadata"]["ibge"] == "3550308"
+        assert r["metadata"]["source"] == "offline_cep"
+
+    def test_unknown_cep(self, index_path):
+        """Testa CEP ausente da base"""
+        with pytest.raises(ValueError):
+            OfflineCepProvider(index_path).validate("Rua A, 1, 99999-999")
+
+    def test_validate_many(self, index_path):
+        """Testa validação em lote: mesma saída da versão unitária, falhas como exceção"""
+        provider = OfflineCepProvider(index_path)
+        addresses = ["Rua XV de Novembro, Curitiba 80020-310", "Rua A, 1, 99999-999", "Sem CEP"]
+        results = provider.validate_many(addresses)
+        assert results[0] == provider.validate(addresses[0])
+        assert isinstance(results[1], ValueError)
+        assert isinstance(results[2], ValueError)
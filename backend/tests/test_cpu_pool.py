@@ -0,0 +1,55 @@
+"""
+Testes unitários para o pool de processos das etapas de CPU
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.services import cpu_pool
+from app.services.cpu_pool import prepare_keys, prepare_keys_async, score_batch, score_batch_async
+
+ADDRESSES = [f"Rua São João, {i}, São Paulo - SP, 01001-{i:03d}" for i in range(100)] + ["Avenida Paulista 1000"]
+MATCHED = [f"Rua Sao Joao {i}" for i in range(100)] + ["Av Paulista"]
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    executor = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+    monkeypatch.setattr(cpu_pool, "_pool", executor)
+    monkeypatch.setattr(cpu_pool, "PIPELINE_MIN_BATCH", 10)
+    yield executor
+    executor.shutdown()
+
+
+def test_prepare_keys():
+    keys = prepare_keys(["Rua A, 01001-000", "Rua B"])
+    assert keys == [("rua a 01001000", "01001000"), ("rua b", None)]
+
+
+def test_pool_matches_inline(pool):
+    keys = asyncio.run(prepare_keys_async(ADDRESSES))
+    assert keys == prepare_keys(ADDRESSES)
+
+    norms = [k[0] for k in keys]
+    ceps = [k[1] for k in keys]
+    provider_ceps = ["01001000"] * len(keys)
+    scores = asyncio.run(score_batch_async(norms, MATCHED, ceps, provider_ceps))
+    assert scores == score_batch(norms, MATCHED, ceps, provider_ceps)
+
+
+def test_small_batches_stay_inline(pool, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("lote pequeno não deveria ir para o pool")
+
+    monkeypatch.setattr(pool, "submit", fail)
+    assert asyncio.run(prepare_keys_async(ADDRESSES[:3])) == prepare_keys(ADDRESSES[:3])
+
+
+def test_disabled_pool(monkeypatch):
+    monkeypatch.setattr(cpu_pool, "_pool", None)
+    monkeypatch.setattr(cpu_pool, "PIPELINE_WORKERS", 0)
+    assert cpu_pool.pool_size(0) == 0
+    assert cpu_pool.get_cpu_pool() is None
+    assert asyncio.run(prepare_keys_async(ADDRESSES)) == prepare_keys(ADDRESSES)
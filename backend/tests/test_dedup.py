@@ -0,0 +1,74 @@
+"""
+Testes unitários para a deduplicação de uploads
+"""
+from app.services.dedup import UploadDeduplicator, dedup_keys
+
+
+class TestDedupKeys:
+    """Testes para a chave de deduplicação"""
+
+    def test_same_address_different_formatting(self):
+        keys = dedup_keys(["Rua São João, 10", "rua sao joao 10", "RUA SÃO JOÃO - 10"])
+        assert len(set(keys)) == 1
+
+    def test_cep_is_part_of_key(self):
+        keys = dedup_keys(["Rua A, 01001-000", "Rua A, 01001000", "Rua A"])
+        assert keys[0] == keys[1] == ("rua a 01001000", "01001000")
+        assert keys[2] == ("rua a", None)
+
+
+class TestUploadDeduplicator:
+    """Testes do acompanhamento de endereços únicos (sem reaproveitamento do banco)"""
+
+    def test_split_and_remember(self):
+        dedup = UploadDeduplicator(db=None, reuse_seconds=0)
+        keys, pending, reused = dedup.split(["Rua A, 1", "rua a 1", "Rua B"])
+        assert pending == ["Rua A, 1", "Rua B"]
+        assert reused == []
+        dedup.remember([
+            {"address": {"id": 1, "normalized_address": "rua a 1", "cep": None}},
+            {"address": {"id": 2, "normalized_address": "rua b", "cep": None}},
+        ])
+        assert [dedup.known[k] for k in keys] == [1, 1, 2]
+
+        # Chunk seguinte: só o endereço novo precisa ser validado
+        _, pending, _ = dedup.split(["RUA B", "Rua C"])
+        assert pending == ["Rua C"]
+        assert dedup.rows == 5
+        assert dedup.processed == 3
+        assert dedup.dedup_ratio == 0.4
+
+    def test_max_keys_keeps_recently_used(self):
+        dedup = UploadDeduplicator(db=None, reuse_seconds=0, max_keys=2)
+        dedup.known = {("rua a", None): 1, ("rua b", None): 2}
+        # "Rua A" volta a ser a mais recente; "rua b" é descartada para abrir espaço
+        dedup.split(["Rua A"])
+        dedup.remember([{"address": {"id": 3, "normalized_address": "rua c", "cep": None}}])
+        _, pending, _ = dedup.split(["Rua C", "Rua D"])
+        assert pending == ["Rua D"]
+        assert list(dedup.known) == [("rua a", None), ("rua c", None)]
+
+
+def test_process_addresses_with_shared_dedup():
+    # Duplicatas resolvidas numa chamada anterior (mesmo dedup) são lidas do banco
+    import asyncio
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.database import Base
+    from app.services.processing import process_addresses
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        dedup = UploadDeduplicator(db, reuse_seconds=0)
+        first = asyncio.run(process_addresses(["Rua A, 1", "Rua B, 2"], db, dedup=dedup))
+        second = asyncio.run(process_addresses(["rua a 1", "Rua C, 3"], db, dedup=dedup))
+    finally:
+        db.close()
+    assert second[0].id == first[0].id
+    assert second[0].results == first[0].results
+    assert dedup.processed == 3
@@ -0,0 +1,109 @@
+"""
+Testes das exportações em streaming (CSV e dump SQL) com vários lotes de leitura
+"""
+import csv
+import io
+import sqlite3
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Address
+from app.routers import export
+from app.services.persistence import AddressBatchWriter
+
+TOTAL = 23
+BATCH = 5
+
+
+def _result(provider, score):
+    return {"provider_name": provider, "matched_address": "x", "cep": None, "score": score, "extra_metadata": None}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    writer = AddressBatchWriter(db, chunk_size=10)
+    for i in range(TOTAL):
+        writer.add(
+            {"raw_address": f"Rua {i}", "normalized_address": f"rua {i}", "cep": None,
+             "status": "valid" if i % 2 == 0 else "invalid"},
+            [_result("p1", float(i)), _result("p2", 100.0 - i)],
+        )
+    writer.flush()
+    # Os 10 primeiros endereços são de janeiro; os demais, de junho
+    db.execute(update(Address).where(Address.id <= 10).values(created_at=datetime(2024, 1, 15)))
+    db.execute(update(Address).where(Address.id > 10).values(created_at=datetime(2024, 6, 15)))
+    db.commit()
+    db.close()
+
+    # Lotes menores que a tabela: a leitura é feita em várias partições do cursor
+    monkeypatch.setattr(export, "EXPORT_BATCH_ROWS", BATCH)
+    monkeypatch.setattr(export, "SessionLocal", factory)
+    app = FastAPI()
+    app.include_router(export.router, prefix="/api")
+    return TestClient(app)
+
+
+def _csv_rows(client, **params):
+    response = client.get("/api/export/csv", params=params)
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "raw_address", "normalized_address", "status", "provider", "matched_address", "score"]
+    return rows[1:]
+
+
+def test_csv_streams_every_row_across_batches(client):
+    chunks = list(export._csv_chunks(None, None, None, None, None))
+    # Cabeçalho no primeiro lote, depois um pedaço por lote de EXPORT_BATCH_ROWS linhas
+    assert len(chunks) == -(-TOTAL * 2 // BATCH)
+    rows = _csv_rows(client)
+    assert len(rows) == TOTAL * 2
+    assert [(int(r[0]), r[4]) for r in rows] == [(i, p) for i in range(1, TOTAL + 1) for p in ("p1", "p2")]
+    assert rows[0][1:4] == ["Rua 0", "rua 0", "valid"] and float(rows[-1][6]) == 100.0 - (TOTAL - 1)
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"status": "invalid"}, lambda i, p, s: i % 2 == 1),
+    ({"provider": "p2"}, lambda i, p, s: p == "p2"),
+    ({"min_score": 90}, lambda i, p, s: s >= 90),
+    ({"provider": "p1", "min_score": 15}, lambda i, p, s: p == "p1" and s >= 15),
+    ({"date_from": "2024-06-01T00:00:00"}, lambda i, p, s: i >= 10),
+    ({"date_to": "2024-02-01T00:00:00", "status": "valid"}, lambda i, p, s: i < 10 and i % 2 == 0),
+])
+def test_csv_filters(client, params, expected):
+    rows = _csv_rows(client, **params)
+    every = [(i, p, s) for i in range(TOTAL) for p, s in (("p1", float(i)), ("p2", 100.0 - i))]
+    assert [(r[1], r[4], float(r[6])) for r in rows] == [(f"Rua {i}", p, s) for i, p, s in every if expected(i, p, s)]
+
+
+def test_sql_dump_streams_every_row_across_batches(client):
+    response = client.get("/api/export/sql", params={"dialect": "sqlite", "status": "valid"})
+    assert response.status_code == 200
+    # Uma transação por lote lido: 12 endereços e 24 resultados em lotes de 5
+    assert response.text.count("BEGIN TRANSACTION;") == 3 + 5
+
+    con = sqlite3.connect(":memory:")
+    con.executescript(
+        "CREATE TABLE addresses "
+        "(id, raw_address, normalized_address, cep, status, best_score, winner_provider, created_at);"
+        "CREATE TABLE provider_results (address_id, provider_name, matched_address, cep, score, created_at);"
+        + response.text
+    )
+    valid = [i for i in range(TOTAL) if i % 2 == 0]
+    rows = con.execute("SELECT raw_address, status FROM addresses ORDER BY id").fetchall()
+    assert rows == [(f"Rua {i}", "valid") for i in valid]
+    assert con.execute("SELECT COUNT(*) FROM provider_results").fetchone()[0] == 2 * len(valid)
+
+
+def test_sql_dump_rejects_unknown_dialect(client):
+    assert client.get("/api/export/sql", params={"dialect": "oracle"}).status_code == 400
@@ -0,0 +1,240 @@
+"""
+Testes dos jobs de upload em segundo plano (criação, processamento, retomada e posse)
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Address, AuditLog, UploadJob, UploadJobRow
+from app.services import jobs
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(jobs, "SessionLocal", factory)
+    return factory
+
+
+def _create(factory, addresses):
+    db = factory()
+    try:
+        return jobs.create_job(db, "csv", "enderecos.csv", addresses).id
+    finally:
+        db.close()
+
+
+def _job(factory, job_id):
+    db = factory()
+    try:
+        return db.get(UploadJob, job_id)
+    finally:
+        db.close()
+
+
+ADDRESSES = [f"Rua {i}, {i}" for i in range(12)]
+
+
+def test_create_job_stores_rows_in_order(session_factory):
+    job_id = _create(session_factory, ADDRESSES)
+    job = _job(session_factory, job_id)
+    assert job.status == "queued" and job.total_rows == 12 and job.owner is None
+    db = session_factory()
+    rows = db.execute(select(UploadJobRow.seq, UploadJobRow.raw_address).order_by(UploadJobRow.seq)).all()
+    assert rows == list(enumerate(ADDRESSES))
+    db.close()
+
+
+def test_run_job_processes_every_row_once(session_factory):
+    job_id = _create(session_factory, ADDRESSES)
+    assert asyncio.run(jobs.run_job(job_id, chunk_size=5)) is True
+
+    job = _job(session_factory, job_id)
+    assert job.status == "completed" and job.processed_rows == 12
+    # A posse é liberada ao terminar
+    assert job.owner is None and job.lease_until is None
+    db = session_factory()
+    assert db.scalar(select(UploadJobRow.id).where(UploadJobRow.address_id.is_(None))) is None
+    assert db.query(Address).count() == 12
+    assert db.query(AuditLog).filter(AuditLog.event == "upload_csv").count() == 1
+    db.close()
+    # Job concluído: nova execução não tem o que fazer
+    assert asyncio.run(jobs.run_job(job_id)) is False
+
+
+def test_concurrent_runs_process_job_once(session_factory):
+    job_id = _create(session_factory, ADDRESSES)
+
+    async def both():
+        return await asyncio.gather(jobs.run_job(job_id, chunk_size=3), jobs.run_job(job_id, chunk_size=3))
+
+    assert sorted(asyncio.run(both())) == [False, True]
+    job = _job(session_factory, job_id)
+    assert job.status == "completed" and job.processed_rows == job.total_rows == 12
+    db = session_factory()
+    assert db.query(Address).count() == 12
+    db.close()
+
+
+def test_claim_respects_valid_lease(session_factory):
+    job_id = _create(session_factory, ADDRESSES)
+    db = session_factory()
+    assert jobs.claim_job(db, job_id, "worker-a")
+    assert not jobs.claim_job(db, job_id, "worker-b")
+    assert jobs.claimable_jobs(db) == []
+    # Posse vencida (worker caiu): outro worker pode assumir
+    db.query(UploadJob).update({"lease_until": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert jobs.claimable_jobs(db) == [job_id]
+    assert jobs.claim_job(db, job_id, "worker-b")
+    assert _job(session_factory, job_id).owner == "worker-b"
+    db.close()
+
+
+def test_resume_continues_from_last_committed_chunk(session_factory, monkeypatch):
+    job_id = _create(session_factory, ADDRESSES)
+    original = jobs.JobSink.before_commit
+    calls = []
+
+    def stop_on_third_chunk(self, chunk, address_ids, logs):
+        calls.append(len(chunk))
+        if len(calls) == 3:
+            raise KeyboardInterrupt  # simula o desligamento no meio do job
+        original(self, chunk, address_ids, logs)
+
+    monkeypatch.setattr(jobs.JobSink, "before_commit", stop_on_third_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(jobs.run_job(job_id, chunk_size=4))
+    monkeypatch.setattr(jobs.JobSink, "before_commit", original)
+
+    job = _job(session_factory, job_id)
+    # Interrompido com a posse liberada: pode ser retomado na hora
+    assert job.status == "running" and job.processed_rows == 8 and job.owner is None
+    assert asyncio.run(jobs.run_job(job_id, chunk_size=4)) is True
+    job = _job(session_factory, job_id)
+    assert job.status == "completed" and job.processed_rows == 12
+    db = session_factory()
+    assert db.query(Address).count() == 12
+    db.close()
+
+
+def test_resume_keeps_deduplicating_against_committed_chunks(session_factory, monkeypatch):
+    addresses = ["Rua A, 1", "Rua B, 2", "rua a 1", "Rua B, 2", "Rua C, 3"]
+    job_id = _create(session_factory, addresses)
+    original = jobs.JobSink.before_commit
+    calls = []
+
+    def stop_on_second_chunk(self, chunk, address_ids, logs):
+        calls.append(len(chunk))
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        original(self, chunk, address_ids, logs)
+
+    monkeypatch.setattr(jobs.JobSink, "before_commit", stop_on_second_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(jobs.run_job(job_id, chunk_size=2))
+    monkeypatch.setattr(jobs.JobSink, "before_commit", original)
+    asyncio.run(jobs.run_job(job_id, chunk_size=2))
+
+    db = session_factory()
+    # Mesmo resultado de uma execução sem interrupção: três endereços únicos
+    assert db.query(Address).count() == 3
+    ids = db.scalars(select(UploadJobRow.address_id).order_by(UploadJobRow.seq)).all()
+    assert ids[2] == ids[0] and ids[3] == ids[1] and len(set(ids)) == 3
+    db.close()
+
+
+def test_lost_lease_rolls_back_chunk(session_factory, monkeypatch):
+    job_id = _create(session_factory, ADDRESSES)
+    original = jobs.Pipeline
+
+    def pipeline_after_takeover(db, chunk_size):
+        # Outro worker assume o job depois que este começou a processá-lo
+        db.query(UploadJob).update({"owner": "outro"})
+        db.commit()
+        return original(db, chunk_size)
+
+    monkeypatch.setattr(jobs, "Pipeline", pipeline_after_takeover)
+    asyncio.run(jobs.run_job(job_id, chunk_size=4))
+
+    job = _job(session_factory, job_id)
+    assert job.status == "running" and job.processed_rows == 0 and job.owner == "outro"
+    db = session_factory()
+    assert db.query(Address).count() == 0
+    db.close()
+
+
+def test_pool_start_skips_jobs_held_by_other_workers(session_factory):
+    held = _create(session_factory, ADDRESSES[:2])
+    queued = _create(session_factory, ADDRESSES[2:4])
+    db = session_factory()
+    jobs.claim_job(db, held, "outro")
+    db.query(UploadJob).filter(UploadJob.id == held).update({"status": "running"})
+    db.commit()
+    db.close()
+
+    async def run_pool():
+        pool = jobs.JobWorkerPool(workers=1, recover_interval=3600)
+        await pool.start()
+        await pool.join()
+        await pool.stop()
+
+    asyncio.run(run_pool())
+    assert _job(session_factory, queued).status == "completed"
+    assert _job(session_factory, held).status == "running"
+
+
+def test_worker_survives_failing_job(session_factory, monkeypatch):
+    first = _create(session_factory, ADDRESSES[:2])
+    second = _create(session_factory, ADDRESSES[2:4])
+    original = jobs.run_job
+
+    async def flaky(job_id, chunk_size=None):
+        if job_id == first:
+            raise RuntimeError("database is locked")
+        return await original(job_id, chunk_size)
+
+    monkeypatch.setattr(jobs, "run_job", flaky)
+
+    async def run_pool():
+        pool = jobs.JobWorkerPool(workers=1, recover_interval=3600)
+        pool.submit(first)
+        pool.submit(second)
+        await pool.join()
+        await pool.stop()
+
+    asyncio.run(run_pool())
+    assert _job(session_factory, first).status == "queued"
+    assert _job(session_factory, second).status == "completed"
+
+
+def test_pool_runs_jobs_off_the_callers_event_loop(session_factory, monkeypatch):
+    import threading
+
+    job_id = _create(session_factory, ADDRESSES[:2])
+    threads = []
+    original = jobs.run_job
+
+    async def recording(job_id, chunk_size=None):
+        threads.append(threading.current_thread())
+        return await original(job_id, chunk_size)
+
+    monkeypatch.setattr(jobs, "run_job", recording)
+
+    async def run_pool():
+        pool = jobs.JobWorkerPool(workers=1, recover_interval=3600)
+        pool.submit(job_id)
+        await pool.join()
+        await pool.stop()
+
+    asyncio.run(run_pool())
+    # Os commits dos chunks não rodam no loop (nem na thread) de quem enfileirou o job
+    assert threads and threads[0] is not threading.current_thread()
+    assert _job(session_factory, job_id).status == "completed"
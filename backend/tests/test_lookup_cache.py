@@ -0,0 +1,137 @@
+"""
+Testes unitários para o cache de consultas dos provedores
+"""
+import asyncio
+
+from app.providers.lookup_cache import LookupCache, NEGATIVE
+
+
+class TestLookupCache:
+    """Testes do cache em dois níveis"""
+
+    def test_lru_eviction(self):
+        """Testa que a entrada menos usada é despejada da memória"""
+        cache = LookupCache("t", path=None, max_entries=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        assert cache.get("a") == {"v": 1}
+        cache.set("c", {"v": 3})
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+
+    def test_ttl_expiry(self):
+        """Testa que entradas expiradas não são retornadas"""
+        cache = LookupCache("t", path=None, ttl=-1)
+        cache.set("a", {"v": 1})
+        assert cache.get("a") is None
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Testa que o nível em disco é lido por outra instância"""
+        path = str(tmp_path / "cache.db")
+        LookupCache("t", path=path).set("01310100", {"uf": "SP"})
+        cache = LookupCache("t", path=path)
+        assert cache.get("01310100") == {"uf": "SP"}
+        assert cache.hits_disk == 1
+        assert cache.get("01310100") == {"uf": "SP"}
+        assert cache.hits_memory == 1
+
+    def test_negative_caching(self, tmp_path):
+        """Testa que respostas negativas são guardadas e reconhecidas"""
+        path = str(tmp_path / "cache.db")
+        cache = LookupCache("t", path=path)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return {"erro": True}
+
+        async def run():
+            first = await cache.get_or_fetch("99999999", fetch, is_negative=lambda d: d.get("erro"))
+            second = await cache.get_or_fetch("99999999", fetch, is_negative=lambda d: d.get("erro"))
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is NEGATIVE and second is NEGATIVE
+        assert len(calls) == 1
+        cache.flush()
+        assert LookupCache("t", path=path).get("99999999") is NEGATIVE
+
+    def test_concurrent_misses_share_fetch(self):
+        """Testa que buscas simultâneas da mesma chave fazem uma única consulta"""
+        cache = LookupCache("t", path=None)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"uf": "SP"}
+
+        async def run():
+            return await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(10)))
+
+        assert asyncio.run(run()) == [{"uf": "SP"}] * 10
+        assert len(calls) == 1
+
+    def test_miss_in_flight_on_another_loop(self):
+        """Testa que uma busca em andamento em outro event loop (thread) não é aguardada daqui"""
+        import threading
+
+        cache = LookupCache("t", path=None)
+        started, release = threading.Event(), threading.Event()
+
+        async def slow_fetch():
+            started.set()
+            await asyncio.to_thread(release.wait)
+            return {"uf": "SP"}
+
+        other = threading.Thread(target=lambda: asyncio.run(cache.get_or_fetch("k", slow_fetch)))
+        other.start()
+        started.wait()
+
+        async def fetch():
+            return {"uf": "RJ"}
+
+        try:
+            assert asyncio.run(cache.get_or_fetch("k", fetch)) == {"uf": "RJ"}
+        finally:
+            release.set()
+            other.join()
+
+    def test_async_misses_are_written_to_disk_in_batches(self, tmp_path):
+        """Testa que o caminho assíncrono lê o disco fora do loop e grava em lote"""
+        import threading
+
+        path = str(tmp_path / "cache.db")
+        cache = LookupCache("t", path=path, flush_rows=3, flush_seconds=3600)
+        disk_threads = []
+        read_disk = cache._get_disk
+
+        def spy(key, now):
+            disk_threads.append(threading.current_thread())
+            return read_disk(key, now)
+
+        cache._get_disk = spy
+
+        async def fetch():
+            return {"uf": "SP"}
+
+        async def run(keys):
+            for key in keys:
+                await cache.get_or_fetch(key, fetch)
+
+        asyncio.run(run(["a", "b"]))
+        assert disk_threads and all(t is not threading.main_thread() for t in disk_threads)
+        # Ainda na fila: nada gravado em disco
+        assert LookupCache("t", path=path).get("a") is None
+        asyncio.run(run(["c"]))
+        other = LookupCache("t", path=path)
+        assert [other.get(k) for k in "abc"] == [{"uf": "SP"}] * 3
+
+    def test_prewarm_from_csv(self, tmp_path):
+        """Testa pré-aquecimento a partir de CSV"""
+        path = tmp_path / "ceps.csv"
+        path.write_text("cep,logradouro,uf,erro\n01310-100,Avenida Paulista,SP,\n99999-999,,,true\n", encoding="utf-8")
+        cache = LookupCache("t", path=None)
+        assert cache.prewarm_from_file(str(path), key_func=lambda c: c.replace("-", "")) == 2
+        assert cache.get("01310100")["logradouro"] == "Avenida Paulista"
+        assert cache.get("99999999") is NEGATIVE
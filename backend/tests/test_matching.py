@@ -7,7 +7,11 @@ from app.services.matching import (
     similarity_score,
     similarity_score_with_cep,
     classify_score,
-    calculate_match_score
+    calculate_match_score,
+    batch_similarity_scores,
+    batch_similarity_scores_with_cep,
+    classify_scores,
+    similarity_matrix,
 )
 
 
@@ -264,5 +268,40 @@ class TestSimilarityScoreWithCep:
         assert high_boost <= 100.0
 
 
+class TestBatchScoring:
+    """Testes para o score em lote (deve ser idêntico à versão escalar)"""
+
+    INPUTS = ["rua a 123", "Av Paulista 1000", "", "praca da se", "rua jose silva 100"]
+    CANDIDATES = ["rua a 123", "avenida paulista 1000", "rua b", "Praça da Sé", "r jose silva 100"]
+    CEPS_A = ["01310100", None, "01001000", "01001-000", "01310100"]
+    CEPS_B = ["01310100", "01310100", "01001000", "01001000", "80020310"]
+
+    def test_matches_scalar_version(self):
+        scores = batch_similarity_scores(self.INPUTS, self.CANDIDATES, workers=1)
+        assert scores.tolist() == [similarity_score(a, b) for a, b in zip(self.INPUTS, self.CANDIDATES)]
+
+    def test_cep_boost_matches_scalar_version(self):
+        scores = batch_similarity_scores_with_cep(self.INPUTS, self.CANDIDATES, self.CEPS_A, self.CEPS_B)
+        expected = [
+            similarity_score_with_cep(a, b, ca, cb)
+            for a, b, ca, cb in zip(self.INPUTS, self.CANDIDATES, self.CEPS_A, self.CEPS_B)
+        ]
+        assert scores.tolist() == expected
+
+    def test_empty_and_mismatched_inputs(self):
+        assert batch_similarity_scores([], []).shape == (0,)
+        with pytest.raises(ValueError):
+            batch_similarity_scores(["a"], [])
+
+    def test_similarity_matrix(self):
+        matrix = similarity_matrix(["rua a", "rua b"], ["rua b", "rua a", "x"])
+        assert matrix.shape == (2, 3)
+        assert matrix[0, 1] == matrix[1, 0] == 100.0
+
+    def test_classify_scores_matches_scalar_version(self):
+        scores = [0, 49.9, 50, 69.99, 70, 79.9, 80, 89.9, 90, 100]
+        assert classify_scores(scores).tolist() == [classify_score(s) for s in scores]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,45 @@
+"""
+Testes de equivalência do motor de normalização com a implementação anterior
+"""
+import random
+
+from app.services.matching import normalize_address, normalize_many, _normalize, _normalize_cached
+from tests.bench_normalize import generate_addresses, legacy_normalize_address
+
+
+class TestNormalizeEquivalence:
+    """A normalização otimizada deve produzir exatamente o mesmo texto"""
+
+    def test_realistic_addresses(self):
+        for address in generate_addresses(2000, ascii_ratio=0.5):
+            assert _normalize(address) == legacy_normalize_address(address)
+
+    def test_edge_cases(self):
+        cases = [
+            "", "   ", "-", "01310-100", "Rua-Nova--1", "\tRua\x1fA\x0b 1\n", "ℌ rua ½ nº 3ª",
+            "İstanbul Straße", "ＡＶ. ＰＡＵＬＩＳＴＡ", "Rua 😀 Sol", "AV. BRASIL, 100",
+        ]
+        for address in cases:
+            assert _normalize(address) == legacy_normalize_address(address), address
+
+    def test_random_unicode(self):
+        rnd = random.Random(1234)
+        alphabet = "aAzZ09 -.,/º°ª\t\n\x1cçÇãÁéÊíõüñßŁøæ  ℌ½ﬁ"
+        for _ in range(3000):
+            text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 30)))
+            assert _normalize(text) == legacy_normalize_address(text), repr(text)
+
+
+class TestNormalizeApi:
+    """Testes para cache e API em lote"""
+
+    def test_normalize_many_keeps_order(self):
+        addresses = ["Rua São João, 10", "AV. PAULISTA", "Rua São João, 10"]
+        assert normalize_many(addresses) == [normalize_address(a) for a in addresses]
+
+    def test_cache_hits(self):
+        _normalize_cached.cache_clear()
+        normalize_address("Praça da Sé, 1")
+        normalize_address("Praça da Sé, 1")
+        info = _normalize_cached.cache_info()
+        assert info.hits == 1 and info.misses == 1
@@ -0,0 +1,98 @@
+"""
+Testes unitários para os parsers de arquivos de entrada
+"""
+import io
+from pathlib import Path
+
+import pytest
+
+from app.services.parser import (
+    ParseError,
+    iter_csv_addresses,
+    iter_sql_addresses,
+    parse_sql_addresses,
+    read_csv_addresses,
+)
+
+
+class TestCsvParser:
+    """Testes para leitura de CSV em streaming"""
+
+    def test_address_column_selected(self):
+        """Testa que apenas a coluna de endereço é lida"""
+        content = b'id,endereco,obs\n1,"Rua A, 10",x\n2,"Av. B, 20",y\n'
+        assert read_csv_addresses(content) == ["Rua A, 10", "Av. B, 20"]
+
+    def test_missing_column_raises_on_call(self):
+        """Testa que a coluna ausente gera erro antes de iterar"""
+        with pytest.raises(ValueError):
+            iter_csv_addresses(io.BytesIO(b"nome\nFulano\n"))
+
+    def test_unquoted_commas_in_last_column(self):
+        """Testa endereço sem aspas na última coluna"""
+        content = "address\nAvenida Paulista, 1000, São Paulo, SP\n".encode("utf-8")
+        assert read_csv_addresses(content) == ["Avenida Paulista, 1000, São Paulo, SP"]
+
+    def test_bom_and_blank_rows(self):
+        """Testa BOM UTF-8 e linhas vazias"""
+        content = "﻿address\nRua A 1\n\n\"\"\nRua B 2\n".encode("utf-8")
+        assert read_csv_addresses(content) == ["Rua A 1", "Rua B 2"]
+
+    def test_is_lazy(self):
+        """Testa que as linhas são produzidas sob demanda"""
+        f = io.BytesIO(b"address\n" + b"Rua A 1\n" * 100000)
+        rows = iter_csv_addresses(f)
+        assert next(rows) == "Rua A 1"
+        assert f.tell() < 100000 * 8
+
+
+class TestSqlParser:
+    """Testes para o parser de dumps SQL em streaming"""
+
+    DUMP = (
+        "CREATE TABLE `clientes` (\n"
+        "  `id` int NOT NULL,\n"
+        "  `nome` varchar(100) DEFAULT 'Loja 1',\n"
+        "  `endereco` varchar(255),\n"
+        "  PRIMARY KEY (`id`)\n"
+        ");\n"
+        "INSERT INTO `clientes` VALUES (1,'Loja 10','Rua D\\'Ávila, 10; fundos'),(2,'Loja 2',NULL),"
+        "(3, lower('a (b)'), 'Rua (Nova) 5');\n"
+        "COPY public.enderecos (id, address) FROM stdin;\n"
+        "1\tRua A 1\n"
+        "2\t\\N\n"
+        "\\.\n"
+        "INSERT INTO t (id, address) VALUES (1, 'It''s Rua B 2');\n"
+    )
+
+    def _parse(self, text, chunk_size=1 << 16):
+        return list(iter_sql_addresses(io.BytesIO(text.encode("utf-8")), chunk_size=chunk_size))
+
+    def test_example_file(self):
+        """Testa o arquivo de exemplo com lista de colunas"""
+        with open(Path(__file__).parent.parent / "examples" / "addresses.sql", encoding="utf-8") as f:
+            addresses = parse_sql_addresses(f.read())
+        assert addresses[0] == "Avenida Paulista, 1000, Bela Vista, São Paulo, SP"
+        assert len(addresses) == 3
+
+    def test_dump_formats(self):
+        """Testa INSERT multi-linha, colunas do CREATE TABLE, escapes e COPY"""
+        assert self._parse(self.DUMP) == [
+            "Rua D'Ávila, 10; fundos",
+            "Rua (Nova) 5",
+            "Rua A 1",
+            "It's Rua B 2",
+        ]
+
+    def test_small_chunks(self):
+        """Testa que tokens divididos entre blocos são reconstituídos"""
+        assert self._parse(self.DUMP, chunk_size=3) == self._parse(self.DUMP)
+
+    def test_loose_strings_fallback(self):
+        """Testa fallback para strings soltas sem INSERT"""
+        assert self._parse("'Rua A 1'\n'Rua B 2'\n'sem numero'\n") == ["Rua A 1", "Rua B 2"]
+
+    def test_no_addresses(self):
+        """Testa erro quando não há endereços"""
+        with pytest.raises(ParseError):
+            self._parse("SELECT 1;")
@@ -0,0 +1,87 @@
+"""
+Testes da gravação em lote (AddressBatchWriter)
+"""
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Address, AuditLog, ProviderResult
+from app.services.persistence import AddressBatchWriter
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _item(i, providers=("p1", "p2")):
+    address = {"raw_address": f"Rua {i}", "normalized_address": f"rua {i}", "cep": None, "status": "x"}
+    results = [
+        {"provider_name": p, "matched_address": f"rua {i} ({p})", "cep": None, "score": float(i), "extra_metadata": None}
+        for p in providers
+    ]
+    return address, results
+
+
+def test_ids_follow_input_order_and_results_are_linked(db):
+    writer = AddressBatchWriter(db, chunk_size=3)
+    records = []
+    for i in range(7):
+        records += writer.add(*_item(i))
+    records += writer.flush()
+
+    assert [r["address"]["raw_address"] for r in records] == [f"Rua {i}" for i in range(7)]
+    ids = [r["address"]["id"] for r in records]
+    stored = dict(db.execute(select(Address.id, Address.raw_address)).all())
+    assert [stored[i] for i in ids] == [f"Rua {i}" for i in range(7)]
+    # Cada resultado aponta para o endereço de que veio
+    for address_id, matched in db.execute(select(ProviderResult.address_id, ProviderResult.matched_address)):
+        assert matched.split(" (")[0] == stored[address_id].lower()
+    assert db.query(ProviderResult).count() == 14
+
+
+def test_full_chunks_flush_on_add(db):
+    writer = AddressBatchWriter(db, chunk_size=2)
+    assert writer.add(*_item(0)) == []
+    assert len(writer) == 1
+    flushed = writer.add(*_item(1))
+    assert [r["address"]["raw_address"] for r in flushed] == ["Rua 0", "Rua 1"]
+    assert len(writer) == 0
+
+
+def test_before_commit_runs_on_partial_final_chunk(db):
+    calls = []
+
+    def before_commit(records, logs):
+        calls.append(([r["address"]["id"] for r in records], [log["event"] for log in logs]))
+        # Dentro da transação: os endereços do chunk já estão visíveis
+        assert db.query(Address).count() == sum(len(ids) for ids, _ in calls)
+
+    writer = AddressBatchWriter(db, chunk_size=4, before_commit=before_commit)
+    for i in range(5):
+        writer.add(*_item(i, providers=()))
+    writer.log("provider_error", "p1: falhou")
+    writer.flush()
+    assert writer.flush() == []
+
+    assert [len(ids) for ids, _ in calls] == [4, 1]
+    assert calls[1][1] == ["provider_error"]
+    assert db.query(AuditLog).count() == 1
+
+
+def test_failed_hook_rolls_back_chunk(db):
+    def before_commit(records, logs):
+        raise RuntimeError("falha no destino")
+
+    writer = AddressBatchWriter(db, chunk_size=10, before_commit=before_commit)
+    writer.add(*_item(0))
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    assert db.query(Address).count() == 0
+    assert db.query(ProviderResult).count() == 0
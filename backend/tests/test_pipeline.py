@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.services.parser import ParseError, aiter_ndjson_addresses
+from app.services.pipeline import CountSink, ListSink, Pipeline, Sink, Source, json_source, ndjson_source
+
+
+async def _blocks(*blocks):
+    for b in blocks:
+        yield b
+
+
+async def _collect(source):
+    return [a async for a in source]
+
+
+class TestNdjson:
+    def test_lines_split_across_blocks(self):
+        body = _blocks(b'"Rua A, 1"\n{"addr', b'ess": "Rua B, 2"}\n\n', b'{"endereco": "Rua C, 3"}')
+        assert asyncio.run(_collect(aiter_ndjson_addresses(body))) == ["Rua A, 1", "Rua B, 2", "Rua C, 3"]
+
+    def test_invalid_line_reports_line_number(self):
+        with pytest.raises(ParseError, match="Linha 2"):
+            asyncio.run(_collect(aiter_ndjson_addresses(_blocks(b'"Rua A, 1"\n[1, 2]\n'))))
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+class _RecordingSink(Sink):
+    needs_results = False
+
+    def __init__(self):
+        self.committed = []
+
+    def before_commit(self, chunk, address_ids, logs):
+        self.committed.append((list(chunk), list(address_ids)))
+
+
+def test_sources_and_sinks_share_one_engine(db):
+    addrs = ["Rua A, 1", "Rua B, 2", "rua a 1", "Rua C, 3", "Rua B, 2"]
+    out = asyncio.run(Pipeline(db, chunk_size=2).run(json_source(addrs), ListSink()))
+    assert [o.raw_address for o in out] == ["Rua A, 1", "Rua B, 2", "Rua A, 1", "Rua C, 3", "Rua B, 2"]
+    assert out[2].id == out[0].id and out[4].id == out[1].id
+
+    body = _blocks(b"\n".join(b'"%s"' % a.encode() for a in addrs))
+    assert asyncio.run(Pipeline(db, chunk_size=2).run(ndjson_source(body), CountSink())) == 5
+
+
+def test_sink_sees_address_ids_before_commit(db):
+    sink = _RecordingSink()
+    # Segundo chunk só com duplicatas: o destino também é chamado
+    asyncio.run(Pipeline(db, chunk_size=2).run(Source("test", ["Rua A, 1", "Rua B, 2", "rua a 1"]), sink))
+    (first, first_ids), (second, second_ids) = sink.committed
+    assert first == ["Rua A, 1", "Rua B, 2"] and second == ["rua a 1"]
+    assert second_ids == first_ids[:1]
+
+
+def test_address_without_results_has_no_best_score(db):
+    from app.models import Address
+    from app.services.processing import address_out_from_model
+
+    out = asyncio.run(Pipeline(db, providers=[]).run(json_source(["Rua A, 1"]), ListSink()))
+    assert out[0].best_score is None and out[0].winner_provider is None
+    # Mesmo valor de quando o endereço é lido do banco
+    assert address_out_from_model(db.get(Address, out[0].id)).best_score is None
+
+
+def test_validate_stream_endpoint(db, monkeypatch):
+    import json
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.routers import validate
+
+    app = FastAPI()
+    app.include_router(validate.router, prefix="/api")
+    monkeypatch.setattr(validate, "SessionLocal", lambda: db)
+    monkeypatch.setattr(db, "close", lambda: None)
+    body = b'"Rua A, 1"\n{"address": "Rua B, 2"}\n"rua a 1"\n'
+    response = TestClient(app).post("/api/validate/stream?chunk_size=2", content=body)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [line["raw_address"] for line in lines] == ["Rua A, 1", "Rua B, 2", "Rua A, 1"]
+
+    response = TestClient(app).post("/api/validate/stream", content=b'"Rua A, 1"\n42\n')
+    assert "Linha 2" in json.loads(response.text.splitlines()[-1])["error"]
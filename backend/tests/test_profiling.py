@@ -0,0 +1,71 @@
+"""
+Testes unitários para o profiling sob demanda
+"""
+import json
+import time
+
+import pytest
+
+from app.services import profiling
+from app.services.profiling import ProfilerBusy, ProfileSession, find_artifact
+
+
+def busy_work(n=20000):
+    return sum(i * i for i in range(n))
+
+
+class TestProfileSession:
+    """Testes das sessões de profiling"""
+
+    def test_cprofile_summary_and_artifact(self, tmp_path):
+        with ProfileSession("cprofile") as prof:
+            busy_work()
+        artifact_id = prof.save("teste", directory=str(tmp_path))
+        summary = prof.summary(artifact_id, limit=5)
+        assert summary["format"] == "pstats"
+        assert len(summary["top_functions"]) <= 5
+        assert any("busy_work" in f["function"] for f in summary["top_functions"])
+        path, mode = find_artifact(artifact_id, directory=str(tmp_path))
+        assert mode == "cprofile" and path.endswith(".pstats")
+
+    def test_sampling_speedscope(self, tmp_path):
+        with ProfileSession("sampling", interval=0.001) as prof:
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                busy_work(1000)
+        artifact_id = prof.save("teste", directory=str(tmp_path))
+        path, mode = find_artifact(artifact_id, directory=str(tmp_path))
+        assert mode == "sampling"
+        with open(path) as f:
+            data = json.load(f)
+        profile = data["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert profile["samples"] and len(profile["samples"]) == len(profile["weights"])
+        assert any("busy_work" in f["function"] for f in prof.top_functions(limit=200))
+
+    def test_one_session_at_a_time(self):
+        with ProfileSession("sampling"):
+            with pytest.raises(ProfilerBusy):
+                with ProfileSession("cprofile"):
+                    pass
+        # O lock é liberado ao sair
+        with ProfileSession("cprofile"):
+            pass
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            ProfileSession("perf")
+
+
+def test_find_artifact_rejects_paths(tmp_path):
+    assert find_artifact("../geomatch", directory=str(tmp_path)) is None
+    assert find_artifact("20240101T000000-deadbeef", directory=str(tmp_path)) is None
+
+
+def test_admin_authorized(monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "")
+    assert not profiling.admin_authorized("")
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "segredo")
+    assert profiling.admin_authorized("segredo")
+    assert not profiling.admin_authorized("outro")
+    assert not profiling.admin_authorized(None)
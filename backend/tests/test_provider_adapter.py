@@ -0,0 +1,68 @@
+"""
+Testes unitários para o adaptador de provedores síncronos (ThreadPoolProviderAdapter)
+"""
+import asyncio
+import threading
+import time
+
+from app.providers.base import Provider, ThreadPoolProviderAdapter, as_async_provider
+
+
+class EchoProvider(Provider):
+    """Devolve o próprio endereço; falha nos endereços marcados como inválidos."""
+
+    name = "echo"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def validate(self, address):
+        if address.startswith("x"):
+            raise ValueError(f"inválido: {address}")
+        time.sleep(self.delay)
+        return {"matched_address": address, "score": 1.0, "metadata": {}}
+
+
+class BatchProvider(EchoProvider):
+    """Sobrescreve validate_many e registra o tamanho de cada fatia recebida."""
+
+    def validate_many(self, addresses):
+        with self.lock:
+            self.batches.append(list(addresses))
+        # A primeira fatia termina por último: a ordem não pode depender disso
+        time.sleep(0.05 if "rua 0" in addresses else 0)
+        return super().validate_many(addresses)
+
+
+class TestThreadPoolProviderAdapter:
+    """Testes de ordem, fatiamento e fallback do validate_many"""
+
+    def test_results_keep_input_order_across_slices(self):
+        provider = BatchProvider()
+        addresses = [f"rua {i}" for i in range(10)]
+        results = asyncio.run(ThreadPoolProviderAdapter(provider).validate_many(addresses, concurrency=3))
+        assert [r["matched_address"] for r in results] == addresses
+        assert len(provider.batches) == 3
+        assert sorted(a for b in provider.batches for a in b) == sorted(addresses)
+
+    def test_default_validate_many_returns_errors_in_place(self):
+        addresses = ["rua a", "x1", "rua b", "x2"]
+        results = asyncio.run(ThreadPoolProviderAdapter(EchoProvider()).validate_many(addresses, concurrency=2))
+        assert results[0]["matched_address"] == "rua a" and results[2]["matched_address"] == "rua b"
+        assert isinstance(results[1], ValueError) and "x1" in str(results[1])
+        assert isinstance(results[3], ValueError) and "x2" in str(results[3])
+
+    def test_slices_run_concurrently(self):
+        adapter = ThreadPoolProviderAdapter(EchoProvider(delay=0.1))
+        started = time.perf_counter()
+        asyncio.run(adapter.validate_many([f"rua {i}" for i in range(4)], concurrency=4))
+        # Quatro fatias de um endereço em threads: bem menos que 4 x 0,1s em série
+        assert time.perf_counter() - started < 0.3
+
+    def test_empty_input_and_single_validate(self):
+        adapter = as_async_provider(EchoProvider())
+        assert isinstance(adapter, ThreadPoolProviderAdapter) and adapter.name == "echo"
+        assert asyncio.run(adapter.validate_many([])) == []
+        assert asyncio.run(adapter.validate("rua a"))["matched_address"] == "rua a"
@@ -0,0 +1,85 @@
+"""
+Testes unitários para o índice de endereços de referência
+"""
+import pytest
+
+from app.services.reference_index import (
+    ReferenceIndex,
+    ReferenceRecord,
+    build_index_from_csv,
+    iter_reference_csv,
+)
+from app.services.matching import similarity_score_with_cep
+
+RECORDS = [
+    ReferenceRecord(1, "Rua XV de Novembro, 100, Centro", "80020-310", "Curitiba", "PR"),
+    ReferenceRecord(2, "Avenida Paulista, 1000, Bela Vista", "01310-100", "São Paulo", "SP"),
+    ReferenceRecord(3, "Avenida Paulista, 2000, Bela Vista", "01311-200", "São Paulo", "SP"),
+    ReferenceRecord(4, "Praia de Botafogo, 300", "22250-040", "Rio de Janeiro", "RJ"),
+    ReferenceRecord(5, "Rua Augusta, 500, Consolação", "01305-000", "São Paulo", "SP"),
+]
+
+
+@pytest.fixture
+def index():
+    return ReferenceIndex(RECORDS, max_candidates=3)
+
+
+class TestReferenceIndex:
+    """Testes de busca e ranqueamento"""
+
+    def test_best_match_by_tokens(self, index):
+        matches = index.match("av paulista 1000 bela vista", k=2)
+        assert [m.record.id for m in matches] == [2, 3]
+        assert matches[0].score >= matches[1].score
+
+    def test_score_is_similarity_with_cep(self, index):
+        address = "Rua XV de Novembro 100 Centro 80020-310"
+        best = index.match(address, k=1)[0]
+        assert best.record.id == 1
+        assert best.score == similarity_score_with_cep(
+            "rua xv de novembro 100 centro 80020310", "rua xv de novembro 100 centro", "80020310", "80020310"
+        )
+
+    def test_cep_block(self, index):
+        # O prefixo do CEP restringe os candidatos mesmo sem tokens em comum
+        assert index.match("qualquer coisa 22250-040", k=1)[0].record.id == 4
+
+    def test_city_filter(self, index):
+        matches = index.match("avenida", k=5, city="Sao Paulo")
+        assert {m.record.id for m in matches} <= {2, 3, 5}
+
+    def test_no_candidates(self, index):
+        assert index.match("zzzz yyyy") == []
+
+    def test_max_candidates_limits_rescoring(self):
+        records = [ReferenceRecord(i, f"Rua Comum {i}", None, None, None) for i in range(1, 51)]
+        index = ReferenceIndex(records, max_candidates=5)
+        assert len(index._candidates(["rua", "comum"], None, None)) == 5
+        assert index.match("rua comum 42", k=1)[0].record.id == 42
+
+
+class TestReferenceCsv:
+    """Testes de leitura do CSV de referência"""
+
+    def test_read_and_build(self, tmp_path):
+        path = tmp_path / "refs.csv"
+        path.write_text(
+            "endereco,cep,cidade,uf\n"
+            "\"Rua A, 1\",01001-000,São Paulo,SP\n"
+            ",,,\n"
+            "Rua B 2,,,\n",
+            encoding="utf-8",
+        )
+        rows = list(iter_reference_csv(str(path)))
+        assert rows == [
+            {"address": "Rua A, 1", "cep": "01001-000", "city": "São Paulo", "uf": "SP"},
+            {"address": "Rua B 2", "cep": None, "city": None, "uf": None},
+        ]
+        assert len(build_index_from_csv(str(path))) == 2
+
+    def test_missing_address_column(self, tmp_path):
+        path = tmp_path / "refs.csv"
+        path.write_text("cep\n01001000\n", encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(iter_reference_csv(str(path)))
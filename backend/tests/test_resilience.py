@@ -0,0 +1,122 @@
+"""
+Testes unitários para a camada de resiliência dos provedores
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.providers.base import ProviderUnavailable
+from app.providers.resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy, TokenBucket
+
+
+def make_policy(**kwargs):
+    defaults = dict(
+        rate_limit=0, burst=0, failure_threshold=2, reset_seconds=0.05,
+        retries=0, retry_base_delay=0.001, timeout_min=0.01, timeout_max=0.2,
+    )
+    defaults.update(kwargs)
+    return ResiliencePolicy("teste", **defaults)
+
+
+def failing(counter):
+    async def fn():
+        counter.append(1)
+        raise ProviderUnavailable("fora do ar")
+    return fn
+
+
+class TestCircuitBreaker:
+    """Testes do circuit breaker"""
+
+    def test_opens_after_consecutive_failures(self):
+        policy = make_policy()
+        calls = []
+        for _ in range(2):
+            with pytest.raises(ProviderUnavailable):
+                asyncio.run(policy.call(failing(calls)))
+        assert policy.breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(policy.call(failing(calls)))
+        assert len(calls) == 2
+        assert policy.counters["short_circuited"] == 1
+
+    def test_half_open_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.01)
+        breaker.record_failure()
+        assert not breaker.allow()
+        time.sleep(0.02)
+        assert breaker.allow()
+        assert breaker.state == "half_open"
+        assert not breaker.allow()  # só uma chamada de teste por vez
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_provider_answers_do_not_trip_breaker(self):
+        policy = make_policy(failure_threshold=1)
+
+        async def invalid():
+            raise ValueError("CEP inválido")
+
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                asyncio.run(policy.call(invalid))
+        assert policy.breaker.state == "closed"
+        assert policy.counters["failures"] == 0
+
+
+class TestRetryAndTimeout:
+    """Testes de retry com jitter e timeout"""
+
+    def test_retry_then_success(self):
+        policy = make_policy(retries=2, failure_threshold=5)
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ProviderUnavailable("instável")
+            return "ok"
+
+        assert asyncio.run(policy.call(flaky)) == "ok"
+        assert policy.counters["retries"] == 2
+        assert policy.breaker.consecutive_failures == 0
+
+    def test_timeout_counts_as_failure(self):
+        policy = make_policy(timeout_max=0.02, failure_threshold=5)
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        with pytest.raises(ProviderUnavailable):
+            asyncio.run(policy.call(slow))
+        assert policy.counters["timeouts"] == 1
+
+    def test_adaptive_timeout_follows_latency(self):
+        policy = make_policy(timeout_min=0.01, timeout_max=5)
+        assert policy.current_timeout() == 5
+        for _ in range(50):
+            policy._latencies.append(0.01)
+        assert policy.current_timeout() == pytest.approx(0.03)
+
+
+class TestTokenBucket:
+    """Testes do rate limit"""
+
+    def test_waits_when_empty(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        async def take(n):
+            for _ in range(n):
+                await bucket.acquire()
+
+        started = time.monotonic()
+        asyncio.run(take(4))
+        # 1 token imediato + 3 repostos a 50/s
+        assert time.monotonic() - started >= 0.05
+        assert bucket.waits == 3
+
+    def test_disabled(self):
+        bucket = TokenBucket(rate=0)
+        asyncio.run(bucket.acquire())
+        assert bucket.available() == float("inf")
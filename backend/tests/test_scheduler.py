@@ -0,0 +1,100 @@
+"""
+Testes unitários para o agendamento de provedores
+"""
+import asyncio
+
+from app.providers.base import AsyncProvider
+from app.services.scheduler import ProviderScheduler
+
+
+class FakeProvider(AsyncProvider):
+    def __init__(self, name, answers, needs_cep=False):
+        self.name = name
+        self.answers = answers
+        self.needs_cep = needs_cep
+        self.seen = []
+
+    def applies(self, address):
+        return not self.needs_cep or "cep" in address
+
+    async def validate(self, address):
+        self.seen.append(address)
+        answer = self.answers.get(address)
+        if answer is None:
+            raise ValueError("sem resultado")
+        return {"matched_address": answer, "score": 0.0, "metadata": {}}
+
+
+def run(scheduler, providers, addresses, threshold=95):
+    return asyncio.run(
+        scheduler.run(providers, addresses, [a.lower() for a in addresses], [None] * len(addresses), threshold)
+    )
+
+
+class TestProviderScheduler:
+    """Testes de ondas, aplicabilidade e parada antecipada"""
+
+    def test_early_exit_skips_next_providers(self):
+        first = FakeProvider("first", {"rua a": "rua a", "rua b": "outra coisa"})
+        second = FakeProvider("second", {"rua b": "rua b"})
+        outcomes = run(ProviderScheduler(adaptive=False), [first, second], ["rua a", "rua b"])
+        assert second.seen == ["rua b"]
+        assert [(p.name, score) for p, _, score in outcomes[0]] == [("first", 100.0)]
+        assert [p.name for p, _, _ in outcomes[1]] == ["first", "second"]
+
+    def test_configurable_threshold(self):
+        first = FakeProvider("first", {"rua a": "rua a x"})
+        second = FakeProvider("second", {"rua a": "rua a"})
+        run(ProviderScheduler(adaptive=False), [first, second], ["rua a"], threshold=50)
+        assert second.seen == []
+
+    def test_non_applicable_provider_is_not_called(self):
+        cep_only = FakeProvider("cep_only", {}, needs_cep=True)
+        fallback = FakeProvider("fallback", {"rua a": "rua a"})
+        scheduler = ProviderScheduler(adaptive=False)
+        outcomes = run(scheduler, [cep_only, fallback], ["rua a"])
+        assert cep_only.seen == []
+        assert scheduler.stats["cep_only"].skipped == 1
+        assert [p.name for p, _, _ in outcomes[0]] == ["fallback"]
+
+    def test_errors_are_kept_and_counted(self):
+        failing = FakeProvider("failing", {})
+        outcomes = run(ProviderScheduler(adaptive=False), [failing], ["rua a"])
+        (p, result, score), = outcomes[0]
+        assert isinstance(result, ValueError) and score is None
+
+    def test_adaptive_order_prefers_cheaper_resolution(self):
+        slow = FakeProvider("slow", {"rua a": "rua a"})
+        fast = FakeProvider("fast", {"rua a": "rua a"})
+        scheduler = ProviderScheduler(adaptive=True, min_calls=1)
+        assert scheduler.order([slow, fast]) == [slow, fast]  # sem estatísticas: ordem configurada
+        for name, seconds in (("slow", 1.0), ("fast", 0.1)):
+            stats = scheduler._stats(name)
+            stats.calls, stats.resolved, stats.seconds = 10, 10, seconds
+        assert scheduler.order([slow, fast]) == [fast, slow]
+        snapshot = {s["name"]: s for s in scheduler.snapshot()}
+        assert snapshot["fast"]["resolve_rate"] == 1.0
+
+    def test_unmeasured_provider_is_explored_despite_early_exit(self):
+        slow = FakeProvider("slow", {"rua a": "rua a"})
+        fast = FakeProvider("fast", {"rua a": "rua a"})
+        scheduler = ProviderScheduler(adaptive=True, min_calls=2)
+        # "slow" já tem estatísticas; "fast" nunca foi alcançado por causa da parada antecipada
+        stats = scheduler._stats("slow")
+        stats.calls, stats.resolved, stats.wins, stats.seconds = 10, 10, 10, 10.0
+        assert scheduler.order([slow, fast]) == [fast, slow]
+
+        run(scheduler, [slow, fast], ["rua a", "rua a"])
+        assert fast.seen == ["rua a", "rua a"] and slow.seen == []
+        assert scheduler.stats["fast"].calls == 2
+        # medido, "fast" continua na frente por ser mais barato
+        assert scheduler.order([slow, fast]) == [fast, slow]
+
+    def test_win_rate_breaks_cost_ties(self):
+        first = FakeProvider("first", {})
+        second = FakeProvider("second", {})
+        scheduler = ProviderScheduler(adaptive=True, min_calls=1)
+        for name, wins in (("first", 1), ("second", 5)):
+            stats = scheduler._stats(name)
+            stats.calls, stats.resolved, stats.wins, stats.seconds = 10, 10, wins, 1.0
+        assert scheduler.order([first, second]) == [second, first]
@@ -0,0 +1,100 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import (
+    JSON, Column, DateTime, Float, ForeignKey, Integer, String, Text, create_engine, inspect, select,
+)
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, upgrade_schema
+from app.models import Address
+from app.services.persistence import AddressBatchWriter
+from app.services.queries import address_page_query
+
+
+def _result(provider, score):
+    return {"provider_name": provider, "matched_address": "x", "cep": None, "score": score, "extra_metadata": None}
+
+
+def test_writer_maintains_winner_columns():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    writer = AddressBatchWriter(db, chunk_size=10)
+    # Empate: vence o último resultado, como em address_out
+    writer.add({"raw_address": "a", "normalized_address": "a", "cep": None, "status": "x"},
+               [_result("p1", 90.0), _result("p2", 95.0), _result("p3", 95.0)])
+    writer.add({"raw_address": "b", "normalized_address": "b", "cep": None, "status": "x"}, [_result("p1", 40.0)])
+    writer.add({"raw_address": "c", "normalized_address": "c", "cep": None, "status": "x"}, [])
+    writer.flush()
+
+    rows = db.execute(select(Address.raw_address, Address.winner_provider, Address.best_score).order_by(Address.id))
+    assert rows.all() == [("a", "p3", 95.0), ("b", "p1", 40.0), ("c", None, None)]
+    assert [a.raw_address for a in db.scalars(address_page_query(10, min_score=50.0))] == ["a"]
+    db.close()
+
+
+def _baseline_metadata():
+    """Modelos do schema inicial, como o antigo ``create_all`` os criava."""
+    legacy = declarative_base()
+
+    class Address(legacy):
+        __tablename__ = "addresses"
+        id = Column(Integer, primary_key=True, index=True)
+        raw_address = Column(String, index=True)
+        normalized_address = Column(String, index=True)
+        cep = Column(String, index=True, nullable=True)
+        status = Column(String)
+        created_at = Column(DateTime)
+
+    class ProviderResult(legacy):
+        __tablename__ = "provider_results"
+        id = Column(Integer, primary_key=True, index=True)
+        address_id = Column(Integer, ForeignKey("addresses.id"))
+        provider_name = Column(String, index=True)
+        matched_address = Column(String)
+        cep = Column(String, nullable=True)
+        score = Column(Float)
+        extra_metadata = Column(JSON)
+        created_at = Column(DateTime)
+
+    class AuditLog(legacy):
+        __tablename__ = "audit_logs"
+        id = Column(Integer, primary_key=True, index=True)
+        event = Column(String)
+        details = Column(Text)
+        created_at = Column(DateTime)
+
+    return legacy.metadata
+
+
+def test_migrations_upgrade_legacy_baseline_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    _baseline_metadata().create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO addresses (id, raw_address, status) VALUES (1, 'a', 'x'), (2, 'b', 'x')")
+        conn.exec_driver_sql(
+            "INSERT INTO provider_results (address_id, provider_name, score) "
+            "VALUES (1, 'p1', 80), (1, 'p2', 95), (1, 'p3', 95)"
+        )
+
+    upgrade_schema(engine)
+    with engine.connect() as conn:
+        # Tabelas e índices adicionados depois do schema inicial também são criados
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+        assert {"upload_jobs", "upload_job_rows", "reference_addresses"} <= set(inspect(conn).get_table_names())
+        rows = conn.exec_driver_sql("SELECT id, winner_provider, best_score FROM addresses ORDER BY id").all()
+        assert rows == [(1, "p3", 95.0), (2, None, None)]
+    engine.dispose()
+
+
+def test_migrations_skip_objects_created_by_create_all(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # Banco de uma versão intermediária: schema inicial + tabelas criadas depois pelo create_all
+    _baseline_metadata().create_all(bind=engine)
+    Base.metadata.tables["reference_addresses"].create(bind=engine)
+
+    upgrade_schema(engine)
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+    engine.dispose()
@@ -0,0 +1,79 @@
+"""
+Testes unitários para o dump SQL em streaming
+"""
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.services.parser import parse_sql_addresses
+from app.services.sql_export import copy_field, iter_sql_dump, sql_literal
+
+ADDRESSES = [
+    (1, "Rua d'Ajuda, 1", "rua d ajuda 1", None, "MATCH_CONFIRMADO", 100.0, "local", datetime(2024, 1, 2, 3, 4, 5)),
+    (2, "Av B,\tsala\n2", "av b sala 2", "01001000", "REVISAR", 72.5, "viacep", datetime(2024, 1, 2, 3, 4, 6)),
+]
+RESULTS = [
+    (1, "local", "rua d ajuda 1", None, 100.0, datetime(2024, 1, 2, 3, 4, 5)),
+    (2, "viacep", "Praça da Sé", "01001000", 72.5, datetime(2024, 1, 2, 3, 4, 6)),
+]
+
+
+def dump(dialect, batch=1):
+    address_batches = [ADDRESSES[i:i + batch] for i in range(0, len(ADDRESSES), batch)]
+    result_batches = [RESULTS[i:i + batch] for i in range(0, len(RESULTS), batch)]
+    return "".join(iter_sql_dump(iter(address_batches), iter(result_batches), dialect))
+
+
+class TestLiterals:
+    def test_sql_literal(self):
+        assert sql_literal(None) == "NULL"
+        assert sql_literal(7) == "7"
+        assert sql_literal("d'Ajuda") == "'d''Ajuda'"
+        assert sql_literal(datetime(2024, 1, 2, 3, 4, 5)) == "'2024-01-02 03:04:05'"
+
+    def test_copy_field(self):
+        assert copy_field(None) == "\\N"
+        assert copy_field("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+    @pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+    def test_non_finite_floats_are_null(self, value):
+        assert sql_literal(value) == "NULL"
+        assert copy_field(value) == "\\N"
+        assert sql_literal(95.5) == "95.5"
+
+
+class TestSqlDump:
+    @pytest.mark.parametrize("dialect", ["insert", "sqlite"])
+    def test_roundtrip_sqlite(self, dialect):
+        con = sqlite3.connect(":memory:")
+        con.executescript(
+            "CREATE TABLE addresses "
+            "(id, raw_address, normalized_address, cep, status, best_score, winner_provider, created_at);"
+            "CREATE TABLE provider_results (address_id, provider_name, matched_address, cep, score, created_at);"
+            + dump(dialect)
+        )
+        rows = con.execute("SELECT raw_address, cep, best_score, winner_provider FROM addresses ORDER BY id").fetchall()
+        assert rows == [(a[1], a[3], a[5], a[6]) for a in ADDRESSES]
+        assert con.execute("SELECT SUM(score) FROM provider_results").fetchone()[0] == 172.5
+
+    def test_sqlite_wraps_each_batch_in_transaction(self):
+        text = dump("sqlite")
+        assert text.count("BEGIN TRANSACTION;") == 4
+        assert text.count("COMMIT;") == 4
+
+    def test_postgres_copy_blocks(self):
+        text = dump("postgres")
+        assert (
+            "COPY addresses (id, raw_address, normalized_address, cep, status, best_score, winner_provider, "
+            "created_at) FROM stdin;"
+        ) in text
+        assert "2\tAv B,\\tsala\\n2\tav b sala 2\t01001000\tREVISAR\t72.5\tviacep\t2024-01-02 03:04:06\n" in text
+        assert text.count("\\.\n") == 2
+
+    def test_dump_is_readable_by_upload_parser(self):
+        assert parse_sql_addresses(dump("insert", batch=2))[:2] == [a[1] for a in ADDRESSES]
+
+    def test_invalid_dialect(self):
+        with pytest.raises(ValueError):
+            dump("oracle")
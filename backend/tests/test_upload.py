@@ -0,0 +1,80 @@
+"""
+Testes do upload de arquivos: um arquivo inválido não grava nada
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_db
+from app.models import Address, ProviderResult, UploadJob
+from app.routers import upload
+from app.services import persistence
+from app.services.pipeline import Pipeline
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    # Chunks pequenos: o erro de leitura aparece depois de vários chunks possíveis
+    monkeypatch.setattr(persistence, "DB_CHUNK_SIZE", 2)
+    app = FastAPI()
+    app.include_router(upload.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def _csv(rows, tail=b""):
+    # Linhas longas: o erro fica além do primeiro bloco lido pelo decodificador
+    filler = "Bloco" * 80
+    return b"endereco\n" + b"".join(f"Rua {i} {filler}, {i}\n".encode() for i in range(rows)) + tail
+
+
+def test_valid_csv_is_processed(client, db):
+    response = client.post("/api/upload/csv", files={"file": ("a.csv", _csv(5), "text/csv")})
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert db.query(Address).count() == 5
+
+
+def test_invalid_bytes_midway_persist_nothing(client, db, monkeypatch):
+    # Upload anterior, que não pode ser afetado pela limpeza
+    client.post("/api/upload/csv", files={"file": ("a.csv", _csv(3), "text/csv")})
+    discarded = []
+    original = Pipeline.discard_written
+
+    def spy(self, *args, **kwargs):
+        discarded.append(original(self, *args, **kwargs))
+        return discarded[-1]
+
+    monkeypatch.setattr(Pipeline, "discard_written", spy)
+    body = _csv(40, tail=b"Rua \xff\xfe, 8\n")
+    response = client.post("/api/upload/csv", files={"file": ("a.csv", body, "text/csv")})
+    assert response.status_code == 400
+    # Chunks foram gravados antes do erro de leitura e depois apagados
+    assert discarded and discarded[0] > 0
+    assert db.query(Address).count() == 3
+    assert db.query(ProviderResult).join(Address).count() == db.query(ProviderResult).count()
+
+
+def test_invalid_sql_dump_persists_nothing(client, db):
+    response = client.post("/api/upload/sql", files={"file": ("a.sql", b"SELECT 1;\n", "text/plain")})
+    assert response.status_code == 400
+    assert db.query(Address).count() == 0
+
+
+def test_invalid_bytes_in_background_upload_create_no_job(client, db):
+    body = _csv(40, tail=b"Rua \xff\xfe, 8\n")
+    response = client.post("/api/upload/csv?background=true", files={"file": ("a.csv", body, "text/csv")})
+    assert response.status_code == 400
+    assert db.query(UploadJob).count() == 0